@@ -0,0 +1,199 @@
+"""Incremental store and history of the active alerts"""
+# pylint: disable=line-too-long
+
+from collections import deque
+import time
+from typing import Callable, NamedTuple
+
+from .lennox_errors import lennox_error_get_message_from_code
+
+ALERT_ADDED = "added"
+ALERT_CLEARED = "cleared"
+
+
+class AlertEvent(NamedTuple):
+    """An alert that became active or was cleared"""
+
+    event: str
+    alert: dict
+
+
+class ActiveAlertStore(object):
+    """The active alerts keyed by the id of their slot in the controller's active array.
+
+    Each update is compared with the stored alerts, only the alerts that are new or whose content changed are copied.
+    update() returns the transitions as events.  An alert is identified by its code and first timestamp, so an alert that
+    moves to a different slot or has its count and last timestamp updated is not reported again.
+    """
+
+    __slots__ = ("_raw", "_alerts")
+
+    def __init__(self):
+        # The alert as received, used to detect changes
+        self._raw: dict[int, dict] = {}
+        # The alert with its message added, in the order of the last update
+        self._alerts: dict[int, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    @property
+    def alerts(self) -> list[dict]:
+        """Returns the active alerts in the order they were received"""
+        return list(self._alerts.values())
+
+    def update(self, active: list) -> tuple[bool, list[AlertEvent]]:
+        """Replaces the active alerts with those in the active array, returns (changed, events)"""
+        old_alerts = {_identity(self._raw[alert_id]): alert for alert_id, alert in self._alerts.items()}
+        raws: dict[int, dict] = {}
+        alerts: dict[int, dict] = {}
+        changed = False
+        for index, entry in enumerate(active):
+            raw = entry.get("alert")
+            # A code of zero indicates a non-alert, lennox seems to put one of these in by default.
+            if raw is None or raw.get("code") is None or raw["code"] == 0 or raw.get("isStillActive", True) is False:
+                continue
+            alert_id = entry.get("id", index)
+            old_raw = self._raw.get(alert_id)
+            if old_raw == raw:
+                raws[alert_id] = old_raw
+                alerts[alert_id] = self._alerts[alert_id]
+                continue
+            changed = True
+            alert = raw.copy()
+            alert["message"] = lennox_error_get_message_from_code(raw["code"])
+            raws[alert_id] = raw.copy()
+            alerts[alert_id] = alert
+        if changed is False and list(alerts) == list(self._alerts):
+            return False, []
+        self._raw = raws
+        self._alerts = alerts
+        new_keys = {_identity(raw) for raw in raws.values()}
+        events = [AlertEvent(ALERT_CLEARED, alert) for key, alert in old_alerts.items() if key not in new_keys]
+        events.extend(AlertEvent(ALERT_ADDED, alerts[alert_id]) for alert_id, raw in raws.items() if _identity(raw) not in old_alerts)
+        return True, events
+
+    def clear(self) -> tuple[bool, list[AlertEvent]]:
+        """Clears all the alerts, returns (changed, events)"""
+        return self.update([])
+
+
+def _identity(raw: dict) -> tuple:
+    # The same alert keeps its code and first timestamp, fields such as count and timestampLast are updated in place
+    return (raw.get("code"), raw.get("timestampFirst"))
+
+
+DEFAULT_ALERT_HISTORY_SIZE: int = 256
+
+
+class AlertHistoryEntry(NamedTuple):
+    """An alert event in the history"""
+
+    timestamp: float
+    event: str
+    code: int
+
+
+class AlertCodeStats(object):
+    """Statistics for one alert code.
+
+    first_seen, last_seen and the active duration use the time the events were received, not the timestampFirst and
+    timestampLast reported by the controller, so an alert that was already active when the connection started appears to be
+    raised at that time.
+    """
+
+    __slots__ = ("code", "raised", "cleared", "first_seen", "last_seen", "active", "_active_since", "_active_duration")
+
+    def __init__(self, code: int):
+        self.code: int = code
+        self.raised: int = 0
+        self.cleared: int = 0
+        self.first_seen: float = None
+        self.last_seen: float = None
+        # Number of alerts with this code currently active
+        self.active: int = 0
+        self._active_since: float = None
+        self._active_duration: float = 0.0
+
+    def active_duration(self, now: float = None) -> float:
+        """Returns the total seconds an alert with this code has been active, including a currently active alert"""
+        if self._active_since is None:
+            return self._active_duration
+        return self._active_duration + (time.time() if now is None else now) - self._active_since
+
+    def record_event(self, timestamp: float, event: str) -> None:
+        """Updates the statistics for an ALERT_ADDED or ALERT_CLEARED event received at timestamp"""
+        self.last_seen = timestamp
+        if event == ALERT_ADDED:
+            if self.first_seen is None:
+                self.first_seen = timestamp
+            self.raised += 1
+            self.active += 1
+            if self.active == 1:
+                self._active_since = timestamp
+        else:
+            self.cleared += 1
+            if self.active > 0:
+                self.active -= 1
+                if self.active == 0:
+                    self._active_duration += timestamp - self._active_since
+                    self._active_since = None
+
+
+class AlertHistory(object):
+    """Bounded history of alert raise and clear events with per code statistics.
+
+    The last max_events events are kept in a ring buffer, the statistics cover every event recorded and are kept up to date
+    as events are recorded so they can be read without going through the buffer.  Events are timestamped when they are
+    recorded, see AlertCodeStats.
+    """
+
+    __slots__ = ("_events", "_stats", "_clock")
+
+    def __init__(self, max_events: int = DEFAULT_ALERT_HISTORY_SIZE, clock: Callable[[], float] = time.time):
+        self._events: deque[AlertHistoryEntry] = deque(maxlen=max_events)
+        self._stats: dict[int, AlertCodeStats] = {}
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def max_events(self) -> int:
+        """Returns the capacity of the ring buffer"""
+        return self._events.maxlen
+
+    def record(self, events: list[AlertEvent], timestamp: float = None) -> None:
+        """Records alert events, timestamp defaults to now"""
+        if len(events) == 0:
+            return
+        if timestamp is None:
+            timestamp = self._clock()
+        for event in events:
+            code = event.alert.get("code")
+            self._events.append(AlertHistoryEntry(timestamp, event.event, code))
+            stats = self._stats.get(code)
+            if stats is None:
+                stats = self._stats[code] = AlertCodeStats(code)
+            stats.record_event(timestamp, event.event)
+
+    def events(self, since: float = None) -> list[AlertHistoryEntry]:
+        """Returns the events in the buffer, oldest first, optionally only those at or after since"""
+        if since is None:
+            return list(self._events)
+        # Walk back from the newest event, stopping at the first older one
+        recent = []
+        for entry in reversed(self._events):
+            if entry.timestamp < since:
+                break
+            recent.append(entry)
+        recent.reverse()
+        return recent
+
+    def stats(self, code: int) -> AlertCodeStats:
+        """Returns the statistics for an alert code, or None if it has not been seen"""
+        return self._stats.get(code)
+
+    def codes(self) -> list[int]:
+        """Returns the alert codes that have been seen"""
+        return list(self._stats)
@@ -0,0 +1,92 @@
+"""Declarative mapping of message fields onto object properties"""
+# pylint: disable=line-too-long
+
+from __future__ import annotations
+
+from typing import Union
+
+from .subscriber_base import SubscriberBase
+
+
+class AttrMap(object):
+    """Maps the fields of a message section onto the properties of a SubscriberBase.
+
+    The mapping is declared as {path: property} where path is a dotted path to the field, for example
+    {"options.ventilation.unitType": "ventilationUnitType"}, or {path: AttrMap} to reuse another map for a nested section.
+    It is compiled once into nested lookup tables so that update() only visits the keys present in the message.
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self, mapping: dict[str, Union[str, AttrMap]]):
+        self._table: dict[str, Union[str, AttrMap]] = {}
+        nested: dict[str, dict[str, Union[str, AttrMap]]] = {}
+        for path, target in mapping.items():
+            key, _, rest = path.partition(".")
+            if rest == "":
+                self._add(key, target)
+            else:
+                nested.setdefault(key, {})[rest] = target
+        for key, sub_mapping in nested.items():
+            self._add(key, AttrMap(sub_mapping))
+
+    def _add(self, key: str, target: Union[str, AttrMap]) -> None:
+        if key in self._table:
+            raise ValueError(f"AttrMap - duplicate mapping for key [{key}]")
+        self._table[key] = target
+
+    def properties(self) -> list[str]:
+        """Returns the names of the properties this map updates"""
+        names = []
+        for target in self._table.values():
+            if isinstance(target, AttrMap):
+                names.extend(target.properties())
+            else:
+                names.append(target)
+        return names
+
+    def update(self, obj: SubscriberBase, data: dict) -> bool:
+        """Updates the properties of obj from the fields in data, returns True if any property changed"""
+        changed = False
+        table = self._table
+        for key, value in data.items():
+            target = table.get(key)
+            if target is None:
+                continue
+            if target.__class__ is str:
+                if obj.update_attr(target, value):
+                    changed = True
+            elif isinstance(value, dict) and target.update(obj, value):
+                changed = True
+        return changed
+
+
+class FeatureMap(object):
+    """Maps feature ids onto the properties of a SubscriberBase.
+
+    Features arrive as a list of {"feature": {"fid": id, "values": [{"value": value}]}}.  Each feature is decoded once and
+    the first value is copied to the property mapped to its fid, features with unmapped ids are skipped.
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self, mapping: dict[int, str]):
+        self._table: dict[int, str] = dict(mapping)
+
+    def update(self, obj: SubscriberBase, features: list) -> bool:
+        """Updates the properties of obj from the features, returns True if any property changed"""
+        changed = False
+        table = self._table
+        for feature in features:
+            data = feature.get("feature")
+            if data is None:
+                continue
+            target = table.get(data.get("fid"))
+            if target is None:
+                continue
+            values = data.get("values")
+            if not values or "value" not in values[0]:
+                continue
+            if obj.update_attr(target, values[0]["value"]):
+                changed = True
+        return changed
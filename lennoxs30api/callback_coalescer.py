@@ -0,0 +1,70 @@
+"""Coalesced delivery of update callbacks"""
+# pylint: disable=line-too-long
+
+import asyncio
+import logging
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CallbackCoalescer(object):
+    """Defers update callbacks so each subscriber is called once with everything that changed.
+
+    While enabled, objects that would execute their callbacks instead register a flush function and keep accumulating
+    their dirty properties.  flush() calls each registered function once.  With a window the flush happens that many seconds
+    after the first deferral, otherwise the owner flushes at the end of each batch of messages.
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.window: float = None
+        self._pending: dict[Callable[[], None], None] = {}
+        self._timer: asyncio.TimerHandle = None
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of deferred flush functions"""
+        return len(self._pending)
+
+    def enable(self, window: float = None) -> None:
+        """Start deferring callbacks, delivered every window seconds or when flush() is called if window is None"""
+        self.enabled = True
+        self.window = window
+
+    def disable(self) -> None:
+        """Deliver anything pending and go back to calling callbacks immediately"""
+        self.flush()
+        self.enabled = False
+        self.window = None
+
+    def defer(self, flush_func: Callable[[], None]) -> bool:
+        """Registers flush_func to be called at the next flush.  Returns False when not enabled and the caller should execute now"""
+        if self.enabled is False:
+            return False
+        self._pending[flush_func] = None
+        if self.window is not None and self._timer is None:
+            try:
+                self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+            except RuntimeError:
+                # No event loop is running, the owner flushes explicitly
+                pass
+        return True
+
+    def flush(self) -> int:
+        """Calls each deferred flush function once, returns the number called"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        count = 0
+        # Callbacks may cause further updates, keep going until nothing is pending
+        while len(self._pending) > 0:
+            pending = self._pending
+            self._pending = {}
+            for flush_func in pending:
+                try:
+                    flush_func()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    _LOGGER.exception("CallbackCoalescer flush - failed")
+                count += 1
+        return count
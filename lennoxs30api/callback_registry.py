@@ -0,0 +1,79 @@
+"""Registry of update callbacks indexed by the property they match"""
+# pylint: disable=line-too-long
+
+import inspect
+import logging
+from typing import Callable, Iterable
+
+from . import callback_runner
+from .callback_runner import AsyncCallbackRunner
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CallbackRegistry(object):
+    """Callbacks registered for changes to named properties.
+
+    Each callback is indexed under every name in its match list, callbacks registered with match=None receive every change.
+    Dispatching only looks at the callbacks indexed under the names that changed, each callback is called at most once per
+    dispatch and callbacks are called in the order they were registered.  Callbacks may be coroutine functions, the coroutine
+    is scheduled on the runner rather than awaited.
+    """
+
+    def __init__(self):
+        self._funcs: list[Callable] = []
+        self._index: dict[str, list[int]] = {}
+        self._wildcard: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._funcs)
+
+    def register(self, callbackfunc: Callable, match: Iterable[str] = None) -> None:
+        """Register a callback for changes to the properties in match, or all changes when match is None"""
+        seq = len(self._funcs)
+        self._funcs.append(callbackfunc)
+        if match is None:
+            self._wildcard.append(seq)
+            return
+        for name in set(match):
+            self._index.setdefault(name, []).append(seq)
+
+    def matching(self, names: Iterable[str]) -> list[Callable]:
+        """Returns the callbacks to call when the properties in names have changed"""
+        seqs = set(self._wildcard)
+        for name in names:
+            indexed = self._index.get(name)
+            if indexed is not None:
+                seqs.update(indexed)
+        return [self._funcs[seq] for seq in sorted(seqs)]
+
+    def matching_one(self, name: str) -> list[Callable]:
+        """Returns the callbacks to call when the single property name has changed"""
+        indexed = self._index.get(name)
+        if indexed is None:
+            return [self._funcs[seq] for seq in self._wildcard]
+        if len(self._wildcard) == 0:
+            return [self._funcs[seq] for seq in indexed]
+        return [self._funcs[seq] for seq in sorted(set(indexed).union(self._wildcard))]
+
+    def execute(self, names: Iterable[str], debug_string: str, *args, runner: AsyncCallbackRunner = None) -> None:
+        """Calls the callbacks matching names with args, logging and continuing past any exception"""
+        for callbackfunc in self.matching(names):
+            self._call(callbackfunc, debug_string, args, runner)
+
+    def execute_one(self, name: str, debug_string: str, *args, runner: AsyncCallbackRunner = None) -> None:
+        """Calls the callbacks matching the single property name with args, logging and continuing past any exception"""
+        for callbackfunc in self.matching_one(name):
+            self._call(callbackfunc, debug_string, args, runner)
+
+    def _call(self, callbackfunc: Callable, debug_string: str, args: tuple, runner: AsyncCallbackRunner) -> None:
+        try:
+            result = callbackfunc(*args)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Log and eat this exception so we can process other callbacks
+            _LOGGER.exception("executeOnUpdateCallback - [%s] - failed", debug_string)
+            return
+        if result is not None and inspect.isawaitable(result):
+            if runner is None:
+                runner = callback_runner.default_runner
+            runner.schedule(result, debug_string)
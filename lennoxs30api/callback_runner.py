@@ -0,0 +1,105 @@
+"""Runs coroutine update callbacks as tasks"""
+# pylint: disable=line-too-long
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable
+
+from .metrics import Metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CALLBACK_CONCURRENCY: int = 10
+DEFAULT_CALLBACK_TIMEOUT: float = 30.0
+DEFAULT_CALLBACK_SLOW_THRESHOLD: float = 1.0
+
+
+class AsyncCallbackRunner(object):
+    """Schedules the coroutines returned by async callbacks so they do not block message processing.
+
+    At most max_concurrency callbacks run at once, the rest wait their turn.  A callback that runs longer than timeout is cancelled.
+    Callbacks that take longer than slow_threshold, fail or time out are counted in metrics.
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics = None,
+        max_concurrency: int = DEFAULT_CALLBACK_CONCURRENCY,
+        timeout: float = DEFAULT_CALLBACK_TIMEOUT,
+        slow_threshold: float = DEFAULT_CALLBACK_SLOW_THRESHOLD,
+    ):
+        self.metrics = metrics
+        self.max_concurrency: int = max_concurrency
+        self.timeout: float = timeout
+        self.slow_threshold: float = slow_threshold
+        self._semaphore: asyncio.Semaphore = None
+        self._loop: asyncio.AbstractEventLoop = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of callbacks running or waiting to run"""
+        return len(self._tasks)
+
+    def schedule(self, coro: Awaitable, debug_string: str) -> asyncio.Task:
+        """Runs the awaitable as a task, returns None if there is no running event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if asyncio.iscoroutine(coro):
+                coro.close()
+            _LOGGER.error("async callback [%s] - no running event loop, callback not run", debug_string)
+            if self.metrics is not None:
+                self.metrics.inc_callback_failed()
+            return None
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        task = loop.create_task(self._run(coro, debug_string))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, coro: Awaitable, debug_string: str) -> None:
+        async with self._semaphore:
+            start = time.monotonic()
+            try:
+                await asyncio.wait_for(coro, self.timeout)
+            except asyncio.TimeoutError:
+                _LOGGER.warning("async callback [%s] - timed out after [%s] seconds", debug_string, self.timeout)
+                if self.metrics is not None:
+                    self.metrics.inc_callback_timeout()
+                return
+            except Exception:  # pylint: disable=broad-exception-caught
+                # Log and eat this exception so we can process other callbacks
+                _LOGGER.exception("async callback [%s] - failed", debug_string)
+                if self.metrics is not None:
+                    self.metrics.inc_callback_failed()
+                return
+            elapsed = time.monotonic() - start
+            if elapsed > self.slow_threshold:
+                _LOGGER.warning("async callback [%s] - slow, took [%.3f] seconds", debug_string, elapsed)
+                if self.metrics is not None:
+                    self.metrics.inc_callback_slow()
+
+    async def join(self) -> None:
+        """Waits for the scheduled callbacks to complete"""
+        while len(self._tasks) > 0:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def stop(self, drain: bool = True) -> None:
+        """Waits for or cancels the scheduled callbacks"""
+        if drain:
+            await self.join()
+            return
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Used by objects that are not attached to an s30api_async instance
+default_runner: AsyncCallbackRunner = AsyncCallbackRunner()
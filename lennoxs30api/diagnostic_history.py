@@ -0,0 +1,160 @@
+"""Numeric history of diagnostic values"""
+# pylint: disable=line-too-long
+
+from array import array
+import math
+import time
+from typing import NamedTuple
+
+DEFAULT_DIAGNOSTIC_SERIES_SIZE: int = 1440
+# Number of one minute and one hour aggregates kept, 4 hours and a week
+DEFAULT_DIAGNOSTIC_MINUTES: int = 240
+DEFAULT_DIAGNOSTIC_HOURS: int = 168
+
+
+class DiagnosticSample(NamedTuple):
+    """Aggregate of the values in one interval"""
+
+    start: float
+    min: float
+    max: float
+    mean: float
+    count: int
+
+
+class _AggregateRing(object):
+    """Ring buffer of the min, max, sum and count of the values in consecutive intervals of interval seconds"""
+
+    __slots__ = ("interval", "capacity", "_starts", "_mins", "_maxs", "_sums", "_counts", "_last", "_count")
+
+    def __init__(self, interval: float, capacity: int):
+        self.interval = interval
+        self.capacity = capacity
+        self._starts = array("d", bytes(8 * capacity))
+        self._mins = array("d", bytes(8 * capacity))
+        self._maxs = array("d", bytes(8 * capacity))
+        self._sums = array("d", bytes(8 * capacity))
+        self._counts = array("L", bytes(array("L").itemsize * capacity))
+        # Index of the newest interval
+        self._last: int = -1
+        self._count: int = 0
+
+    def add(self, timestamp: float, value: float) -> None:
+        start = math.floor(timestamp / self.interval) * self.interval
+        index = self._last
+        # Values older than the newest interval, which only happens when the clock goes back, are added to it
+        if index == -1 or start > self._starts[index]:
+            index = self._last = (index + 1) % self.capacity
+            self._starts[index] = start
+            self._mins[index] = value
+            self._maxs[index] = value
+            self._sums[index] = value
+            self._counts[index] = 1
+            if self._count < self.capacity:
+                self._count += 1
+            return
+        if value < self._mins[index]:
+            self._mins[index] = value
+        if value > self._maxs[index]:
+            self._maxs[index] = value
+        self._sums[index] += value
+        self._counts[index] += 1
+
+    def samples(self) -> list[DiagnosticSample]:
+        first = self._last - self._count + 1
+        result = []
+        for i in range(first, first + self._count):
+            i %= self.capacity
+            count = self._counts[i]
+            result.append(DiagnosticSample(self._starts[i], self._mins[i], self._maxs[i], self._sums[i] / count, count))
+        return result
+
+
+class DiagnosticSeries(object):
+    """Ring buffer of (timestamp, value) pairs for one diagnostic, with rolling per minute and per hour aggregates.
+
+    Timestamps and values are stored as doubles in fixed size arrays, so a series never uses more than about
+    16 bytes * capacity plus 36 bytes per minute and hour aggregate however long it runs.  The aggregates are updated as values
+    are added and cover a longer time than the raw values.  Values are parsed to float once when added, values that are not
+    numeric are counted in invalid and not stored.
+    """
+
+    __slots__ = ("capacity", "invalid", "_timestamps", "_values", "_next", "_count", "_minutes", "_hours")
+
+    def __init__(self, capacity: int = DEFAULT_DIAGNOSTIC_SERIES_SIZE, minutes: int = DEFAULT_DIAGNOSTIC_MINUTES, hours: int = DEFAULT_DIAGNOSTIC_HOURS):
+        if capacity <= 0 or minutes <= 0 or hours <= 0:
+            raise ValueError(f"DiagnosticSeries - capacity [{capacity}] minutes [{minutes}] hours [{hours}] must be greater than zero")
+        self.capacity: int = capacity
+        self.invalid: int = 0
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._next: int = 0
+        self._count: int = 0
+        self._minutes = _AggregateRing(60, minutes)
+        self._hours = _AggregateRing(3600, hours)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value, timestamp: float = None) -> bool:
+        """Adds a value, returns False if the value is not numeric"""
+        if value.__class__ is float:
+            number = value
+        else:
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                self.invalid += 1
+                return False
+        if math.isnan(number):
+            self.invalid += 1
+            return False
+        if timestamp is None:
+            timestamp = time.time()
+        index = self._next
+        self._timestamps[index] = timestamp
+        self._values[index] = number
+        self._next = (index + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self._minutes.add(timestamp, number)
+        self._hours.add(timestamp, number)
+        return True
+
+    def samples(self) -> list[tuple[float, float]]:
+        """Returns the (timestamp, value) pairs, oldest first"""
+        start = (self._next - self._count) % self.capacity
+        return [(self._timestamps[(start + i) % self.capacity], self._values[(start + i) % self.capacity]) for i in range(self._count)]
+
+    def latest(self) -> float:
+        """Returns the most recent value, or None if empty"""
+        if self._count == 0:
+            return None
+        return self._values[self._next - 1]
+
+    def downsample(self, interval: float) -> list[DiagnosticSample]:
+        """Returns the min, max and mean of the raw values in each interval of interval seconds, oldest first"""
+        result: list[DiagnosticSample] = []
+        bucket = None
+        for timestamp, value in self.samples():
+            start = math.floor(timestamp / interval) * interval
+            if bucket is None or start != bucket[0]:
+                if bucket is not None:
+                    result.append(DiagnosticSample(bucket[0], bucket[1], bucket[2], bucket[3] / bucket[4], bucket[4]))
+                bucket = [start, value, value, value, 1]
+            else:
+                bucket[1] = min(bucket[1], value)
+                bucket[2] = max(bucket[2], value)
+                bucket[3] += value
+                bucket[4] += 1
+        if bucket is not None:
+            result.append(DiagnosticSample(bucket[0], bucket[1], bucket[2], bucket[3] / bucket[4], bucket[4]))
+        return result
+
+    def per_minute(self) -> list[DiagnosticSample]:
+        """Returns one sample per minute for the last minutes minutes, including values no longer in the raw buffer"""
+        return self._minutes.samples()
+
+    def per_hour(self) -> list[DiagnosticSample]:
+        """Returns one sample per hour for the last hours hours, including values no longer in the raw buffer"""
+        return self._hours.samples()
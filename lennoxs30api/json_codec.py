@@ -0,0 +1,108 @@
+"""JSON encoding and decoding using the fastest installed library.
+
+orjson is used when installed, then msgspec, otherwise the standard library json module.
+Decode errors are always raised as json.JSONDecodeError so callers need not know which backend is active.
+"""
+# pylint: disable=invalid-name
+
+import json
+from typing import Any, Callable
+
+JSONDecodeError = json.JSONDecodeError
+
+BACKEND_ORJSON = "orjson"
+BACKEND_MSGSPEC = "msgspec"
+BACKEND_JSON = "json"
+
+
+def _json_backend() -> tuple[Callable[[str | bytes], Any], Callable[[Any], str]]:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+    return json.loads, _dumps
+
+
+def _orjson_backend() -> tuple[Callable[[str | bytes], Any], Callable[[Any], str]]:
+    import orjson  # pylint: disable=import-outside-toplevel
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+    return orjson.loads, _dumps
+
+
+def _msgspec_backend() -> tuple[Callable[[str | bytes], Any], Callable[[Any], str]]:
+    import msgspec  # pylint: disable=import-outside-toplevel
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+
+    def _loads(data: str | bytes) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            doc = data if isinstance(data, str) else bytes(data).decode("utf-8", errors="replace")
+            raise JSONDecodeError(str(e), doc, 0) from e
+
+    def _dumps(obj: Any) -> str:
+        return encoder.encode(obj).decode("utf-8")
+
+    return _loads, _dumps
+
+
+_BACKENDS: dict[str, Callable[[], tuple[Callable[[str | bytes], Any], Callable[[Any], str]]]] = {
+    BACKEND_ORJSON: _orjson_backend,
+    BACKEND_MSGSPEC: _msgspec_backend,
+    BACKEND_JSON: _json_backend,
+}
+
+backend: str = None
+_loads: Callable[[str | bytes], Any] = None
+_dumps: Callable[[Any], str] = None
+
+
+def available_backends() -> list[str]:
+    """Returns the names of the backends that can be used, fastest first"""
+    result = []
+    for name, factory in _BACKENDS.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        result.append(name)
+    return result
+
+
+def set_backend(name: str = None) -> str:
+    """Selects the backend by name, or the fastest installed backend when name is None.  Returns the backend selected"""
+    global backend, _loads, _dumps  # pylint: disable=global-statement
+    names = [name] if name is not None else list(_BACKENDS)
+    for candidate in names:
+        factory = _BACKENDS.get(candidate)
+        if factory is None:
+            raise ValueError(f"json_codec unknown backend [{candidate}] must be one of [{list(_BACKENDS)}]")
+        try:
+            _loads, _dumps = factory()
+        except ImportError:
+            if name is not None:
+                raise
+            continue
+        backend = candidate
+        return backend
+    return backend
+
+
+def loads(data: str | bytes) -> Any:
+    """Decodes JSON text, raises json.JSONDecodeError on invalid input"""
+    return _loads(data)
+
+
+def dumps(obj: Any, indent: int = None) -> str:
+    """Encodes an object as compact JSON text.  The faster backends do not support indentation, so indented output uses json"""
+    if indent is not None:
+        return json.dumps(obj, indent=indent)
+    return _dumps(obj)
+
+
+set_backend()
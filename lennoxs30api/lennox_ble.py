@@ -1,14 +1,28 @@
 # pylint: disable=invalid-name
 """Bluetooth Sensors"""
 
+from .attr_map import FeatureMap
+from .callback_coalescer import CallbackCoalescer
+from .callback_runner import AsyncCallbackRunner
 from .subscriber_base import SubscriberBase
 
+_BLE_FEATURE_MAP = FeatureMap(
+    {
+        3000: "controlModelNumber",
+        3001: "controlSerialNumber",
+        3002: "controlHardwareVersion",
+        3003: "controlSoftwareVersion",
+    }
+)
+
 
 class LennoxBleInput(SubscriberBase):
     """Represents a BLE sensor value"""
 
-    def __init__(self, ble_id: int, input_id: int):
-        SubscriberBase.__init__(self)
+    __slots__ = ("ble_id", "input_id", "value", "name", "unit")
+
+    def __init__(self, ble_id: int, input_id: int, coalescer: CallbackCoalescer = None, runner: AsyncCallbackRunner = None):
+        SubscriberBase.__init__(self, coalescer, runner)
         self.ble_id = ble_id
         self.input_id = input_id
         self.value = None
@@ -30,8 +44,20 @@ class LennoxBleInput(SubscriberBase):
 class LennoxBle(SubscriberBase):
     """Represent a BLE device"""
 
-    def __init__(self, ble_id: int):
-        SubscriberBase.__init__(self)
+    __slots__ = (
+        "ble_id",
+        "deviceType",
+        "deviceName",
+        "controlModelNumber",
+        "controlSerialNumber",
+        "controlHardwareVersion",
+        "controlSoftwareVersion",
+        "commStatus",
+        "inputs",
+    )
+
+    def __init__(self, ble_id: int, coalescer: CallbackCoalescer = None, runner: AsyncCallbackRunner = None):
+        SubscriberBase.__init__(self, coalescer, runner)
         self.ble_id: int = ble_id
         self.deviceType: str = None
         self.deviceName: str = None
@@ -49,7 +75,7 @@ class LennoxBle(SubscriberBase):
     def get_or_create_ble_input(self, input_id) -> LennoxBleInput:
         """Returns exsting BLE device or creates and returns a new one"""
         if input_id not in self.inputs:
-            self.inputs[input_id] = LennoxBleInput(self.ble_id, input_id)
+            self.inputs[input_id] = LennoxBleInput(self.ble_id, input_id, self._coalescer, self._runner)
         return self.inputs[input_id]
 
     def update_from_json(self, device: dict):
@@ -67,15 +93,4 @@ class LennoxBle(SubscriberBase):
                         input_sensor = self.get_or_create_ble_input(status["vid"])
                         input_sensor.update_from_json(status)
 
-        for feature in device.get("config", {}).get("features", []):
-            fid = feature.get("feature", {}).get("fid")
-            val0 = feature["feature"]["values"][0]
-            match fid:
-                case 3000:
-                    self.attr_updater(val0, "value", "controlModelNumber")
-                case 3001:
-                    self.attr_updater(val0, "value", "controlSerialNumber")
-                case 3002:
-                    self.attr_updater(val0, "value", "controlHardwareVersion")
-                case 3003:
-                    self.attr_updater(val0, "value", "controlSoftwareVersion")
+        _BLE_FEATURE_MAP.update(self, device.get("config", {}).get("features", []))
@@ -2,8 +2,11 @@
 # pylint: disable=invalid-name
 # pylint: disable=line-too-long
 
+import math
 from typing import Final
+from .diagnostic_history import DiagnosticSeries
 from .s30exception import EC_BAD_PARAMETERS, S30Exception
+from .subscriber_base import SubscriberBase
 
 
 class lennox_equipment_diagnostic(object):
@@ -13,19 +16,56 @@ class lennox_equipment_diagnostic(object):
         self.equipment_id = equipment_id
         self.diagnostic_id = diagnostic_id
         self.value = None
+        # value parsed to float when it changes, None if it is not numeric
+        self.numeric_value: float = None
         self.name: str = None
         self.unit: str = None
         self.valid: bool = True
+        # Numeric history, when enabled with lennox_system.enable_diagnostic_history
+        self.history: DiagnosticSeries = None
+
+    def set_value(self, value) -> bool:
+        """Sets the value and its numeric form, returns True if the value changed"""
+        if value == self.value:
+            return False
+        self.value = value
+        self.numeric_value = _to_float(value)
+        return True
+
+
+def _to_float(value) -> float:
+    """Returns value as a float, or None if it is not numeric"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
 
 
 LENNOX_EQUIPMENT_PARAMETER_FORMAT_RANGE: Final = "range"
 LENNOX_EQUIPMENT_PARAMETER_FORMAT_RADIO: Final = "radio"
 
+_UNPARSED: Final = object()
+
 
 class lennox_equipment_parameter(object):
-    """Models a lennox equipment configuration parameter"""
+    """Models a lennox equipment configuration parameter.
+
+    The numeric value, the range limits and the radio text index are parsed when first used and kept until value, range_min,
+    range_max, range_inc or radio is assigned.  radio must be replaced rather than modified in place for the index to follow it.
+    """
 
     def __init__(self, equipment_id: int, pid: int):
+        # Parsed forms of the properties below, _UNPARSED until first used
+        self._numeric_value = _UNPARSED
+        self._limits = _UNPARSED
+        # Casefolded radio text -> id, replaced together with radio
+        self._radio_ids: dict[str, int] = {}
+        self._value: str = None
+        self._radio: dict[int, str] = {}
+        self._range_min: str = None
+        self._range_max: str = None
+        self._range_inc: str = None
         self.name: str = None
         self.equipment_id = equipment_id
         self.pid: int = pid
@@ -33,16 +73,73 @@ class lennox_equipment_parameter(object):
         self.descriptor: str = None
         self.enabled: bool = None
         self.format: str = None
-        self.value: str = None
-        self.radio: dict[int, str] = {}
-        self.range_min: str = None
-        self.range_max: str = None
-        self.range_inc: str = None
         self.string_max: str = None
         self.unit: str = None
 
-    def fromJson(self, js: dict):
-        """Parses parameter data from JSON"""
+    @property
+    def value(self) -> str:
+        return self._value
+
+    @value.setter
+    def value(self, value: str) -> None:
+        if value != self._value:
+            self._numeric_value = _UNPARSED
+        self._value = value
+
+    @property
+    def numeric_value(self) -> float:
+        """Returns value as a float, or None if it is not numeric"""
+        if self._numeric_value is _UNPARSED:
+            self._numeric_value = _to_float(self._value)
+        return self._numeric_value
+
+    @property
+    def range_min(self) -> str:
+        return self._range_min
+
+    @range_min.setter
+    def range_min(self, value: str) -> None:
+        if value != self._range_min:
+            self._limits = _UNPARSED
+        self._range_min = value
+
+    @property
+    def range_max(self) -> str:
+        return self._range_max
+
+    @range_max.setter
+    def range_max(self, value: str) -> None:
+        if value != self._range_max:
+            self._limits = _UNPARSED
+        self._range_max = value
+
+    @property
+    def range_inc(self) -> str:
+        return self._range_inc
+
+    @range_inc.setter
+    def range_inc(self, value: str) -> None:
+        if value != self._range_inc:
+            self._limits = _UNPARSED
+        self._range_inc = value
+
+    @property
+    def radio(self) -> dict[int, str]:
+        return self._radio
+
+    @radio.setter
+    def radio(self, radio: dict[int, str]) -> None:
+        # Both directions are built before either is replaced so they always match
+        radio_ids: dict[str, int] = {}
+        for k, v in radio.items():
+            radio_ids.setdefault(v.casefold(), k)
+        self._radio = radio
+        self._radio_ids = radio_ids
+
+    def fromJson(self, js: dict) -> bool:
+        """Parses parameter data from JSON, returns True if the parameter changed"""
+        # Full equipment refreshes repeat every parameter, the parsed fields are compared so unchanged ones can be skipped
+        before = self._state()
         self.defaultValue = js.get("defaultValue", self.defaultValue)
         self.descriptor = js.get("descriptor", self.descriptor)
         self.enabled = js.get("enabled", self.enabled)
@@ -51,11 +148,14 @@ class lennox_equipment_parameter(object):
         self.pid = js.get("pid", self.pid)
         self.value = js.get("value", self.value)
         self.unit = js.get("unit", self.unit)
+        radio_changed = False
         if "radio" in js:
             if "texts" in js["radio"]:
-                for text in js["radio"]["texts"]:
-                    if "id" in text and "text" in text:
-                        self.radio[text["id"]] = text["text"]
+                # The texts are the full list of choices, choices that are no longer sent are removed
+                radio = {text["id"]: text["text"] for text in js["radio"]["texts"] if "id" in text and "text" in text}
+                if radio != self.radio:
+                    self.radio = radio
+                    radio_changed = True
         if "range" in js:
             self.range_min = js["range"].get("min", self.range_min)
             self.range_max = js["range"].get("max", self.range_max)
@@ -63,13 +163,36 @@ class lennox_equipment_parameter(object):
 
         if "string" in js:
             self.string_max = js["string"].get("max", self.string_max)
+        return radio_changed or self._state() != before
+
+    def radio_id(self, text: str) -> int:
+        """Returns the id of a radio choice, the text is matched ignoring case, or None if it is not a choice"""
+        if text.__class__ is not str:
+            return None
+        return self._radio_ids.get(text.casefold())
+
+    def _state(self) -> tuple:
+        return (
+            self.defaultValue,
+            self.descriptor,
+            self.enabled,
+            self.format,
+            self.name,
+            self.pid,
+            self.value,
+            self.unit,
+            self.range_min,
+            self.range_max,
+            self.range_inc,
+            self.string_max,
+        )
 
     def validate_and_translate(self, value: str) -> str:
         """Validates the parameter and translates it for lennox"""
         if self.descriptor == LENNOX_EQUIPMENT_PARAMETER_FORMAT_RADIO:
-            for k, v in self.radio.items():
-                if v == value:
-                    return k
+            k = self.radio_id(value)
+            if k is not None:
+                return k
             raise S30Exception(
                 f"lennox_equipment_parameter invalid radio value provided [{value}] pid [{self.pid}] name [{self.name}] radio_value [{self.radio.values()}]",
                 EC_BAD_PARAMETERS,
@@ -78,9 +201,12 @@ class lennox_equipment_parameter(object):
         if self.descriptor == LENNOX_EQUIPMENT_PARAMETER_FORMAT_RANGE:
             try:
                 f_val = float(value)
-                f_min = float(self.range_min)
-                f_max = float(self.range_max)
-                f_inc = float(self.range_inc)
+                limits = self._limits
+                if limits is _UNPARSED:
+                    # Limits that do not parse are not kept, so the error is reported each time
+                    limits = (float(self.range_min), float(self.range_max), float(self.range_inc))
+                    self._limits = limits
+                f_min, f_max, f_inc = limits
                 if f_val < f_min or f_val > f_max:
                     raise S30Exception(
                         f"lennox_equipment_parameter invalid value provided [{value}] must be between [{self.range_min}] and [{self.range_max}] pid [{self.pid}] name [{self.name}]",
@@ -107,10 +233,22 @@ class lennox_equipment_parameter(object):
         )
 
 
-class lennox_equipment(object):
+class lennox_equipment(SubscriberBase):
     """Class to describe lennox equipment"""
 
+    __slots__ = (
+        "equipment_id",
+        "equipType",
+        "equipment_name",
+        "equipment_type_name",
+        "unit_model_number",
+        "unit_serial_number",
+        "diagnostics",
+        "parameters",
+    )
+
     def __init__(self, eq_id: int):
+        SubscriberBase.__init__(self)
         self.equipment_id: int = eq_id
         self.equipType: int = None
         self.equipment_name: str = None
@@ -120,6 +258,9 @@ class lennox_equipment(object):
         self.diagnostics: dict[int, lennox_equipment_diagnostic] = {}
         self.parameters: dict[int, lennox_equipment_parameter] = {}
 
+    def debug_string(self) -> str:
+        return f"equipment id [{self.equipment_id}]"
+
     def get_or_create_diagnostic(self, diagnostic_id) -> lennox_equipment_diagnostic:
         """Returns existing or creates new diagnostic"""
         if diagnostic_id not in self.diagnostics:
@@ -404,13 +404,10 @@ lennox_error_messages = {
 LENNOX_UNKNOWN_ALERT_MESSAGE = "unknown alert code"
 
 
+# Keyed by the integer alert code, so lookups do not construct a LennoxErrorCodes
+lennox_error_messages_by_code: dict[int, str] = {code.value: message for code, message in lennox_error_messages.items()}
+
+
 def lennox_error_get_message_from_code(code: int):
     """Returns the errors string from a error code"""
-    try:
-        x = LennoxErrorCodes(code)
-    except ValueError:
-        x = None
-    if x is not None:
-        return lennox_error_messages.get(x, LENNOX_UNKNOWN_ALERT_MESSAGE)
-    else:
-        return LENNOX_UNKNOWN_ALERT_MESSAGE
+    return lennox_error_messages_by_code.get(code, LENNOX_UNKNOWN_ALERT_MESSAGE)
@@ -2,9 +2,35 @@
 # pylint: disable=invalid-name
 # pylint: disable=line-too-long
 
+# Fields of the period message copied onto the object as is
+_PERIOD_FIELDS = frozenset(
+    ("startTime", "systemMode", "hsp", "hspC", "csp", "cspC", "sp", "spC", "humidityMode", "husp", "desp", "fanMode")
+)
+
 
 class lennox_period(object):
-    """Class to represent a schedule period"""
+    """Class to represent a schedule period.
+
+    Schedules hold many periods and nothing subscribes to them, so a period only has its fields, stored in a fixed slot
+    layout with no per object dict, weak reference or callback state.
+    """
+
+    __slots__ = (
+        "id",
+        "enabled",
+        "startTime",
+        "systemMode",
+        "hsp",
+        "hspC",
+        "csp",
+        "cspC",
+        "sp",
+        "spC",
+        "humidityMode",
+        "husp",
+        "desp",
+        "fanMode",
+    )
 
     def __init__(self, period_id):
         self.id = period_id
@@ -27,28 +53,6 @@ class lennox_period(object):
         if "enabled" in periods:
             self.enabled = periods["enabled"]
         if "period" in periods:
-            period = periods["period"]
-            if "startTime" in period:
-                self.startTime = period["startTime"]
-            if "systemMode" in period:
-                self.systemMode = period["systemMode"]
-            if "hsp" in period:
-                self.hsp = period["hsp"]
-            if "hspC" in period:
-                self.hspC = period["hspC"]
-            if "csp" in period:
-                self.csp = period["csp"]
-            if "cspC" in period:
-                self.cspC = period["cspC"]
-            if "sp" in period:
-                self.sp = period["sp"]
-            if "spC" in period:
-                self.spC = period["spC"]
-            if "humidityMode" in period:
-                self.humidityMode = period["humidityMode"]
-            if "husp" in period:
-                self.husp = period["husp"]
-            if "desp" in period:
-                self.desp = period["desp"]
-            if "fanMode" in period:
-                self.fanMode = period["fanMode"]
+            for key, value in periods["period"].items():
+                if key in _PERIOD_FIELDS:
+                    setattr(self, key, value)
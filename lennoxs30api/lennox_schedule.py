@@ -7,27 +7,29 @@ from .lennox_period import lennox_period
 class lennox_schedule(object):
     """Class for a lennox schedule"""
 
+    __slots__ = ("id", "name", "periodCount", "_periods")
+
     def __init__(self, sched_id):
         self.id = sched_id
         self.name = "<Unknown>"
         self.periodCount = -1
-        self._periods = []
+        self._periods: dict[int, lennox_period] = {}
 
     def getOrCreatePeriod(self, period_id: int) -> lennox_period:
         """Returns an existing or creates a new period"""
-        item = self.getPeriod(period_id)
-        if item is not None:
-            return item
-        item = lennox_period(period_id)
-        self._periods.append(item)
+        item = self._periods.get(period_id)
+        if item is None:
+            item = lennox_period(period_id)
+            self._periods[period_id] = item
         return item
 
     def getPeriod(self, period_id: int) -> lennox_period:
         """Returns a period by id"""
-        for item in self._periods:
-            if item.id == period_id:
-                return item
-        return None
+        return self._periods.get(period_id)
+
+    def getPeriods(self) -> list[lennox_period]:
+        """Returns the periods in the order they were created"""
+        return list(self._periods.values())
 
     def update(self, tschedule: dict) -> None:
         """Updates the schedule from a JSON dict"""
@@ -0,0 +1,168 @@
+"""Extracts the received message envelopes from debug log files so they can be replayed.
+
+Debug logs mix free text with messages logged as multi-line JSON, each starting on a line like
+
+    2022-06-27 14:17:33,595 [MainThread  ] [DEBUG]  {
+    2021-11-09 11:45:49 DEBUG (MainThread) [lennoxs30api.s30api_async] {
+
+The file is read a line at a time, so only the envelope being collected is held in memory.
+
+    python -m lennoxs30api.log_parser debug.log --capture debug.s30
+"""
+# pylint: disable=line-too-long
+
+import argparse
+import re
+from datetime import datetime
+from typing import IO, Iterator, NamedTuple
+
+from . import json_codec
+from .message_capture import COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_ZSTD, MessageCaptureWriter
+
+_TIMESTAMP = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(?:[,.](\d{1,6}))?\s")
+# JSON strings never span lines, removing them leaves only structural braces
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+
+class LogEnvelope(NamedTuple):
+    """A messages envelope and the time it was logged"""
+
+    timestamp: float
+    envelope: dict
+
+
+def _parse_timestamp(match: re.Match) -> float:
+    timestamp = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S").timestamp()
+    if match.group(2) is not None:
+        timestamp += int(match.group(2)) / 10 ** len(match.group(2))
+    return timestamp
+
+
+def _brace_depth(line: str) -> int:
+    line = _STRING.sub("", line)
+    return line.count("{") - line.count("}")
+
+
+# The bodies of requests sent to the controller are logged too, they must not be replayed as received messages
+_SENT_MESSAGE_TYPES: frozenset[str] = frozenset(["Command", "RequestData"])
+
+
+class DebugLogParser(object):
+    """Iterates over the received message envelopes in a debug log.
+
+    Messages logged on their own, as streamed retrieves are, rather than in a messages envelope are wrapped in one.
+    Commands and data requests sent to the controller are skipped and counted in sent_count.  JSON that is truncated or
+    does not decode is skipped and counted in error_count.
+    """
+
+    def __init__(self, file: IO[str]):
+        self.file = file
+        self.envelope_count: int = 0
+        self.error_count: int = 0
+        self.sent_count: int = 0
+
+    def __iter__(self) -> Iterator[LogEnvelope]:
+        lines: list[str] = None
+        depth = 0
+        timestamp: float = None
+        for line in self.file:
+            match = _TIMESTAMP.match(line)
+            if match is not None:
+                if lines is not None:
+                    # A new log record started before the JSON was complete
+                    self.error_count += 1
+                    lines = None
+                start = line.find("{", match.end())
+                if start == -1:
+                    continue
+                timestamp = _parse_timestamp(match)
+                line = line[start:]
+                lines = []
+                depth = 0
+            elif lines is None:
+                continue
+            lines.append(line)
+            depth += _brace_depth(line)
+            if depth > 0:
+                continue
+            envelope = self._decode("".join(lines))
+            lines = None
+            if envelope is not None:
+                self.envelope_count += 1
+                yield LogEnvelope(timestamp, envelope)
+        if lines is not None:
+            self.error_count += 1
+
+    def _decode(self, text: str) -> dict:
+        try:
+            data = json_codec.loads(text)
+        except json_codec.JSONDecodeError:
+            self.error_count += 1
+            return None
+        if not isinstance(data, dict):
+            return None
+        if isinstance(data.get("messages"), list):
+            return data
+        if "Data" in data:
+            if data.get("MessageType") in _SENT_MESSAGE_TYPES:
+                self.sent_count += 1
+                return None
+            return {"messages": [data]}
+        return None
+
+
+def parse_log(path: str) -> Iterator[LogEnvelope]:
+    """Yields the message envelopes in a debug log file"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from DebugLogParser(f)
+
+
+def process_log(api, path: str) -> int:
+    """Processes the messages in a debug log file with s30api_async.processMessage, returns the number of messages"""
+    count = 0
+    for entry in parse_log(path):
+        for message in entry.envelope["messages"]:
+            api.processMessage(message)
+            count += 1
+    return count
+
+
+def write_capture(path: str, writer: MessageCaptureWriter) -> int:
+    """Appends the messages in a debug log file to a capture, returns the number of messages"""
+    count = 0
+    for entry in parse_log(path):
+        for message in entry.envelope["messages"]:
+            writer.write(message, timestamp=entry.timestamp)
+            count += 1
+    return count
+
+
+_COMPRESSION = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "zstd": COMPRESSION_ZSTD}
+
+
+def main(argv: list[str] = None) -> int:
+    """Converts debug logs to a capture, or prints the envelopes as JSON lines"""
+    parser = argparse.ArgumentParser(prog="python -m lennoxs30api.log_parser", description=__doc__.splitlines()[0])
+    parser.add_argument("logs", nargs="+", help="debug log files")
+    parser.add_argument("--capture", help="append the messages to this capture file rather than printing them")
+    parser.add_argument("--compression", choices=list(_COMPRESSION), default="none")
+    args = parser.parse_args(argv)
+
+    if args.capture is None:
+        for path in args.logs:
+            for entry in parse_log(path):
+                print(json_codec.dumps({"timestamp": entry.timestamp, "envelope": entry.envelope}))
+        return 0
+
+    writer = MessageCaptureWriter(args.capture, _COMPRESSION[args.compression])
+    try:
+        for path in args.logs:
+            count = write_capture(path, writer)
+            print(f"{path}: {count} messages")
+    finally:
+        writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
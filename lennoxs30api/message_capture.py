@@ -0,0 +1,264 @@
+"""Compact append-only capture of retrieved messages for replay.
+
+A capture file starts with MAGIC followed by records.  Each record is a fixed header, the sender id and the payload:
+
+    <payload length:uint32> <timestamp:float64> <flags:uint8> <sender id length:uint16> <sender id:utf-8> <payload>
+
+The payload is the message as compact JSON, compressed with zlib or zstd when the flags indicate.  Records are only ever appended,
+a capture truncated by a crash is read up to the last complete record and the partial record is removed when it is next opened
+for writing.
+"""
+# pylint: disable=line-too-long
+
+import bisect
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, Iterator, NamedTuple
+
+from . import json_codec
+from .metrics import Metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC: bytes = b"S30CAP1\n"
+DEFAULT_CAPTURE_QUEUE_SIZE: int = 1000
+
+COMPRESSION_NONE: int = 0
+COMPRESSION_ZLIB: int = 1
+COMPRESSION_ZSTD: int = 2
+
+_RECORD_HEADER = struct.Struct("<IdBH")
+
+
+def _zstd_module():
+    try:
+        from compression import zstd  # pylint: disable=import-outside-toplevel
+
+        return zstd
+    except ImportError:
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+        return zstandard
+
+
+def _compressor(compression: int):
+    if compression == COMPRESSION_NONE:
+        return None
+    if compression == COMPRESSION_ZLIB:
+        return zlib.compress
+    if compression == COMPRESSION_ZSTD:
+        return _zstd_module().compress
+    raise ValueError(f"message capture unknown compression [{compression}]")
+
+
+def _decompressor(compression: int):
+    if compression == COMPRESSION_NONE:
+        return None
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress
+    if compression == COMPRESSION_ZSTD:
+        return _zstd_module().decompress
+    raise ValueError(f"message capture unknown compression [{compression}]")
+
+
+class CapturedMessage(NamedTuple):
+    """A message read from a capture"""
+
+    timestamp: float
+    sys_id: str
+    message: dict
+
+
+class MessageCaptureWriter(object):
+    """Appends messages to a capture file.
+
+    An existing capture is truncated to the end of its last complete record before appending, so a record left partially
+    written by a crash does not hide the records written after it.
+    """
+
+    def __init__(self, path: str, compression: int = COMPRESSION_NONE):
+        self.path = path
+        self.compression = compression
+        self._compress = _compressor(compression)
+        self.record_count: int = 0
+        self._file = _open_for_append(path)
+
+    def write(self, message: dict, sys_id: str = None, timestamp: float = None) -> None:
+        """Appends a message, the sender id is taken from the message when not specified"""
+        if sys_id is None:
+            sys_id = message.get("SenderID", message.get("SenderId", ""))
+        if timestamp is None:
+            timestamp = time.time()
+        payload = json_codec.dumps(message).encode("utf-8")
+        if self._compress is not None:
+            payload = self._compress(payload)
+        sys_id_bytes = sys_id.encode("utf-8")
+        self._file.write(_RECORD_HEADER.pack(len(payload), timestamp, self.compression, len(sys_id_bytes)) + sys_id_bytes + payload)
+        self.record_count += 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+def _open_for_append(path: str):
+    f = open(path, "a+b")  # pylint: disable=consider-using-with
+    try:
+        f.seek(0)
+        size = os.fstat(f.fileno()).st_size
+        header = f.read(len(MAGIC))
+        if size == 0 or (size < len(MAGIC) and MAGIC.startswith(header)):
+            # New file, or the crash happened while the header was written
+            end = 0
+        elif header != MAGIC:
+            raise ValueError(f"message capture [{path}] is not a capture file")
+        else:
+            end = len(MAGIC)
+            for _, _, _, end in _records(f, size):
+                pass
+        if end < size:
+            f.truncate(end)
+        if end == 0:
+            f.write(MAGIC)
+    except BaseException:
+        f.close()
+        raise
+    return f
+
+
+def _records(f, size: int) -> Iterator[tuple[int, float, str, int]]:
+    """Yields (offset, timestamp, sys_id, end) for each complete record, f must be positioned after MAGIC"""
+    offset = len(MAGIC)
+    while offset + _RECORD_HEADER.size <= size:
+        length, timestamp, _, sys_id_length = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+        end = offset + _RECORD_HEADER.size + sys_id_length + length
+        if end > size:
+            return
+        sys_id = f.read(sys_id_length).decode("utf-8")
+        f.seek(end)
+        yield offset, timestamp, sys_id, end
+        offset = end
+
+
+class QueuedMessageCaptureWriter(object):
+    """Writes messages to a MessageCaptureWriter on a background thread so capturing does not block the event loop.
+
+    Messages are redacted, encoded and written by the thread, the file is flushed whenever the queue empties.  Messages
+    beyond queue_size waiting to be written are dropped and counted in metrics.
+    """
+
+    def __init__(self, writer: MessageCaptureWriter, queue_size: int = DEFAULT_CAPTURE_QUEUE_SIZE, redact: Callable[[dict], dict] = None, metrics: Metrics = None):
+        self.writer = writer
+        self.metrics = metrics
+        self._redact = redact
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="message_capture", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> str:
+        return self.writer.path
+
+    @property
+    def record_count(self) -> int:
+        return self.writer.record_count
+
+    def write(self, message: dict, sys_id: str = None, timestamp: float = None) -> bool:
+        """Queues a message to be written, returns False if it was dropped because the queue is full"""
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            self._queue.put_nowait((message, sys_id, timestamp))
+        except queue.Full:
+            if self.metrics is not None:
+                self.metrics.inc_capture_message_drop()
+            return False
+        return True
+
+    def close(self) -> None:
+        """Writes the queued messages and closes the capture"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self.writer.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            message, sys_id, timestamp = item
+            try:
+                if sys_id is None:
+                    sys_id = message.get("SenderID", message.get("SenderId", ""))
+                if self._redact is not None:
+                    message = self._redact(message)
+                self.writer.write(message, sys_id, timestamp)
+            except Exception as e:  # pylint: disable=broad-except
+                _LOGGER.error("QueuedMessageCaptureWriter failed to write message to [%s] error [%s]", self.writer.path, e)
+            if self._queue.empty():
+                self.writer.flush()
+        self.writer.flush()
+
+
+class MessageCaptureReader(object):
+    """Reads a capture file.  The record headers are indexed on open, payloads are only read and decoded when requested"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.timestamps: list[float] = []
+        self.sys_ids: list[str] = []
+        self._offsets: list[int] = []
+        # Captures written from logs may be out of order, in which case time ranges are found by scanning
+        self.ordered: bool = True
+        self._index()
+
+    def _index(self) -> None:
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"message capture [{self.path}] is not a capture file")
+            for offset, timestamp, sys_id, _ in _records(f, os.fstat(f.fileno()).st_size):
+                if len(self.timestamps) > 0 and timestamp < self.timestamps[-1]:
+                    self.ordered = False
+                self._offsets.append(offset)
+                self.timestamps.append(timestamp)
+                self.sys_ids.append(sys_id)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __iter__(self) -> Iterator[CapturedMessage]:
+        return self.read()
+
+    def read(self, start: float = None, end: float = None, sys_id: str = None) -> Iterator[CapturedMessage]:
+        """Yields messages in capture order with a timestamp from start up to but excluding end, optionally only those from sys_id.
+        """
+        first = 0
+        last = len(self._offsets)
+        if self.ordered:
+            if start is not None:
+                first = bisect.bisect_left(self.timestamps, start)
+            if end is not None:
+                last = bisect.bisect_left(self.timestamps, end)
+        with open(self.path, "rb") as f:
+            for i in range(first, last):
+                if sys_id is not None and self.sys_ids[i] != sys_id:
+                    continue
+                if self.ordered is False and ((start is not None and self.timestamps[i] < start) or (end is not None and self.timestamps[i] >= end)):
+                    continue
+                f.seek(self._offsets[i])
+                length, timestamp, compression, sys_id_length = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+                f.seek(sys_id_length, os.SEEK_CUR)
+                payload = f.read(length)
+                decompress = _decompressor(compression)
+                if decompress is not None:
+                    payload = decompress(payload)
+                yield CapturedMessage(timestamp, self.sys_ids[i], json_codec.loads(payload))
@@ -0,0 +1,108 @@
+"""Fan-out of retrieved messages to one asyncio worker per system"""
+# pylint: disable=line-too-long
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from .metrics import Metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_DISPATCH_QUEUE_SIZE: int = 100
+
+
+class MessageDispatcher(object):
+    """Routes messages into a bounded queue per system and processes each queue on its own worker task.
+
+    A system that receives a large or frequent stream of messages is only able to delay its own
+    worker, the workers yield to the event loop between messages so other systems continue to be serviced.
+    """
+
+    def __init__(
+        self,
+        process_func: Callable[[dict], None],
+        metrics: Metrics,
+        max_queue_size: int = DEFAULT_DISPATCH_QUEUE_SIZE,
+        idle_func: Callable[[], None] = None,
+    ):
+        """idle_func: Called when a worker has processed every message in its queue"""
+        self._process_func = process_func
+        self._idle_func = idle_func
+        self._metrics = metrics
+        self.max_queue_size: int = max_queue_size
+        self._queues: dict[str, asyncio.Queue] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        self._running: bool = False
+
+    @property
+    def running(self) -> bool:
+        """Returns True when the dispatcher is accepting messages"""
+        return self._running
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns the total number of messages waiting to be processed"""
+        return sum(q.qsize() for q in self._queues.values())
+
+    def start(self) -> None:
+        """Starts accepting messages, workers are created on demand"""
+        self._running = True
+
+    def dispatch(self, sys_id: str, message: dict) -> bool:
+        """Queues a message for the system's worker.  Returns False if the message was dropped because the queue is full"""
+        queue = self._queues.get(sys_id)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._queues[sys_id] = queue
+            self._workers[sys_id] = asyncio.get_running_loop().create_task(self._worker(sys_id, queue), name=f"lennox_dispatch_{sys_id}")
+        try:
+            queue.put_nowait((time.monotonic(), message))
+        except asyncio.QueueFull:
+            self._metrics.inc_dispatch_message_drop()
+            _LOGGER.warning("MessageDispatcher queue full sysId [%s] size [%d] dropping message", sys_id, self.max_queue_size)
+            return False
+        self._metrics.set_dispatch_queue_depth(self.queue_depth)
+        return True
+
+    async def _worker(self, sys_id: str, queue: asyncio.Queue) -> None:
+        _LOGGER.debug("MessageDispatcher worker starting sysId [%s]", sys_id)
+        while True:
+            enqueue_time, message = await queue.get()
+            try:
+                self._metrics.update_dispatch_lag(time.monotonic() - enqueue_time)
+                # processMessage does not throw exceptions, but protect the worker in case it ever does.
+                self._process_func(message)
+                if self._idle_func is not None and queue.empty():
+                    self._idle_func()
+            except Exception:  # pylint: disable=broad-exception-caught
+                _LOGGER.exception("MessageDispatcher worker sysId [%s] - unexpected exception processing message", sys_id)
+            finally:
+                queue.task_done()
+                self._metrics.set_dispatch_queue_depth(self.queue_depth)
+            # Give the other system workers a chance to run
+            await asyncio.sleep(0)
+
+    async def join(self) -> None:
+        """Waits until all queued messages have been processed"""
+        for queue in list(self._queues.values()):
+            await queue.join()
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stops the workers, optionally processing the messages already queued"""
+        self._running = False
+        if drain:
+            await self.join()
+        for task in self._workers.values():
+            task.cancel()
+        for task in self._workers.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = {}
+        self._queues = {}
+        self._metrics.set_dispatch_queue_depth(0)
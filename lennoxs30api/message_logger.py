@@ -1,64 +1,112 @@
 """Modules to log messages to files"""
 # pylint: disable=line-too-long
 
+import gzip
 import logging
-import json
-import copy
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+
+from . import json_codec
+from .metrics import Metrics
 
 REDACTED: str = "**redacted**"
+DEFAULT_BACKUP_COUNT: int = 5
+DEFAULT_LOG_QUEUE_SIZE: int = 1000
+
+REDACTED_FIELDS: frozenset[str] = frozenset(
+    [
+        "streetAddress1",
+        "streetAddress2",
+        "city",
+        "country",
+        "email",
+        "firstName",
+        "lastName",
+        "tel",
+        "zip",
+        "latitude",
+        "longitude",
+        "encoded",
+        "refreshToken",
+        "macAddr",
+        "ssid",
+        "bssid",
+        "deviceKey",
+        "hvacGuid",
+        "connectionString",
+        "deviceId",
+        "ip",
+        "router",
+        "dns",
+        "subnetMask",
+        "password",
+        "oldPassword",
+        "ip4addr",
+        "ConnectionToken",
+        "ConnectionId",
+    ]
+)
 
 
 class MessageLogger(object):
     """Class to log messages"""
 
-    def __init__(self, logger=None, enabled: bool = True, message_logging_file: str = None):
+    def __init__(
+        self,
+        logger=None,
+        enabled: bool = True,
+        message_logging_file: str = None,
+        metrics: Metrics = None,
+        max_bytes: int = 0,
+        rotate_interval: float = 0,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        compress: bool = False,
+        queue_size: int = DEFAULT_LOG_QUEUE_SIZE,
+    ):
+        """When message_logging_file is specified messages are written to it by a background thread.
+        max_bytes: rotate the file when it reaches this size, 0 to disable
+        rotate_interval: rotate the file after this many seconds, 0 to disable
+        backup_count: number of rotated files to keep
+        compress: gzip rotated files
+        queue_size: messages waiting to be written beyond this are dropped and counted in metrics
+        """
+        self.metrics = metrics
+        self.message_logging_file = message_logging_file
         if message_logging_file is not None:
             self.logger_name = __name__ + "." + message_logging_file
             self.logger = logging.getLogger(self.logger_name)
             self.logger.setLevel(level=logging.DEBUG)
-            log_formatter = logging.Formatter("%(asctime)s [%(threadName)-12.12s] [%(levelname)-5.5s]  %(message)s")
             ## If the logger already exists and has a handler to write to the file then do not add another one.
-            if len(self.logger.handlers) == 0:
-                file_handler = logging.FileHandler(message_logging_file)
-                file_handler.setFormatter(log_formatter)
+            writer = _writers.get(self.logger_name)
+            if writer is None:
+                file_handler = MessageLogFileHandler(message_logging_file, max_bytes, rotate_interval, backup_count, compress)
+                file_handler.setFormatter(logging.Formatter("%(asctime)s [%(threadName)-12.12s] [%(levelname)-5.5s]  %(message)s"))
                 file_handler.setLevel(logging.DEBUG)
-                self.logger.addHandler(file_handler)
+                writer = _MessageLogWriter(self.logger, file_handler, queue_size)
+                _writers[self.logger_name] = writer
+            writer.add_reference(self)
             # When running in this mode, message should only appear in the message log and not also the default log.
             self.logger.propagate = False
         else:
             self.logger = logger
         self.enabled = enabled
-        self.redacted_fields = [
-            "streetAddress1",
-            "streetAddress2",
-            "city",
-            "country",
-            "email",
-            "firstName",
-            "lastName",
-            "tel",
-            "zip",
-            "latitude",
-            "longitude",
-            "encoded",
-            "refreshToken",
-            "macAddr",
-            "ssid",
-            "bssid",
-            "deviceKey",
-            "hvacGuid",
-            "connectionString",
-            "deviceId",
-            "ip",
-            "router",
-            "dns",
-            "subnetMask",
-            "password",
-            "oldPassword",
-            "ip4addr",
-            "ConnectionToken",
-            "ConnectionId",
-        ]
+        self.redacted_fields: frozenset[str] = REDACTED_FIELDS
+
+    def close(self) -> None:
+        """Stops the background writer once every logger sharing the file is closed, flushing queued messages"""
+        if self.message_logging_file is None:
+            return
+        writer = _writers.get(self.logger_name)
+        if writer is not None and writer.remove_reference(self):
+            del _writers[self.logger_name]
+
+    def inc_drop(self) -> None:
+        """A message was dropped because the writer queue is full"""
+        if self.metrics is not None:
+            self.metrics.inc_message_log_drop()
 
     def remove_redacted_fields(self, log_message):
         """Removes redacted fields from messages"""
@@ -67,22 +115,170 @@ class MessageLogger(object):
                 log_message[k] = self.remove_redacted_fields(v)
             elif isinstance(v, list):
                 log_message[k] = [self.remove_redacted_fields(i) for i in v]
-        for field in self.redacted_fields:
-            if field in log_message:
-                log_message[field] = REDACTED
+        for field in self.redacted_fields.intersection(log_message):
+            log_message[field] = REDACTED
         return log_message
 
+    def redact(self, obj):
+        """Returns the object with redacted fields replaced, without modifying it.
+
+        Only the dicts and lists on the path to a redacted field are copied, everything else is shared with the original.
+        """
+        if isinstance(obj, dict):
+            result = None
+            if self.redacted_fields.isdisjoint(obj) is False:
+                result = dict(obj)
+                for field in self.redacted_fields.intersection(obj):
+                    result[field] = REDACTED
+            for k, v in obj.items():
+                if isinstance(v, (dict, list)) and k not in self.redacted_fields:
+                    redacted = self.redact(v)
+                    if redacted is not v:
+                        if result is None:
+                            result = dict(obj)
+                        result[k] = redacted
+            return obj if result is None else result
+        if isinstance(obj, list):
+            result = None
+            for i, v in enumerate(obj):
+                if isinstance(v, (dict, list)):
+                    redacted = self.redact(v)
+                    if redacted is not v:
+                        if result is None:
+                            result = list(obj)
+                        result[i] = redacted
+            return obj if result is None else result
+        return obj
+
+    def format_message(self, msg, pii_in_messages: bool = False, indent: int = None) -> str:
+        """Returns the message as JSON, with PII redacted unless pii_in_messages is True"""
+        if pii_in_messages is False:
+            target_id = msg.get("TargetID") if isinstance(msg, dict) else None
+            msg = self.redact(msg)
+            if isinstance(target_id, str) and "@" in target_id:
+                msg = dict(msg)
+                msg["TargetID"] = REDACTED
+        return json_codec.dumps(msg, indent=indent)
+
+    def lazy_format(self, msg, pii_in_messages: bool = False, indent: int = None) -> "LazyMessage":
+        """Returns an object that formats the message when the log record is emitted"""
+        return LazyMessage(self, msg, pii_in_messages, indent)
+
     def log_message(self, pii_in_messages: bool, msg) -> None:
         """Logs a message"""
         if self.logger is None or self.enabled is False or self.logger.isEnabledFor(logging.DEBUG) is False:
             return
+        self.logger.debug("%s", LazyMessage(self, msg, pii_in_messages))
 
-        if pii_in_messages is False:
-            log_message = copy.deepcopy(msg)
-            if "TargetID" in log_message:
-                if "@" in log_message["TargetID"]:
-                    log_message["TargetID"] = REDACTED
-            log_message = self.remove_redacted_fields(log_message)
-        else:
-            log_message = msg
-        self.logger.debug(json.dumps(log_message, indent=4))
+
+class LazyMessage(object):
+    """Log argument that formats a message only if a handler emits the record"""
+
+    __slots__ = ("message_logger", "msg", "pii_in_messages", "indent")
+
+    def __init__(self, message_logger: MessageLogger, msg, pii_in_messages: bool, indent: int = None):
+        self.message_logger = message_logger
+        self.msg = msg
+        self.pii_in_messages = pii_in_messages
+        self.indent = indent
+
+    def __str__(self) -> str:
+        return self.message_logger.format_message(self.msg, self.pii_in_messages, self.indent)
+
+
+class MessageLogFileHandler(logging.handlers.RotatingFileHandler):
+    """File handler that rotates on size and elapsed time, optionally compressing the rotated files"""
+
+    def __init__(self, filename: str, max_bytes: int = 0, rotate_interval: float = 0, backup_count: int = DEFAULT_BACKUP_COUNT, compress: bool = False):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.rotate_interval = rotate_interval
+        self.rollover_at = time.time() + rotate_interval if rotate_interval > 0 else None
+        if compress:
+            self.namer = _gzip_namer
+            self.rotator = _gzip_rotator
+
+    def shouldRollover(self, record) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        if self.rollover_at is not None:
+            self.rollover_at = time.time() + self.rotate_interval
+
+
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records when the bounded queue is full rather than blocking the caller.
+
+    The queue is checked for room before any work is done on the record.  The message is then redacted and encoded to text
+    on the caller's thread, so the queued record holds only text and not the message, which may be changed once it is
+    logged.  Adding the timestamp and writing to the file is left to the listener thread.
+    """
+
+    def emit(self, record) -> None:
+        message_logger = _emitter(record)
+        if self.queue.full():
+            _count_drop(message_logger)
+            return
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _count_drop(message_logger)
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+
+def _emitter(record: logging.LogRecord) -> MessageLogger:
+    if isinstance(record.args, tuple) and len(record.args) > 0 and isinstance(record.args[0], LazyMessage):
+        return record.args[0].message_logger
+    return None
+
+
+def _count_drop(message_logger: MessageLogger) -> None:
+    # Only the logger that emitted the record counts the drop, the file may be shared by the loggers of several systems
+    if message_logger is not None:
+        message_logger.inc_drop()
+
+
+class _MessageLogWriter(object):
+    """Writes a message log file on a background thread, shared by all MessageLoggers using the file"""
+
+    def __init__(self, logger: logging.Logger, file_handler: logging.Handler, queue_size: int):
+        self.logger = logger
+        self.file_handler = file_handler
+        self.queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.queue_handler.setLevel(logging.DEBUG)
+        self.listener = logging.handlers.QueueListener(self.queue_handler.queue, file_handler, respect_handler_level=True)
+        self.message_loggers: list[MessageLogger] = []
+        self.logger.addHandler(self.queue_handler)
+        self.listener.start()
+
+    def add_reference(self, message_logger: MessageLogger) -> None:
+        self.message_loggers.append(message_logger)
+
+    def remove_reference(self, message_logger: MessageLogger) -> bool:
+        """Removes the message logger, stopping the writer and returning True when it was the last one"""
+        if message_logger in self.message_loggers:
+            self.message_loggers.remove(message_logger)
+        if len(self.message_loggers) > 0:
+            return False
+        self.logger.removeHandler(self.queue_handler)
+        self.listener.stop()
+        self.file_handler.close()
+        return True
+
+
+_writers: dict[str, _MessageLogWriter] = {}
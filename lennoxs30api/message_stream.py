@@ -0,0 +1,113 @@
+"""Incremental decoding of the messages array in a retrieve response"""
+# pylint: disable=line-too-long
+
+import codecs
+import json
+import re
+
+from . import json_codec
+
+# Characters that change the structure of the document when outside of a string
+_STRUCTURE = re.compile(r'[{}\[\]"]')
+# Characters that end a string or escape the following character
+_STRING_SPECIAL = re.compile(r'["\\]')
+_MESSAGES_KEY = re.compile(r'"messages"\s*:\s*$')
+
+
+class MessageStreamDecoder(object):
+    """Decodes a retrieve response of the form {"messages": [ {...}, {...} ]} as it arrives.
+
+    Data is supplied in chunks using feed(), which returns each message that has been completely received.
+    Each chunk is scanned once and only the text of the message currently being received is held, so memory
+    use is bounded by the largest message rather than the whole response.
+    """
+
+    def __init__(self, loads=json_codec.loads):
+        self._loads = loads
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._depth: int = 0
+        self._in_string: bool = False
+        self._escape: bool = False
+        self._array_depth: int = None
+        self._element_parts: list[str] = None
+        # Text preceding the current chunk, used to locate the messages key
+        self._tail: str = ""
+        self.done: bool = False
+        self.message_count: int = 0
+
+    def feed(self, data: bytes | str) -> list[dict]:
+        """Adds data to the decoder and returns the messages completed by it"""
+        if isinstance(data, bytes):
+            data = self._utf8.decode(data)
+        if self.done or len(data) == 0:
+            return []
+        messages = []
+        end = len(data)
+        pos = 0
+        element_start = 0
+        if self._escape:
+            # The previous chunk ended with a backslash inside a string, skip the escaped character
+            self._escape = False
+            pos = 1
+        while pos < end:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(data, pos)
+                if match is None:
+                    pos = end
+                    break
+                idx = match.start()
+                if data[idx] == "\\":
+                    if idx + 1 >= end:
+                        self._escape = True
+                        pos = end
+                        break
+                    pos = idx + 2
+                    continue
+                self._in_string = False
+                pos = idx + 1
+                continue
+
+            match = _STRUCTURE.search(data, pos)
+            if match is None:
+                pos = end
+                break
+            idx = match.start()
+            char = data[idx]
+            pos = idx + 1
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._array_depth is None:
+                    if char == "[" and self._depth == 1:
+                        prefix = data[max(0, idx - 64) : idx]
+                        if idx < 64:
+                            prefix = self._tail + prefix
+                        if _MESSAGES_KEY.search(prefix):
+                            self._array_depth = self._depth + 1
+                elif self._depth == self._array_depth and self._element_parts is None:
+                    self._element_parts = []
+                    element_start = idx
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._array_depth is None:
+                    continue
+                if self._depth == self._array_depth and self._element_parts is not None:
+                    self._element_parts.append(data[element_start:pos])
+                    messages.append(self._loads("".join(self._element_parts)))
+                    self.message_count += 1
+                    self._element_parts = None
+                elif self._depth < self._array_depth:
+                    self.done = True
+                    break
+
+        if self._element_parts is not None:
+            self._element_parts.append(data[element_start:])
+        if self._array_depth is None:
+            self._tail = (self._tail + data[-64:])[-64:]
+        return messages
+
+    def close(self) -> None:
+        """Verifies the complete messages array was received"""
+        if self.done is False:
+            raise json.JSONDecodeError("incomplete messages array", self._tail, 0)
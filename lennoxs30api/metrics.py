@@ -29,6 +29,16 @@ class Metrics:
         self.sender_message_drop: int = 0
         self.bytes_in: int = 0
         self.bytes_out: int = 0
+        self.dispatch_queue_depth: int = 0
+        self.dispatch_queue_max_depth: int = 0
+        self.dispatch_message_drop: int = 0
+        self.dispatch_lag_last: float = None
+        self.dispatch_lag_max: float = None
+        self.message_log_drop: int = 0
+        self.capture_message_drop: int = 0
+        self.callback_slow: int = 0
+        self.callback_failed: int = 0
+        self.callback_timeout: int = 0
 
     def reset(self) -> None:
         """Reset the metrics"""
@@ -53,6 +63,16 @@ class Metrics:
         self.sender_message_drop = 0
         self.bytes_in = 0
         self.bytes_out = 0
+        self.dispatch_queue_depth = 0
+        self.dispatch_queue_max_depth = 0
+        self.dispatch_message_drop = 0
+        self.dispatch_lag_last = None
+        self.dispatch_lag_max = None
+        self.message_log_drop = 0
+        self.capture_message_drop = 0
+        self.callback_slow = 0
+        self.callback_failed = 0
+        self.callback_timeout = 0
 
     def now(self) -> datetime:
         """Returns the localized datetime"""
@@ -80,6 +100,16 @@ class Metrics:
             "last_message_time": self.last_message_time,
             "sender_message_drop": self.sender_message_drop,
             "sibling_message_drop": self.sibling_message_drop,
+            "dispatch_queue_depth": self.dispatch_queue_depth,
+            "dispatch_queue_max_depth": self.dispatch_queue_max_depth,
+            "dispatch_message_drop": self.dispatch_message_drop,
+            "dispatch_lag_last": self.dispatch_lag_last,
+            "dispatch_lag_max": self.dispatch_lag_max,
+            "message_log_drop": self.message_log_drop,
+            "capture_message_drop": self.capture_message_drop,
+            "callback_slow": self.callback_slow,
+            "callback_failed": self.callback_failed,
+            "callback_timeout": self.callback_timeout,
         }
 
     def inc_message_count(self) -> None:
@@ -137,6 +167,42 @@ class Metrics:
         """Increment sender message drops"""
         self.sender_message_drop += 1
 
+    def inc_dispatch_message_drop(self) -> None:
+        """Increment messages dropped due to a full dispatch queue"""
+        self.dispatch_message_drop += 1
+
+    def set_dispatch_queue_depth(self, depth: int) -> None:
+        """Record the current dispatch queue depth"""
+        self.dispatch_queue_depth = depth
+        if depth > self.dispatch_queue_max_depth:
+            self.dispatch_queue_max_depth = depth
+
+    def update_dispatch_lag(self, lag: float) -> None:
+        """Record the seconds a message waited in the dispatch queue"""
+        self.dispatch_lag_last = lag
+        if self.dispatch_lag_max is None or lag > self.dispatch_lag_max:
+            self.dispatch_lag_max = lag
+
+    def inc_message_log_drop(self) -> None:
+        """Increment messages dropped because the message log writer could not keep up"""
+        self.message_log_drop += 1
+
+    def inc_capture_message_drop(self) -> None:
+        """Increment messages dropped because the message capture writer could not keep up"""
+        self.capture_message_drop += 1
+
+    def inc_callback_slow(self) -> None:
+        """Increment async callbacks that took longer than the slow threshold"""
+        self.callback_slow += 1
+
+    def inc_callback_failed(self) -> None:
+        """Increment async callbacks that raised an exception"""
+        self.callback_failed += 1
+
+    def inc_callback_timeout(self) -> None:
+        """Increment async callbacks cancelled for taking too long"""
+        self.callback_timeout += 1
+
     def process_http_code(self, http_code: int) -> None:
         """Process http return cord and increments appropriate counters"""
         if http_code >= 200 and http_code <= 299:
@@ -0,0 +1,96 @@
+"""Adaptive scheduling of message retrieval polls"""
+# pylint: disable=line-too-long
+
+import asyncio
+import time
+
+DEFAULT_POLL_INTERVAL: float = 1.0
+DEFAULT_MAX_POLL_INTERVAL: float = 15.0
+DEFAULT_FAST_POLL_INTERVAL: float = 0.25
+DEFAULT_FAST_POLL_DURATION: float = 10.0
+DEFAULT_MIN_BATCH_SIZE: int = 10
+DEFAULT_MAX_BATCH_SIZE: int = 100
+
+
+class PollScheduler(object):
+    """Decides how many messages to request and how long to wait before the next retrieve.
+
+    - When a retrieve returns a full batch, more messages are likely waiting so the batch size is doubled and the next poll is immediate.
+    - When a retrieve returns no messages the delay backs off exponentially up to max_poll_interval.  Long polling connections
+      have already waited on the server, so they poll again immediately.
+    - After a command is published, polls run at fast_poll_interval for fast_poll_duration so the resulting state change arrives quickly.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+        fast_poll_interval: float = DEFAULT_FAST_POLL_INTERVAL,
+        fast_poll_duration: float = DEFAULT_FAST_POLL_DURATION,
+        min_batch_size: int = DEFAULT_MIN_BATCH_SIZE,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        long_polling: bool = False,
+    ):
+        self.poll_interval: float = poll_interval
+        self.max_poll_interval: float = max_poll_interval
+        self.fast_poll_interval: float = fast_poll_interval
+        self.fast_poll_duration: float = fast_poll_duration
+        self.min_batch_size: int = min_batch_size
+        self.max_batch_size: int = max_batch_size
+        self.long_polling: bool = long_polling
+        self.batch_size: int = min_batch_size
+        self.delay: float = poll_interval
+        self._fast_poll_until: float = 0.0
+        self._wakeup: asyncio.Event = None
+
+    def reset(self) -> None:
+        """Return to the initial batch size and delay"""
+        self.batch_size = self.min_batch_size
+        self.delay = self.poll_interval
+        self._fast_poll_until = 0.0
+
+    def record_messages(self, message_count: int) -> None:
+        """Adjusts the batch size and delay based on the number of messages the last retrieve returned"""
+        if message_count >= self.batch_size:
+            self.batch_size = min(self.batch_size * 2, self.max_batch_size)
+            self.delay = 0.0
+        elif message_count > 0:
+            if message_count <= self.batch_size // 2:
+                self.batch_size = max(self.batch_size // 2, self.min_batch_size)
+            self.delay = 0.0 if self.long_polling else self.poll_interval
+        else:
+            self.batch_size = self.min_batch_size
+            if self.long_polling:
+                self.delay = 0.0
+            else:
+                self.delay = min(max(self.delay * 2, self.poll_interval), self.max_poll_interval)
+
+    def notify_publish(self) -> None:
+        """A command was sent, poll quickly for the next little while and wake up any pending wait"""
+        self._fast_poll_until = time.monotonic() + self.fast_poll_duration
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    @property
+    def fast_polling(self) -> bool:
+        """Returns True while polling fast after a publish"""
+        return time.monotonic() < self._fast_poll_until
+
+    def next_delay(self) -> float:
+        """Returns the number of seconds to wait before the next retrieve"""
+        if self.fast_polling:
+            return min(self.delay, self.fast_poll_interval)
+        return self.delay
+
+    async def wait(self) -> None:
+        """Sleeps until the next retrieve is due, returns early if a command is published"""
+        delay = self.next_delay()
+        if delay <= 0:
+            return
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
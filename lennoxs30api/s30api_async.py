@@ -28,6 +28,7 @@ v0.2.0 - Initial Release
 
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
 import logging
 import json
@@ -39,14 +40,24 @@ from urllib.parse import quote
 from aiohttp import ClientTimeout, ClientSession
 
 
-from . import __version__
+from . import __version__, json_codec
+from .alert_store import ActiveAlertStore, AlertEvent, AlertHistory
+from .attr_map import AttrMap, FeatureMap
+from .callback_coalescer import CallbackCoalescer
+from .callback_registry import CallbackRegistry
+from .callback_runner import DEFAULT_CALLBACK_CONCURRENCY, DEFAULT_CALLBACK_TIMEOUT, AsyncCallbackRunner
+from .diagnostic_history import DEFAULT_DIAGNOSTIC_SERIES_SIZE, DiagnosticSeries
 from .lennox_ble import LennoxBle
-from .lennox_errors import lennox_error_get_message_from_code, LennoxErrorCodes
+from .lennox_errors import LennoxErrorCodes
 from .lennox_equipment import lennox_equipment, lennox_equipment_diagnostic
 from .lennox_home import lennox_home
 from .lennox_schedule import lennox_schedule
 from .metrics import Metrics
-from .message_logger import MessageLogger
+from .message_capture import COMPRESSION_NONE, MessageCaptureReader, MessageCaptureWriter, QueuedMessageCaptureWriter
+from .message_dispatcher import DEFAULT_DISPATCH_QUEUE_SIZE, MessageDispatcher
+from .message_logger import DEFAULT_BACKUP_COUNT, MessageLogger
+from .message_stream import MessageStreamDecoder
+from .poll_scheduler import PollScheduler
 from .s30exception import (
     EC_AUTHENTICATE,
     EC_BAD_PARAMETERS,
@@ -65,6 +76,7 @@ from .s30exception import (
     S30Exception,
     s30exception_from_comm_exception,
 )
+from .subscriber_base import SubscriberBase
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -274,6 +286,13 @@ class s30api_async(object):
         message_logging_file=None,
         timeout: int = None,
         long_poll_delay: int = None,
+        stream_messages: bool = False,
+        message_logging_max_bytes: int = 0,
+        message_logging_rotate_interval: float = 0,
+        message_logging_backup_count: int = DEFAULT_BACKUP_COUNT,
+        message_logging_compress: bool = False,
+        callback_concurrency: int = DEFAULT_CALLBACK_CONCURRENCY,
+        callback_timeout: float = DEFAULT_CALLBACK_TIMEOUT,
     ):
         """Initialize the API interface.
         username: The user name to login with when using a cloud connection
@@ -283,16 +302,34 @@ class s30api_async(object):
         protocol: The protocol to use.  Set to http when using the simulator, else should be https
         pii_message_logs: Indicates if personal information should be redacted from the message logs.
         message_debug_logging:  Indicates if messages should be include when debug logging
-        message_logging_file:  When specified messages will be logged to this file only.
+        message_logging_file:  When specified messages will be logged to this file only, written by a background thread.
+        message_logging_max_bytes: Rotate the message logging file when it reaches this size, 0 to disable.
+        message_logging_rotate_interval: Rotate the message logging file after this many seconds, 0 to disable.
+        message_logging_backup_count: The number of rotated message logging files to keep.
+        message_logging_compress: When True rotated message logging files are gzipped.
+        callback_concurrency: The maximum number of coroutine callbacks that run at once.
+        callback_timeout: Coroutine callbacks running longer than this many seconds are cancelled.
+        stream_messages: When True retrieved messages are decoded and processed as they arrive rather than after the entire response is read.
         """
         _LOGGER.info("s30api_async init version %s", __version__)
         self._username = username
         self._password = password
         self._protocol = protocol
         self._pii_message_logs = pii_message_logs
-        self.message_log = MessageLogger(_LOGGER, message_debug_logging, message_logging_file)
+        self.metrics: Metrics = Metrics()
+        self.message_log = MessageLogger(
+            _LOGGER,
+            message_debug_logging,
+            message_logging_file,
+            metrics=self.metrics,
+            max_bytes=message_logging_max_bytes,
+            rotate_interval=message_logging_rotate_interval,
+            backup_count=message_logging_backup_count,
+            compress=message_logging_compress,
+        )
         self.timeout: int = 300 if timeout is None else timeout
         self.long_poll_delay: int = 15 if long_poll_delay is None else long_poll_delay
+        self.stream_messages: bool = stream_messages
         # Generate a unique app id, following the existing formatting
         if app_id is None:
             dt = datetime.now()
@@ -313,20 +350,29 @@ class s30api_async(object):
             self.isLANConnection = True
             self.ssl = _SSL_CONTEXT
             self.initialize_urls_local()
+        # Local connections long poll on the controller, cloud connections poll and back off when idle.
+        self.poll_scheduler: PollScheduler = PollScheduler(long_polling=self.isLANConnection)
 
         self._publishMessageId: int = 1
         self._session: ClientSession = None
-        self.metrics: Metrics = Metrics()
         self.loginBearerToken = None
         self.authBearerToken = None
         self._homeList: List[lennox_home] = []
         self.system_list: List["lennox_system"] = []
+        # Indexes to find the system for a message without scanning the system list
+        self._systemDict: dict[str, "lennox_system"] = {}
+        self._siblingDict: dict[str, "lennox_system"] = {}
+        self._systemsNotInitialized: int = 0
         self._badSenderDict: dict = {}
         self.loginToken: str = None
         self._connectionId = None
         self._connectionToken: str = None
         self._tryWebsockets = None
         self._streamURL: str = None
+        self._dispatcher: MessageDispatcher = None
+        self._capture: QueuedMessageCaptureWriter = None
+        self.callback_coalescer: CallbackCoalescer = CallbackCoalescer()
+        self.callback_runner: AsyncCallbackRunner = AsyncCallbackRunner(self.metrics, callback_concurrency, callback_timeout)
 
     def initialize_urls_cloud(self):
         self.url_authenticate: str = CLOUD_AUTHENTICATE_URL
@@ -361,9 +407,13 @@ class s30api_async(object):
         return self._applicationid + "_" + self._username
 
     async def shutdown(self) -> None:
+        await self.stop_message_dispatcher()
+        await self.callback_runner.stop()
         if self._session is not None and self.isLANConnection is True or self.loginBearerToken is not None:
             await self.logout()
         await self._close_session()
+        self.stop_message_capture()
+        self.message_log.close()
 
     async def logout(self) -> None:
         _LOGGER.info(f"logout - Entering - [{self.url_logout}]")
@@ -705,7 +755,7 @@ class s30api_async(object):
             }
             params = {
                 "Direction": "Oldest-to-Newest",
-                "MessageCount": "10",
+                "MessageCount": str(self.poll_scheduler.batch_size),
                 "StartTime": "1",
             }
             if self.isLANConnection:
@@ -715,21 +765,30 @@ class s30api_async(object):
 
             resp = await self.get(url, headers=headers, params=params)
             self.metrics.inc_receive_bytes(resp.content_length)
-            if resp.status == 200:
+            if resp.status == 200 and self.stream_messages:
+                message_count = await self._streamMessages(resp)
+                self.poll_scheduler.record_messages(message_count)
+                self._flushBatchCallbacks()
+                if message_count == 0:
+                    return False
+            elif resp.status == 200:
                 resp_txt = await resp.text()
                 try:
-                    resp_json = json.loads(resp_txt)
+                    resp_json = json_codec.loads(resp_txt)
                 except json.decoder.JSONDecodeError as e:
                     _LOGGER.exception("messagePump - JSON decode error - message to follow")
                     _LOGGER.error(resp_txt)
                     raise S30Exception("messagePump failed due to JSON decode error", EC_COMMS_ERROR, 8) from e
+                self.poll_scheduler.record_messages(len(resp_json["messages"]))
                 if len(resp_json["messages"]) == 0:
                     return False
                 self.message_logger(resp_json)
                 for message in resp_json["messages"]:
                     # This method does not throw exceptions.
-                    self.processMessage(message)
+                    self._dispatchMessage(message)
+                self._flushBatchCallbacks()
             elif resp.status == 204:
+                self.poll_scheduler.record_messages(0)
                 return False
             else:
                 err_msg = f"messagePump response http_code [{resp.status}]"
@@ -752,13 +811,135 @@ class s30api_async(object):
             _LOGGER.exception("messagePump - unexpected exception - please raise an issue to track")
             raise S30Exception("messagePump failed due to unexpected exception", EC_COMMS_ERROR, 7) from e
 
-    def processMessage(self, message):
-        self.metrics.inc_message_count()
+    async def _streamMessages(self, resp) -> int:
+        # Decodes the messages array from the response body as it arrives and processes each message once it is complete
+        decoder = MessageStreamDecoder()
+        try:
+            async for chunk in resp.content.iter_any():
+                for message in decoder.feed(chunk):
+                    self.message_logger(message)
+                    # This method does not throw exceptions.
+                    self._dispatchMessage(message)
+            decoder.close()
+        except json.decoder.JSONDecodeError as e:
+            _LOGGER.exception("messagePump - JSON decode error streaming messages [%d] messages processed", decoder.message_count)
+            raise S30Exception("messagePump failed due to JSON decode error", EC_COMMS_ERROR, 8) from e
+        return decoder.message_count
+
+    async def wait_for_next_poll(self) -> None:
+        """Sleeps until the poll scheduler indicates messagePump should be called again"""
+        await self.poll_scheduler.wait()
+
+    def start_message_dispatcher(self, max_queue_size: int = DEFAULT_DISPATCH_QUEUE_SIZE) -> None:
+        """Process retrieved messages on a worker task per system rather than inline in messagePump.
+        max_queue_size: The number of messages that may be waiting for a system before messages are dropped
+        """
+        if self._dispatcher is not None and self._dispatcher.running:
+            return
+        _LOGGER.info("start_message_dispatcher max_queue_size [%d]", max_queue_size)
+        self._dispatcher = MessageDispatcher(self.processMessage, self.metrics, max_queue_size, idle_func=self._flushBatchCallbacks)
+        self._dispatcher.start()
+
+    async def stop_message_dispatcher(self, drain: bool = True) -> None:
+        """Stop the message dispatcher and return to processing messages inline in messagePump"""
+        if self._dispatcher is None:
+            return
+        dispatcher = self._dispatcher
+        self._dispatcher = None
+        await dispatcher.stop(drain=drain)
+
+    async def join_message_dispatcher(self) -> None:
+        """Waits for the message dispatcher to process all queued messages"""
+        if self._dispatcher is not None:
+            await self._dispatcher.join()
+
+    def _getSenderId(self, message) -> str:
         # LAN message and cloud message uses different capitalization.
         if "SenderID" in message:
-            sysId = message["SenderID"]
-        else:
-            sysId = message["SenderId"]
+            return message["SenderID"]
+        return message["SenderId"]
+
+    def start_message_capture(self, path: str, compression: int = COMPRESSION_NONE, redact: bool = None) -> None:
+        """Append every retrieved message to a capture file that can be replayed with replay().
+        Messages are written by a background thread.
+        compression: COMPRESSION_NONE, COMPRESSION_ZLIB or COMPRESSION_ZSTD (requires zstandard)
+        redact: Replace personal information with a placeholder, defaults to not pii_message_logs.  Fields such as the wifi
+        addresses are then set to the placeholder when the capture is replayed.
+        """
+        self.stop_message_capture()
+        if redact is None:
+            redact = not self._pii_message_logs
+        _LOGGER.info("start_message_capture path [%s] compression [%d] redact [%s]", path, compression, redact)
+        self._capture = QueuedMessageCaptureWriter(
+            MessageCaptureWriter(path, compression), redact=self.message_log.redact if redact else None, metrics=self.metrics
+        )
+
+    def stop_message_capture(self) -> None:
+        """Stop capturing messages and close the capture file"""
+        if self._capture is None:
+            return
+        _LOGGER.info("stop_message_capture path [%s] messages [%d]", self._capture.path, self._capture.record_count)
+        self._capture.close()
+        self._capture = None
+
+    async def replay(self, path: str, realtime: bool = False, start: float = None, end: float = None, sys_id: str = None) -> int:
+        """Processes the messages in a capture file, returns the number of messages processed.
+        realtime: When True messages are processed with their original spacing, otherwise as fast as possible
+        start, end, sys_id: Only replay messages captured in the time range or from the sender
+        """
+        reader = MessageCaptureReader(path)
+        count = 0
+        previous: float = None
+        for captured in reader.read(start=start, end=end, sys_id=sys_id):
+            if realtime and previous is not None and captured.timestamp > previous:
+                await asyncio.sleep(captured.timestamp - previous)
+            previous = captured.timestamp
+            self.processMessage(captured.message)
+            count += 1
+            # Let other tasks run while replaying large captures
+            await asyncio.sleep(0)
+        self._flushBatchCallbacks()
+        return count
+
+    def start_callback_coalescing(self, window: float = None) -> None:
+        """Deliver update callbacks once per batch rather than once per message.
+        Each subscriber is called once with all the properties that changed, diagnostic and parameter callbacks receive the latest value.
+        window: When specified callbacks are delivered this many seconds after the first change, otherwise at the end of each retrieve
+        """
+        _LOGGER.info("start_callback_coalescing window [%s]", window)
+        self.callback_coalescer.enable(window)
+
+    def stop_callback_coalescing(self) -> None:
+        """Deliver pending callbacks and return to calling callbacks as each message is processed"""
+        self.callback_coalescer.disable()
+
+    def flush_callbacks(self) -> int:
+        """Deliver pending callbacks now, returns the number of subscribers flushed"""
+        return self.callback_coalescer.flush()
+
+    def _flushBatchCallbacks(self) -> None:
+        if self.callback_coalescer.enabled and self.callback_coalescer.window is None:
+            if self._dispatcher is not None and self._dispatcher.queue_depth > 0:
+                # The dispatcher flushes once its queues are empty
+                return
+            self.callback_coalescer.flush()
+
+    def _dispatchMessage(self, message) -> None:
+        if self._capture is not None:
+            self._capture.write(message)
+        if self._dispatcher is None:
+            self.processMessage(message)
+            return
+        sysId = self._getSenderId(message)
+        # Messages from siblings and unknown senders are dropped by processMessage, there is no need to queue them.
+        if self.getSystem(sysId) is None:
+            self.processMessage(message)
+            return
+        self._dispatcher.dispatch(sysId, message)
+
+    def processMessage(self, message):
+        self.metrics.inc_message_count()
+        sysId = self._getSenderId(message)
         system = self.getSystem(sysId)
         if system is not None:
             system.processMessage(message)
@@ -768,26 +949,29 @@ class s30api_async(object):
                 if self.allSystemsInitialized is True:
                     self.metrics.inc_sender_message_drop()
                     if sysId in self._badSenderDict:
-                        _LOGGER.debug(f"processMessage dropping messages from unknown SenderId/SystemId [{sysId}]")
+                        _LOGGER.debug("processMessage dropping messages from unknown SenderId/SystemId [%s]", sysId)
                     else:
                         _LOGGER.error(
-                            f"processMessage dropping message from unknown SenderId/SystemId [{sysId}] - please consult https://github.com/PeteRager/lennoxs30/blob/master/docs/sibling.md for configuration assistance"
+                            "processMessage dropping message from unknown SenderId/SystemId [%s] - please consult https://github.com/PeteRager/lennoxs30/blob/master/docs/sibling.md for configuration assistance",
+                            sysId,
                         )
-                        _LOGGER.error(json.dumps(message, indent=4))
+                        _LOGGER.error(json_codec.dumps(message, indent=4))
                         self._badSenderDict[sysId] = sysId
                 else:
                     _LOGGER.debug(
-                        f"processMessage ignoring messages from unknown SenderId/SystemId [{sysId}] because systems are not initialized"
+                        "processMessage ignoring messages from unknown SenderId/SystemId [%s] because systems are not initialized", sysId
                     )
             else:
                 self.metrics.inc_sibling_message_drop()
                 if self.metrics.sibling_message_drop == 1:
                     _LOGGER.warning(
-                        f"processMessage dropping message from sibling [{sysId}] for system [{system.sysId}] - please consult https://github.com/PeteRager/lennoxs30/blob/master/docs/sibling.md for configuration assistance"
+                        "processMessage dropping message from sibling [%s] for system [%s] - please consult https://github.com/PeteRager/lennoxs30/blob/master/docs/sibling.md for configuration assistance",
+                        sysId,
+                        system.sysId,
                     )
-                    _LOGGER.warning(json.dumps(message, indent=4))
+                    _LOGGER.warning(json_codec.dumps(message, indent=4))
                 else:
-                    _LOGGER.debug(f"processMessage dropping message from sibling [{sysId}] for system [{system.sysId}]")
+                    _LOGGER.debug("processMessage dropping message from sibling [%s] for system [%s]", sysId, system.sysId)
 
     # Messages seem to use unique GUIDS, here we create one
     def getNewMessageID(self):
@@ -814,7 +998,7 @@ class s30api_async(object):
             body += additionalParameters
             body += "}"
 
-            jsbody = json.loads(body)
+            jsbody = json_codec.loads(body)
             self.message_logger(jsbody)
             resp = await self.post(url, headers=headers, data=body)
             if resp.status == 200:
@@ -852,33 +1036,42 @@ class s30api_async(object):
             ) from e
 
     def getSystem(self, sysId) -> "lennox_system":
-        for system in self.system_list:
-            if system.sysId == sysId:
-                return system
-        return None
+        return self._systemDict.get(sysId)
 
     def getSystemSibling(self, sysId: str) -> lennox_system:
-        for system in self.system_list:
-            for sibling in system.siblings:
-                if sibling.sibling_identifier == sysId:
-                    return system
-        return None
+        return self._siblingDict.get(sysId)
 
     @property
     def allSystemsInitialized(self) -> bool:
-        for system in self.system_list:
-            if system.systemMessageProcessed is False:
-                return False
-        return True
+        return self._systemsNotInitialized == 0
 
     def getOrCreateSystem(self, sysId: str) -> "lennox_system":
         system = self.getSystem(sysId)
         if system is not None:
             return system
         system = lennox_system(sysId)
+        system.api = self
         self.system_list.append(system)
+        self._systemDict[sysId] = system
+        if system.systemMessageProcessed is False:
+            self._systemsNotInitialized += 1
         return system
 
+    def _systemInitializedChanged(self, initialized: bool) -> None:
+        # Called by lennox_system when systemMessageProcessed changes value
+        if initialized is True:
+            self._systemsNotInitialized -= 1
+        else:
+            self._systemsNotInitialized += 1
+
+    def _updateSiblingIndex(self, system: "lennox_system") -> None:
+        # Called by lennox_system when its siblings change
+        for sibling_id in [k for k, v in self._siblingDict.items() if v is system]:
+            del self._siblingDict[sibling_id]
+        for sibling in system.siblings:
+            if sibling.sibling_identifier is not None:
+                self._siblingDict[sibling.sibling_identifier] = system
+
     # When publishing data, app uses a GUID that counts up from 1.
     def getNextMessageId(self):
         self._publishMessageId += 1
@@ -905,11 +1098,11 @@ class s30api_async(object):
         _LOGGER.info(f"setModeHelper success[{mode}] scheduleId [{scheduleId}] sysId [{sysId}]")
 
     async def publish_message_helper_dict(self, sysId: str, message: dict, additional_parameters=None):
-        data = '"Data":' + json.dumps(message)
+        data = '"Data":' + json_codec.dumps(message)
         await self.publishMessageHelper(sysId, data, additional_parameters=additional_parameters)
 
     async def publishMessageHelper(self, sysId: str, data: str, additional_parameters=None) -> None:
-        _LOGGER.debug(f"publishMessageHelper sysId [{sysId}] data [{data}]")
+        _LOGGER.debug("publishMessageHelper sysId [%s] data [%s]", sysId, data)
         try:
             url = self.url_publish
             headers = {
@@ -932,7 +1125,7 @@ class s30api_async(object):
             body += "}"
 
             # See if we can parse the JSON, if we can't error will be thrown, no point in sending lennox bad data
-            jsbody = json.loads(body)
+            jsbody = json_codec.loads(body)
             self.message_logger(jsbody)
             resp = await self.post(url, headers=headers, data=body)
             resp_txt = await resp.text()
@@ -942,8 +1135,8 @@ class s30api_async(object):
                     EC_PUBLISH_MESSAGE,
                     1,
                 )
-            resp_json = json.loads(resp_txt)
-            _LOGGER.debug(json.dumps(resp_json, indent=4))
+            resp_json = json_codec.loads(resp_txt)
+            _LOGGER.debug(json_codec.dumps(resp_json, indent=4))
             code = resp_json["code"]
             if code != 1:
                 raise S30Exception(
@@ -976,6 +1169,8 @@ class s30api_async(object):
                 EC_COMMS_ERROR,
                 5,
             ) from e
+        # The controller will echo the new state, poll quickly to pick it up.
+        self.poll_scheduler.notify_publish()
         _LOGGER.info("publishMessageHelper success sysId [" + str(sysId) + "]")
 
     async def setHVACMode(self, sysId: str, mode: str, scheduleId: int) -> None:
@@ -1015,7 +1210,7 @@ class s30api_async(object):
     async def cancel_smart_away(self, sysId: str) -> None:
         _LOGGER.info(f"cancel_smart_away sysId [{sysId}]")
         command = {"occupancy": {"smartAway": {"config": {"cancel": True}}}}
-        data = '"Data":' + json.dumps(command).replace(" ", "")
+        data = '"Data":' + json_codec.dumps(command).replace(" ", "")
         await self.publishMessageHelper(sysId, data)
 
     async def enable_smart_away(self, sysId: str, mode: bool) -> None:
@@ -1024,7 +1219,7 @@ class s30api_async(object):
             err_msg = f"enable_smart_away - invalid mode [{mode}] requested, must be True or False"
             raise S30Exception(err_msg, EC_BAD_PARAMETERS, 1)
         command = {"occupancy": {"smartAway": {"config": {"enabled": mode}}}}
-        data = '"Data":' + json.dumps(command).replace(" ", "")
+        data = '"Data":' + json_codec.dumps(command).replace(" ", "")
         await self.publishMessageHelper(sysId, data)
 
 
@@ -1038,19 +1233,276 @@ class SiblingInfo:
         self.sibling_ipAddress: str = None
 
 
-class lennox_system(object):
+# Features of the controller device, deviceType 500
+_DEVICE_FEATURE_MAP = FeatureMap({9: "serialNumber", 11: "softwareVersion"})
+
+# Equipment features, equipment 0 is the controller
+_CONTROL_FEATURE_MAP = FeatureMap(
+    {
+        LENNOX_FEATURE_EQUIPMENT_TYPE_NAME: "equipment_type_name",
+        LENNOX_FEATURE_CONTROL_MODEL_NUMBER: "unit_model_number",
+        LENNOX_FEATURE_CONTROL_SERIAL_NUMBER: "unit_serial_number",
+    }
+)
+_UNIT_FEATURE_MAP = FeatureMap(
+    {
+        LENNOX_FEATURE_EQUIPMENT_TYPE_NAME: "equipment_type_name",
+        LENNOX_FEATURE_UNIT_MODEL_NUMBER: "unit_model_number",
+        LENNOX_FEATURE_UNIT_SERIAL_NUMBER: "unit_serial_number",
+    }
+)
+
+# Message fields that map directly onto lennox_system properties
+_SYSTEM_MESSAGE_MAP = AttrMap(
+    {
+        "config.temperatureUnit": "temperatureUnit",
+        "config.dehumidificationMode": "dehumidificationMode",
+        "config.name": "name",
+        "config.allergenDefender": "allergenDefender",
+        "config.ventilationMode": "ventilationMode",
+        "config.centralMode": "centralMode",
+        "config.circulateTime": "circulateTime",
+        "config.humidificationMode": "humidificationMode",
+        "config.enhancedDehumidificationOvercoolingC": "enhancedDehumidificationOvercoolingC",
+        "config.enhancedDehumidificationOvercoolingF": "enhancedDehumidificationOvercoolingF",
+        "config.options.indoorUnitType": "indoorUnitType",
+        "config.options.productType": "productType",
+        "config.options.outdoorUnitType": "outdoorUnitType",
+        "config.options.humidifierType": "humidifierType",
+        "config.options.dehumidifierType": "dehumidifierType",
+        "config.options.ventilation.unitType": "ventilationUnitType",
+        "config.options.ventilation.controlMode": "ventilationControlMode",
+        "config.options.enhancedDehumidificationOvercoolingF.range.min": "enhancedDehumidificationOvercoolingF_min",
+        "config.options.enhancedDehumidificationOvercoolingF.range.max": "enhancedDehumidificationOvercoolingF_max",
+        "config.options.enhancedDehumidificationOvercoolingF.range.inc": "enhancedDehumidificationOvercoolingF_inc",
+        "config.options.enhancedDehumidificationOvercoolingF.range.enable": "enhancedDehumidificationOvercoolingF_enable",
+        "config.options.enhancedDehumidificationOvercoolingC.range.min": "enhancedDehumidificationOvercoolingC_min",
+        "config.options.enhancedDehumidificationOvercoolingC.range.max": "enhancedDehumidificationOvercoolingC_max",
+        "config.options.enhancedDehumidificationOvercoolingC.range.inc": "enhancedDehumidificationOvercoolingC_inc",
+        "config.options.enhancedDehumidificationOvercoolingC.range.enable": "enhancedDehumidificationOvercoolingC_enable",
+        "status.outdoorTemperature": "outdoorTemperature",
+        "status.outdoorTemperatureC": "outdoorTemperatureC",
+        "status.outdoorTemperatureStatus": "outdoorTemperatureStatus",
+        "status.diagRuntime": "diagRuntime",
+        "status.diagPoweredHours": "diagPoweredHours",
+        "status.zoningMode": "zoningMode",
+        "status.numberOfZones": "numberOfZones",
+        "status.diagVentilationRuntime": "diagVentilationRuntime",
+        "status.ventilationRemainingTime": "ventilationRemainingTime",
+        "status.ventilatingUntilTime": "ventilatingUntilTime",
+        "status.feelsLikeMode": "feelsLikeMode",
+        "status.alert": "alert",
+        "time.sysUpTime": "sysUpTime",
+    }
+)
+
+_IAQ_MAP = AttrMap(
+    {
+        "mitigation_action": "iaq_mitigation_action",
+        "mitigation_state": "iaq_mitigation_state",
+        "overall_index": "iaq_overall_index",
+    }
+)
+
+# Keyed by sensor name
+_IAQ_SENSOR_MAPS = {
+    name: AttrMap(
+        {
+            "sta": f"iaq_{name.lower()}_sta",
+            "sta_validNumber": f"iaq_{name.lower()}_sta_valid",
+            "lta": f"iaq_{name.lower()}_lta",
+            "lta_validNumber": f"iaq_{name.lower()}_lta_valid",
+            "component_score": f"iaq_{name.lower()}_component_score",
+        }
+    )
+    for name in ("PM25", "VOC", "CO2")
+}
+
+_WEATHER_MAP = AttrMap(
+    {
+        "status.isValid": "wt_is_valid",
+        "status.env.airQuality": "wt_env_airQuality",
+        "status.env.tree": "wt_env_tree",
+        "status.env.weed": "wt_env_weed",
+        "status.env.grass": "wt_env_grass",
+        "status.env.mold": "wt_env_mold",
+        "status.env.uvIndex": "wt_env_uvIndex",
+        "status.env.humidity": "wt_env_humidity",
+        "status.env.windSpeed": "wt_env_windSpeed",
+        "status.env.windSpeedK": "wt_env_windSpeedK",
+        "status.env.cloudCoverage": "wt_env_cloudCoverage",
+        "status.env.Dewpoint": "wt_env_dewpoint",
+        "status.env.DewpointC": "wt_env_dewpointC",
+    }
+)
+
+_WIFI_STATUS_MAP = AttrMap(
+    {
+        "macAddr": "wifi_macAddr",
+        "ssid": "wifi_ssid",
+        "ip": "wifi_ip",
+        "router": "wifi_router",
+        "dns": "wifi_dns",
+        "dns2": "wifi_dns2",
+        "subnetMask": "wifi_subnetMask",
+        "bitRate": "wifi_bitRate",
+        "rssi": "wifi_rssi",
+    }
+)
+
+
+class lennox_system(SubscriberBase):
     """Represents a Lennox Control System"""
 
+    __slots__ = (
+        "sysId",
+        "api",
+        "idx",
+        "home",
+        "zone_list",
+        "_zones",
+        "_scheduleZones",
+        "_schedules",
+        "_diagcallbacks",
+        "_eqParametersCallbacks",
+        "_pendingDiags",
+        "_pendingEqParameters",
+        "outdoorTemperature",
+        "name",
+        "allergenDefender",
+        "ventilationMode",
+        "diagPoweredHours",
+        "diagRuntime",
+        "diagVentilationRuntime",
+        "ventilationRemainingTime",
+        "ventilatingUntilTime",
+        "ventilationUnitType",
+        "ventilationControlMode",
+        "feelsLikeMode",
+        "manualAwayMode",
+        "serialNumber",
+        "alert",
+        "active_alerts",
+        "_activeAlerts",
+        "alert_history",
+        "_alertcallbacks",
+        "_diagnosticHistory",
+        "alerts_num_cleared",
+        "alerts_num_active",
+        "alerts_last_cleared_id",
+        "alerts_num_in_active_array",
+        "heatpump_low_ambient_lockout",
+        "aux_heat_high_ambient_lockout",
+        "single_setpoint_mode",
+        "temperatureUnit",
+        "indoorUnitType",
+        "productType",
+        "outdoorUnitType",
+        "humidifierType",
+        "dehumidifierType",
+        "outdoorTemperatureC",
+        "outdoorTemperatureStatus",
+        "numberOfZones",
+        "sysUpTime",
+        "diagLevel",
+        "softwareVersion",
+        "diagnosticPaths",
+        "diagInverterInputVoltage",
+        "diagInverterInputCurrent",
+        "sa_enabled",
+        "sa_reset",
+        "sa_cancel",
+        "sa_state",
+        "sa_setpointState",
+        "siblings",
+        "centralMode",
+        "zoningMode",
+        "circulateTime",
+        "enhancedDehumidificationOvercoolingC_enable",
+        "enhancedDehumidificationOvercoolingF_enable",
+        "enhancedDehumidificationOvercoolingC",
+        "enhancedDehumidificationOvercoolingF",
+        "enhancedDehumidificationOvercoolingF_min",
+        "enhancedDehumidificationOvercoolingF_max",
+        "enhancedDehumidificationOvercoolingF_inc",
+        "enhancedDehumidificationOvercoolingC_min",
+        "enhancedDehumidificationOvercoolingC_max",
+        "enhancedDehumidificationOvercoolingC_inc",
+        "dehumidificationMode",
+        "humidificationMode",
+        "relayServerConnected",
+        "internetStatus",
+        "cloud_status",
+        "iaq_mitigation_action",
+        "iaq_mitigation_state",
+        "iaq_overall_index",
+        "iaq_pm25_sta",
+        "iaq_pm25_sta_valid",
+        "iaq_pm25_lta",
+        "iaq_pm25_lta_valid",
+        "iaq_pm25_component_score",
+        "iaq_voc_sta",
+        "iaq_voc_sta_valid",
+        "iaq_voc_lta",
+        "iaq_voc_lta_valid",
+        "iaq_voc_component_score",
+        "iaq_co2_sta",
+        "iaq_co2_sta_valid",
+        "iaq_co2_lta",
+        "iaq_co2_lta_valid",
+        "iaq_co2_component_score",
+        "wt_is_valid",
+        "wt_env_airQuality",
+        "wt_env_tree",
+        "wt_env_weed",
+        "wt_env_grass",
+        "wt_env_mold",
+        "wt_env_uvIndex",
+        "wt_env_humidity",
+        "wt_env_windSpeed",
+        "wt_env_windSpeedK",
+        "wt_env_cloudCoverage",
+        "wt_env_dewpoint",
+        "wt_env_dewpointC",
+        "wifi_macAddr",
+        "wifi_ssid",
+        "wifi_ip",
+        "wifi_router",
+        "wifi_dns",
+        "wifi_dns2",
+        "wifi_subnetMask",
+        "wifi_bitRate",
+        "wifi_rssi",
+        "changeover_temp_deadband_f",
+        "changeover_temp_deadband_c",
+        "message_processing_list",
+        "_systemMessageProcessed",
+        "equipment",
+        "ble_devices",
+    )
+
     def __init__(self, sysId: str):
+        SubscriberBase.__init__(self)
         self.sysId: str = sysId
         self.api: s30api_async = None
         self.idx: int = None
         self.home: lennox_home = None
         self.zone_list: List["lennox_zone"] = []
-        self._schedules: List[lennox_schedule] = []
-        self._callbacks = []
-        self._diagcallbacks = []
-        self._eqParametersCallbacks = []
+        self._zones: dict[int, "lennox_zone"] = {}
+        # The zones that each manual, away and override schedule id belongs to
+        self._scheduleZones: dict[int, List["lennox_zone"]] = {}
+        self._schedules: dict[int, lennox_schedule] = {}
+        # Keyed by f'{eid}_{did}' and f'{eid}_{pid}'
+        self._diagcallbacks = CallbackRegistry()
+        self._eqParametersCallbacks = CallbackRegistry()
+        self._alertcallbacks = CallbackRegistry()
+        self._activeAlerts = ActiveAlertStore()
+        self.alert_history = AlertHistory()
+        # (match, capacity) when diagnostic history is enabled
+        self._diagnosticHistory: tuple[frozenset[str], int] = None
+        # Updates waiting for delivery when callbacks are coalesced
+        self._pendingDiags: dict[str, any] = {}
+        self._pendingEqParameters: set[str] = set()
         self.outdoorTemperature = None
         self.name: str = None
         self.allergenDefender = None
@@ -1180,8 +1632,6 @@ class lennox_system(object):
         self.changeover_temp_deadband_f: int = LENNOX_HSP_CSP_SEP_DEFAULT
         self.changeover_temp_deadband_c: float = LENNOX_HSPC_CSPC_SEP_DEFAULT
 
-        self._dirty = False
-        self._dirtyList = []
         self.message_processing_list = {
             "system": self._processSystemMessage,
             "zones": self._processZonesMessage,
@@ -1198,7 +1648,7 @@ class lennox_system(object):
             "indoorAirQuality": self._process_indoor_air_quality,
             "weather": self._process_weather,
         }
-        self.systemMessageProcessed: bool = False
+        self._systemMessageProcessed: bool = False
 
         self.equipment: dict[int, lennox_equipment] = {}
         self.ble_devices: dict[int, LennoxBle] = {}
@@ -1213,7 +1663,7 @@ class lennox_system(object):
             message_txt = response.get("message")
             if message_txt is not None:
                 try:
-                    message = json.loads(message_txt)
+                    message = json_codec.loads(message_txt)
                 except Exception as e:
                     _LOGGER.warning(
                         f"update_system_online_cloud - Failed to obtain presence status from cloud message [{message_txt}] exception [{e}]"
@@ -1236,6 +1686,17 @@ class lennox_system(object):
         else:
             _LOGGER.warning("update_system_online_cloud - No Response Received")
 
+    @property
+    def systemMessageProcessed(self) -> bool:
+        return self._systemMessageProcessed
+
+    @systemMessageProcessed.setter
+    def systemMessageProcessed(self, value: bool) -> None:
+        if value != self._systemMessageProcessed:
+            self._systemMessageProcessed = value
+            if self.api is not None and self.api.getSystem(self.sysId) is self:
+                self.api._systemInitializedChanged(value)
+
     def update(self, api: s30api_async, home: lennox_home, idx: int):
         self.api = api
         self.idx = idx
@@ -1254,35 +1715,27 @@ class lennox_system(object):
                         if key in data:
                             self.message_processing_list[key](data[key])
                     except Exception:
-                        _LOGGER.exception(f"processMessage key [{key}] Exception - Failed Message to Follow")
-                        _LOGGER.error(
-                            json.dumps(
-                                self.api.message_log.remove_redacted_fields(message),
-                                indent=4,
-                            )
-                        )
-                _LOGGER.debug(f"processMessage complete system id [{self.sysId}] dirty [{self._dirty}] dirtyList [{self._dirtyList}]")
+                        _LOGGER.exception("processMessage key [%s] Exception - Failed Message to Follow", key)
+                        _LOGGER.error("%s", self.api.message_log.lazy_format(message, indent=4))
+                _LOGGER.debug("processMessage complete system id [%s] dirty [%s] dirty_set [%s]", self.sysId, self._dirty, self._dirty_set)
                 self.executeOnUpdateCallbacks()
         except Exception:
             _LOGGER.exception("processMessage - unexpected exception - Failed Message to Follow")
-            _LOGGER.error(json.dumps(self.api.message_log.remove_redacted_fields(message), indent=4))
+            _LOGGER.error("%s", self.api.message_log.lazy_format(message, indent=4))
 
     def getOrCreateSchedule(self, schedule_id):
         schedule = self.getSchedule(schedule_id)
         if schedule is not None:
             return schedule
         schedule = lennox_schedule(schedule_id)
-        self._schedules.append(schedule)
+        self._schedules[schedule_id] = schedule
         return schedule
 
     def getSchedule(self, schedule_id):
-        for schedule in self._schedules:
-            if schedule.id == schedule_id:
-                return schedule
-        return None
+        return self._schedules.get(schedule_id)
 
-    def getSchedules(self):
-        return self._schedules
+    def getSchedules(self) -> List[lennox_schedule]:
+        return list(self._schedules.values())
 
     def getOrCreateEquipment(self, equipment_id: int) -> lennox_equipment:
         if equipment_id not in self.equipment:
@@ -1326,6 +1779,8 @@ class lennox_system(object):
     def _processSiblings(self, siblings):
         if len(siblings) == 0:
             self.siblings = []
+            if self.api is not None:
+                self.api._updateSiblingIndex(self)
             return
         for sibling in siblings:
             sibling_info = SiblingInfo()
@@ -1336,10 +1791,10 @@ class lennox_system(object):
             sibling_info.sibling_nodePresent = sibling["sibling"].get("nodePresent", None)
             sibling_info.sibling_ipAddress = sibling["sibling"].get("ipAddress", None)
             self.siblings.append(sibling_info)
+        if self.api is not None:
+            self.api._updateSiblingIndex(self)
 
-        self._dirty = True
-        if "siblings" not in self._dirtyList:
-            self._dirtyList.append("siblings")
+        self.mark_dirty("siblings")
 
     def _process_rgw(self, rgw):
         if "status" in rgw:
@@ -1349,25 +1804,14 @@ class lennox_system(object):
 
     def _process_alerts(self, alerts):
         if "active" in alerts:
-            self.active_alerts = []
-            for alert in alerts["active"]:
-                if (alert1 := alert.get("alert", None)) is not None:
-                    t_alert = alert1.copy()
-                    # A code of zero indicates a non-alert, lennox seems to put one of these in by default.
-                    if (code := t_alert.get("code", None)) is not None and code != 0:
-                        t_alert["message"] = lennox_error_get_message_from_code(code)
-                        if code == LennoxErrorCodes.lx_alarm_id_Low_Ambient_HP_Heat_Lockout.value:
-                            self.attr_updater(t_alert, "isStillActive", "heatpump_low_ambient_lockout")
-                        elif code == LennoxErrorCodes.lx_alarm_id_High_Ambient_Auxiliary_Heat_Lockout.value:
-                            self.attr_updater(
-                                t_alert,
-                                "isStillActive",
-                                "aux_heat_high_ambient_lockout",
-                            )
-                        if t_alert.get("isStillActive", True) is not False:
-                            self.active_alerts.append(t_alert)
-            self._dirty = True
-            self._dirtyList.append("active_alerts")
+            for entry in alerts["active"]:
+                if (alert := entry.get("alert", None)) is not None:
+                    code = alert.get("code", None)
+                    if code == LennoxErrorCodes.lx_alarm_id_Low_Ambient_HP_Heat_Lockout.value:
+                        self.attr_updater(alert, "isStillActive", "heatpump_low_ambient_lockout")
+                    elif code == LennoxErrorCodes.lx_alarm_id_High_Ambient_Auxiliary_Heat_Lockout.value:
+                        self.attr_updater(alert, "isStillActive", "aux_heat_high_ambient_lockout")
+            self._updateActiveAlerts(*self._activeAlerts.update(alerts["active"]))
         if "meta" in alerts:
             meta = alerts["meta"]
             self.attr_updater(meta, "numClearedAlerts", "alerts_num_cleared")
@@ -1375,13 +1819,25 @@ class lennox_system(object):
             self.attr_updater(meta, "lastClearedAlertId", "alerts_last_cleared_id")
             self.attr_updater(meta, "numAlertsInActiveArray", "alerts_num_in_active_array")
             if "numAlertsInActiveArray" in meta and self.alerts_num_in_active_array == 0:
-                self.active_alerts = []
-                self._dirty = True
-                self._dirtyList.append("active_alerts")
+                self._updateActiveAlerts(*self._activeAlerts.clear())
+
+    def _updateActiveAlerts(self, changed: bool, events: list[AlertEvent]) -> None:
+        if changed:
+            self.active_alerts = self._activeAlerts.alerts
+            self.mark_dirty("active_alerts")
+        self.alert_history.record(events)
+        for event in events:
+            self._alertcallbacks.execute_one(
+                event.alert["code"], "executeOnUpdateCallbacksAlerts", event.event, event.alert, runner=self._get_runner()
+            )
+
+    def registerOnUpdateCallbackAlerts(self, callbackfunc, match=None):
+        # match is a list of alert codes, callbackfunc(event, alert) is called with ALERT_ADDED or ALERT_CLEARED
+        self._alertcallbacks.register(callbackfunc, match)
 
     def get_or_create_ble_device(self, ble_id: int) -> LennoxBle:
         if ble_id not in self.ble_devices:
-            self.ble_devices[ble_id] = LennoxBle(ble_id)
+            self.ble_devices[ble_id] = LennoxBle(ble_id, self._get_coalescer(), self._get_runner())
         return self.ble_devices[ble_id]
 
     def _process_ble(self, ble):
@@ -1394,58 +1850,25 @@ class lennox_system(object):
                     ble_device.execute_on_update_callbacks()
 
     def _process_indoor_air_quality(self, iaq):
-        self.attr_updater(iaq, "mitigation_action", "iaq_mitigation_action")
-        self.attr_updater(iaq, "mitigation_state", "iaq_mitigation_state")
-        self.attr_updater(iaq, "overall_index", "iaq_overall_index")
-        if "sensor" in iaq:
-            for sensor in iaq["sensor"]:
-                if sensor["name"] in ("PM25", "VOC", "CO2"):
-                    name = str(sensor["name"]).lower()
-                    self.attr_updater(sensor, "sta", f"iaq_{name}_sta")
-                    self.attr_updater(sensor, "sta_validNumber", f"iaq_{name}_sta_valid")
-                    self.attr_updater(sensor, "lta", f"iaq_{name}_lta")
-                    self.attr_updater(sensor, "lta_validNumber", f"iaq_{name}_lta_valid")
-                    self.attr_updater(sensor, "component_score", f"iaq_{name}_component_score")
+        _IAQ_MAP.update(self, iaq)
+        for sensor in iaq.get("sensor", []):
+            sensor_map = _IAQ_SENSOR_MAPS.get(sensor["name"])
+            if sensor_map is not None:
+                sensor_map.update(self, sensor)
 
     def _process_weather(self, weather):
-        if "status" in weather:
-            status = weather["status"]
-            self.attr_updater(status, "isValid", "wt_is_valid")
-            if "env" in status:
-                env = weather["status"]["env"]
-                self.attr_updater(env, "airQuality", "wt_env_airQuality")
-                self.attr_updater(env, "tree", "wt_env_tree")
-                self.attr_updater(env, "weed", "wt_env_weed")
-                self.attr_updater(env, "grass", "wt_env_grass")
-                self.attr_updater(env, "mold", "wt_env_mold")
-                self.attr_updater(env, "uvIndex", "wt_env_uvIndex")
-                self.attr_updater(env, "humidity", "wt_env_humidity")
-                self.attr_updater(env, "windSpeed", "wt_env_windSpeed")
-                self.attr_updater(env, "windSpeedK", "wt_env_windSpeedK")
-                self.attr_updater(env, "cloudCoverage", "wt_env_cloudCoverage")
-                self.attr_updater(env, "Dewpoint", "wt_env_dewpoint")
-                self.attr_updater(env, "DewpointC", "wt_env_dewpointC")
+        _WEATHER_MAP.update(self, weather)
 
     def _process_interfaces(self, interfaces: dict):
         """Process the WIFI Interface message"""
         if len(interfaces) > 0:
             if status := interfaces[0].get("Info", {}).get("status"):
-                self.attr_updater(status, "macAddr", "wifi_macAddr")
-                self.attr_updater(status, "ssid", "wifi_ssid")
-                self.attr_updater(status, "ip", "wifi_ip")
-                self.attr_updater(status, "router", "wifi_router")
-                self.attr_updater(status, "dns", "wifi_dns")
-                self.attr_updater(status, "dns2", "wifi_dns2")
-                self.attr_updater(status, "subnetMask", "wifi_subnetMask")
-                self.attr_updater(status, "bitRate", "wifi_bitRate")
-                self.attr_updater(status, "rssi", "wifi_rssi")
+                _WIFI_STATUS_MAP.update(self, status)
 
     def _processSchedules(self, schedules):
         """Processes the schedule messages, throws base exceptions if a problem is encoutered"""
         for schedule in schedules:
-            self._dirty = True
-            if "schedules" not in self._dirtyList:
-                self._dirtyList.append("schedules")
+            self.mark_dirty("schedules")
             schedule_id = schedule["id"]
             if "schedule" in schedule:
                 lschedule = self.getSchedule(schedule_id)
@@ -1453,252 +1876,113 @@ class lennox_system(object):
                     lschedule = self.getOrCreateSchedule(schedule_id)
                 if lschedule is not None:
                     lschedule.update(schedule)
-                    # In manual mode, the updates only hit the schedulde rather than the period within the status.
-                    # So here, we look for changes to these schedules and route them to the zone but only
-                    # if it is in manual mode.
-                    if schedule["id"] in (
-                        16,
-                        17,
-                        18,
-                        19,
-                    ):  # Manual Mode Zones 1 .. 4
-                        zone_id = schedule_id - LENNOX_MANUAL_MODE_SCHEDULE_START_INDEX
-                        period = schedule["schedule"]["periods"][0]["period"]
-                        zone: lennox_zone = self.getZone(zone_id)
-                        if zone is not None and zone.isZoneManualMode():
+                    # When a zone runs its manual, away or override schedule, the updates only hit the schedule rather than
+                    # the period within the zone status.  So here, we route changes to these single period schedules to
+                    # the zones currently running them.
+                    zones = self._scheduleZones.get(schedule_id)
+                    if zones is None:
+                        continue
+                    periods = schedule["schedule"].get("periods")
+                    if not periods or "period" not in periods[0]:
+                        continue
+                    period = periods[0]["period"]
+                    for zone in zones:
+                        if zone.scheduleId == schedule_id:
                             zone._processPeriodMessage(period)
                             zone.executeOnUpdateCallbacks()
 
-    def registerOnUpdateCallback(self, callbackfunc, match=None):
-        self._callbacks.append({"func": callbackfunc, "match": match})
-
-    def executeOnUpdateCallbacks(self):
-        if self._dirty is True:
-            for callback in self._callbacks:
-                callbackfunc = callback["func"]
-                match = callback["match"]
-                matches = False
-                if match is None:
-                    matches = True
-                else:
-                    for m in match:
-                        if m in self._dirtyList:
-                            matches = True
-                            break
-                try:
-                    if matches is True:
-                        callbackfunc()
-                except Exception:
-                    # Log and eat this exception so we can process other callbacks
-                    _LOGGER.exception("executeOnUpdateCallback - failed ")
-        self._dirty = False
-        self._dirtyList = []
+    def debug_string(self) -> str:
+        return f"system [{self.sysId}]"
+
+    def _get_coalescer(self) -> CallbackCoalescer:
+        return self.api.callback_coalescer if self.api is not None else None
+
+    def _get_runner(self) -> AsyncCallbackRunner:
+        return self.api.callback_runner if self.api is not None else None
 
     def registerOnUpdateCallbackEqParameters(self, callbackfunc, match=None):
         # match is f'{eid}_{pid}'
-        self._eqParametersCallbacks.append({"func": callbackfunc, "match": match})
+        self._eqParametersCallbacks.register(callbackfunc, match)
 
     def executeOnUpdateCallbacksEqParameters(self, pid):
-        for callback in self._eqParametersCallbacks:
-            callbackfunc = callback["func"]
-            match = callback["match"]
-            matches = False
-            if match is None:
-                matches = True
-            else:
-                for m in match:
-                    if m == pid:
-                        matches = True
-                        break
-            try:
-                if matches is True:
-                    # Adding ID to the callback, since you can pass in an array
-                    # of IDs to register for the callback, the callback needs to
-                    # know which id the value belongs to.
-                    callbackfunc(pid)
-            except Exception:
-                # Log and eat this exception so we can process other callbacks
-                _LOGGER.exception("executeOnUpdateCallbacksEqParameters - failed ")
+        coalescer = self._get_coalescer()
+        if coalescer is not None and coalescer.defer(self._executePendingEqParameterCallbacks):
+            self._pendingEqParameters.add(pid)
+            return
+        # Adding ID to the callback, since you can pass in an array
+        # of IDs to register for the callback, the callback needs to
+        # know which id the value belongs to.
+        self._eqParametersCallbacks.execute_one(pid, "executeOnUpdateCallbacksEqParameters", pid, runner=self._get_runner())
+
+    def _executePendingEqParameterCallbacks(self):
+        pending = self._pendingEqParameters
+        self._pendingEqParameters = set()
+        for pid in pending:
+            self._eqParametersCallbacks.execute_one(pid, "executeOnUpdateCallbacksEqParameters", pid, runner=self._get_runner())
 
     def registerOnUpdateCallbackDiag(self, callbackfunc, match=None):
         # match is f'{eid}_{did}'
-        self._diagcallbacks.append({"func": callbackfunc, "match": match})
+        self._diagcallbacks.register(callbackfunc, match)
 
     def executeOnUpdateCallbacksDiag(self, diag_id, newval):
-        for callback in self._diagcallbacks:
-            callbackfunc = callback["func"]
-            match = callback["match"]
-            matches = False
-            if match is None:
-                matches = True
-            else:
-                for m in match:
-                    if m == diag_id:
-                        matches = True
-                        break
-            try:
-                if matches is True:
-                    # Adding ID to the callback, since you can pass in an array
-                    # of IDs to register for the callback, the callback needs to
-                    # know which id the value belongs to.
-                    callbackfunc(diag_id, newval)
-            except Exception:
-                # Log and eat this exception so we can process other callbacks
-                _LOGGER.exception("executeOnUpdateCallbacksDiag - failed")
-
-    def attr_updater(self, input_set, attr: str, propertyName: str = None) -> bool:
-        if attr in input_set:
-            attr_val = input_set[attr]
-            if propertyName is None:
-                propertyName = attr
-            if getattr(self, propertyName) != attr_val:
-                setattr(self, propertyName, attr_val)
-                self._dirty = True
-                if propertyName not in self._dirtyList:
-                    self._dirtyList.append(propertyName)
-                _LOGGER.debug(f"update_attr: system Id [{self.sysId}] attr [{propertyName}] value [{attr_val}]")
-                return True
-        return False
+        coalescer = self._get_coalescer()
+        if coalescer is not None and coalescer.defer(self._executePendingDiagCallbacks):
+            # Only the latest value of each diagnostic is delivered
+            self._pendingDiags[diag_id] = newval
+            return
+        self._diagcallbacks.execute_one(diag_id, "executeOnUpdateCallbacksDiag", diag_id, newval, runner=self._get_runner())
+
+    def _executePendingDiagCallbacks(self):
+        pending = self._pendingDiags
+        self._pendingDiags = {}
+        for diag_id, newval in pending.items():
+            self._diagcallbacks.execute_one(diag_id, "executeOnUpdateCallbacksDiag", diag_id, newval, runner=self._get_runner())
 
     def _processSystemMessage(self, message):
         self.systemMessageProcessed = True
-        if "config" in message:
-            config = message["config"]
-            self.attr_updater(config, "temperatureUnit")
-            self.attr_updater(config, "dehumidificationMode")
-            self.attr_updater(config, "name")
-            self.attr_updater(config, "allergenDefender")
-            self.attr_updater(config, "ventilationMode")
-            self.attr_updater(config, "centralMode")
-            self.attr_updater(config, "circulateTime")
-            self.attr_updater(config, "humidificationMode")
-            self.attr_updater(config, "enhancedDehumidificationOvercoolingC")
-            self.attr_updater(config, "enhancedDehumidificationOvercoolingF")
-            if "options" in config:
-                options = config["options"]
-                self.attr_updater(options, "indoorUnitType")
-                self.attr_updater(options, "productType")
-                self.attr_updater(options, "outdoorUnitType")
-                self.attr_updater(options, "humidifierType")
-                self.attr_updater(options, "dehumidifierType")
-                if "ventilation" in options:
-                    ventilation = options["ventilation"]
-                    self.attr_updater(ventilation, "unitType", "ventilationUnitType")
-                    self.attr_updater(ventilation, "controlMode", "ventilationControlMode")
-                if "enhancedDehumidificationOvercoolingF" in options:
-                    eoc = options["enhancedDehumidificationOvercoolingF"]
-                    if "range" in eoc:
-                        dehumid_range = eoc["range"]
-                        self.attr_updater(dehumid_range, "min", "enhancedDehumidificationOvercoolingF_min")
-                        self.attr_updater(dehumid_range, "max", "enhancedDehumidificationOvercoolingF_max")
-                        self.attr_updater(dehumid_range, "inc", "enhancedDehumidificationOvercoolingF_inc")
-                        self.attr_updater(
-                            dehumid_range,
-                            "enable",
-                            "enhancedDehumidificationOvercoolingF_enable",
-                        )
-
-                if "enhancedDehumidificationOvercoolingC" in options:
-                    eoc = options["enhancedDehumidificationOvercoolingC"]
-                    if "range" in eoc:
-                        dehumid_range = eoc["range"]
-                        self.attr_updater(dehumid_range, "min", "enhancedDehumidificationOvercoolingC_min")
-                        self.attr_updater(dehumid_range, "max", "enhancedDehumidificationOvercoolingC_max")
-                        self.attr_updater(dehumid_range, "inc", "enhancedDehumidificationOvercoolingC_inc")
-                        self.attr_updater(
-                            dehumid_range,
-                            "enable",
-                            "enhancedDehumidificationOvercoolingC_enable",
-                        )
-
-        if "status" in message:
-            status = message["status"]
-            self.attr_updater(status, "outdoorTemperature")
-            self.attr_updater(status, "outdoorTemperatureC")
-            self.attr_updater(status, "outdoorTemperatureStatus")
-            self.attr_updater(status, "diagRuntime")
-            self.attr_updater(status, "diagPoweredHours")
-            self.attr_updater(status, "zoningMode")
-            self.attr_updater(status, "numberOfZones")
-            self.attr_updater(status, "diagVentilationRuntime")
-            self.attr_updater(status, "ventilationRemainingTime")
-            self.attr_updater(status, "ventilatingUntilTime")
-            self.attr_updater(status, "feelsLikeMode")
-            self.attr_updater(status, "alert")
-
-        if "time" in message:
-            time = message["time"]
-            old = self.sysUpTime
-            self.attr_updater(time, "sysUpTime")
-            # When uptime become less than what we recorded, it means the S30 has restarted
-            if old is not None and old > self.sysUpTime:
-                _LOGGER.warning(f"S30 has rebooted sysId [{self.sysId}] old uptime [{old}] new uptime [{self.sysUpTime}]")
+        old = self.sysUpTime
+        _SYSTEM_MESSAGE_MAP.update(self, message)
+        # When uptime become less than what we recorded, it means the S30 has restarted
+        if "time" in message and old is not None and old > self.sysUpTime:
+            _LOGGER.warning("S30 has rebooted sysId [%s] old uptime [%s] new uptime [%s]", self.sysId, old, self.sysUpTime)
 
     def _processDevices(self, message):
         for device in message:
             if "device" in device:
-                if device.get("device", {}).get("deviceType", {}) == 500:
-                    for feature in device["device"].get("features", []):
-                        if feature.get("feature", {}).get("fid") == 9:
-                            self.serialNumber = feature["feature"]["values"][0]["value"]
-                            self._dirty = True
-                            self._dirtyList.append("serialNumber")
-                        if feature.get("feature", {}).get("fid") == 11:
-                            self.softwareVersion = feature["feature"]["values"][0]["value"]
-                            self._dirty = True
-                            self._dirtyList.append("softwareVersion")
+                if device["device"].get("deviceType") == 500:
+                    _DEVICE_FEATURE_MAP.update(self, device["device"].get("features", []))
 
     def _processEquipments(self, message):
         for equipment in message:
             equipment_id = equipment.get("id")
             eq = self.getOrCreateEquipment(equipment_id)
-            if "equipment" in equipment:
-                eq_equipment = equipment["equipment"]
-                if "equipType" in eq_equipment:
-                    eq.equipType = eq_equipment["equipType"]
-            for feature in equipment.get("equipment", {}).get("features", []):
-                if feature.get("feature", {}).get("fid") == LENNOX_FEATURE_EQUIPMENT_TYPE_NAME:
-                    if "values" in feature["feature"]:
-                        eq.equipment_type_name = feature["feature"]["values"][0]["value"]
-                if equipment_id == 0:
-                    if feature.get("feature", {}).get("fid") == LENNOX_FEATURE_CONTROL_MODEL_NUMBER:
-                        if "values" in feature["feature"]:
-                            eq.unit_model_number = feature["feature"]["values"][0]["value"]
-                    if feature.get("feature", {}).get("fid") == LENNOX_FEATURE_CONTROL_SERIAL_NUMBER:
-                        if "values" in feature["feature"]:
-                            eq.unit_serial_number = feature["feature"]["values"][0]["value"]
-                else:
-                    if feature.get("feature", {}).get("fid") == LENNOX_FEATURE_UNIT_MODEL_NUMBER:
-                        if "values" in feature["feature"]:
-                            eq.unit_model_number = feature["feature"]["values"][0]["value"]
-                    if feature.get("feature", {}).get("fid") == LENNOX_FEATURE_UNIT_SERIAL_NUMBER:
-                        if "values" in feature["feature"]:
-                            eq.unit_serial_number = feature["feature"]["values"][0]["value"]
-            for parameter in equipment.get("equipment", {}).get("parameters", []):
+            eq_equipment = equipment.get("equipment", {})
+            if "equipType" in eq_equipment:
+                eq.equipType = eq_equipment["equipType"]
+            features = eq_equipment.get("features")
+            if features is not None:
+                self._processEquipmentFeatures(eq, features)
+            for parameter in eq_equipment.get("parameters", []):
+                if "parameter" not in parameter or "pid" not in parameter["parameter"]:
+                    continue
+                parameter_data = parameter["parameter"]
+                pid = parameter_data["pid"]
+                par = eq.get_or_create_parameter(pid)
+                # Only changed parameters are processed and reported to subscribers
+                if par.fromJson(parameter_data) is False:
+                    continue
                 # 525 is the parameter id for split-setpoint
-                if parameter.get("parameter", {}).get("pid") == LENNOX_PARAMETER_SINGLE_SETPOINT_MODE:
-                    value = parameter["parameter"]["value"]
-                    if value == 1 or value == "1":
-                        self.single_setpoint_mode = True
-                    else:
-                        self.single_setpoint_mode = False
-                    self._dirty = True
-                    self._dirtyList.append("single_setpoint_mode")
-                if parameter.get("parameter", {}).get("pid") == LENNOX_PARAMETER_AUTOCHANGE_OVER_TEMP_DEADBAND:
-                    self.changeover_temp_deadband_f = int(parameter["parameter"]["value"])
+                if pid == LENNOX_PARAMETER_SINGLE_SETPOINT_MODE:
+                    self.update_attr("single_setpoint_mode", par.value == 1 or par.value == "1")
+                if pid == LENNOX_PARAMETER_AUTOCHANGE_OVER_TEMP_DEADBAND:
+                    self.changeover_temp_deadband_f = int(par.value)
                     self.changeover_temp_deadband_c = self.convertFtoC(self.changeover_temp_deadband_f, noOffset=True)
-                    self._dirty = True
-                    self._dirtyList.append("auto_change_over_temp_deadband")
-                if parameter.get("parameter", {}).get("pid") == LENNOX_PARAMETER_EQUIPMENT_NAME:
+                    self.mark_dirty("auto_change_over_temp_deadband")
+                if pid == LENNOX_PARAMETER_EQUIPMENT_NAME:
                     # Lennox isn't consistent with capitilization of Subnet Controller
                     # If equipment name isn't available, use the equipment type name.
-                    eq.equipment_name = parameter["parameter"].get("value", eq.equipment_type_name)
-                if "parameter" in parameter:
-                    if "pid" in parameter["parameter"]:
-                        pid = parameter["parameter"]["pid"]
-                        par = eq.get_or_create_parameter(pid)
-                        par.fromJson(parameter["parameter"])
-                        self.executeOnUpdateCallbacksEqParameters(f"{equipment_id}_{pid}")
+                    eq.equipment_name = parameter_data.get("value", eq.equipment_type_name)
+                self.executeOnUpdateCallbacksEqParameters(f"{equipment_id}_{pid}")
 
             for diagnostic in equipment.get("equipment", {}).get("diagnostics", []):
                 # the diagnostic values sometimes don't have names
@@ -1733,10 +2017,53 @@ class lennox_system(object):
                         diagnostic.valid = diags["valid"]
                     if "value" in diags:
                         new_value = diags["value"]
-                        if new_value != diagnostic.value:
-                            diagnostic.value = new_value
+                        changed = diagnostic.set_value(new_value)
+                        if self._diagnosticHistory is not None:
+                            self._recordDiagnosticHistory(diagnostic, f"{eid}_{did}", diagnostic.numeric_value)
+                        if changed:
                             self.executeOnUpdateCallbacksDiag(f"{eid}_{did}", new_value)
 
+    def enable_diagnostic_history(self, match: list[str] = None, capacity: int = DEFAULT_DIAGNOSTIC_SERIES_SIZE) -> None:
+        """Keeps a numeric history of the diagnostics in match, f'{eid}_{did}', or of all diagnostics if match is None.
+
+        The history of a diagnostic is available as lennox_equipment_diagnostic.history once a value has been received.
+        Values received while the diagnostic is not valid are counted in the history's invalid count and not recorded.
+        Calling it again replaces the match and capacity, histories that no longer match or have a different capacity are released.
+        """
+        match_set = None if match is None else frozenset(match)
+        self._diagnosticHistory = (match_set, capacity)
+        for eq in self.equipment.values():
+            for diagnostic in eq.diagnostics.values():
+                history = diagnostic.history
+                if history is None:
+                    continue
+                if history.capacity != capacity or (match_set is not None and f"{diagnostic.equipment_id}_{diagnostic.diagnostic_id}" not in match_set):
+                    diagnostic.history = None
+
+    def disable_diagnostic_history(self) -> None:
+        """Stops recording and releases the diagnostic histories"""
+        self._diagnosticHistory = None
+        for eq in self.equipment.values():
+            for diagnostic in eq.diagnostics.values():
+                diagnostic.history = None
+
+    def _recordDiagnosticHistory(self, diagnostic: lennox_equipment_diagnostic, diag_id: str, value) -> None:
+        if diagnostic.history is None:
+            match, capacity = self._diagnosticHistory
+            if match is not None and diag_id not in match:
+                return
+            diagnostic.history = DiagnosticSeries(capacity)
+        if diagnostic.valid is False:
+            # The value of an invalid diagnostic is a placeholder, it is counted and not recorded
+            diagnostic.history.invalid += 1
+            return
+        diagnostic.history.append(value)
+
+    def _processEquipmentFeatures(self, eq: lennox_equipment, features: list) -> None:
+        feature_map = _CONTROL_FEATURE_MAP if eq.equipment_id == 0 else _UNIT_FEATURE_MAP
+        if feature_map.update(eq, features):
+            eq.execute_on_update_callbacks()
+
     def has_emergency_heat(self) -> bool:
         """Returns True is the system has emergency heat"""
         # Emergency heat is defined as a system with a heat pump that also has an indoor furnace
@@ -1820,7 +2147,11 @@ class lennox_system(object):
         await self.api.enable_smart_away(self.sysId, mode)
 
     def getZone(self, zone_id: int) -> lennox_zone:
-        return next((zone for zone in self.zone_list if zone.id == zone_id), None)
+        return self._zones.get(zone_id)
+
+    def getZonesForSchedule(self, schedule_id: int) -> List[lennox_zone]:
+        """Returns the zones that schedule_id is the manual, away or override schedule of"""
+        return self._scheduleZones.get(schedule_id, [])
 
     async def setHVACMode(self, mode, scheduleId):
         return await self.api.setHVACMode(self.sysId, mode, scheduleId)
@@ -1904,7 +2235,7 @@ class lennox_system(object):
         if desp is not None:
             period["desp"] = int(desp)
 
-        data = '"Data":' + json.dumps(command).replace(" ", "")
+        data = '"Data":' + json_codec.dumps(command).replace(" ", "")
         await self.api.publishMessageHelper(self.sysId, data)
 
     def getOrCreateZone(self, zone_id):
@@ -1913,6 +2244,9 @@ class lennox_system(object):
             return zone
         zone = lennox_zone(self, zone_id)
         self.zone_list.append(zone)
+        self._zones[zone_id] = zone
+        for schedule_id in (zone.getManualModeScheduleId(), zone.getAwayModeScheduleId(), zone.getOverrideScheduleId()):
+            self._scheduleZones.setdefault(schedule_id, []).append(zone)
         return zone
 
     def _processZonesMessage(self, message):
@@ -2222,11 +2556,130 @@ class lennox_system(object):
         return False
 
 
-class lennox_zone(object):
+# Message fields that map directly onto lennox_zone properties
+_ZONE_PERIOD_MAP = AttrMap(
+    {
+        "systemMode": "systemMode",
+        "fanMode": "fanMode",
+        "humidityMode": "humidityMode",
+        "csp": "csp",
+        "cspC": "cspC",
+        "hsp": "hsp",
+        "hspC": "hspC",
+        "desp": "desp",
+        "sp": "sp",
+        "spC": "spC",
+        "husp": "husp",
+        "startTime": "startTime",
+    }
+)
+
+_ZONE_MESSAGE_MAP = AttrMap(
+    {
+        "config.name": "name",
+        "config.heatingOption": "heatingOption",
+        "config.maxHsp": "maxHsp",
+        "config.maxHspC": "maxHspC",
+        "config.minHsp": "minHsp",
+        "config.minHspC": "minHspC",
+        "config.coolingOption": "coolingOption",
+        "config.maxCsp": "maxCsp",
+        "config.maxCspC": "maxCspC",
+        "config.minCsp": "minCsp",
+        "config.minCspC": "minCspC",
+        "config.humidificationOption": "humidificationOption",
+        "config.emergencyHeatingOption": "emergencyHeatingOption",
+        "config.dehumidificationOption": "dehumidificationOption",
+        "config.maxHumSp": "maxHumSp",
+        "config.minHumSp": "minHumSp",
+        "config.maxDehumSp": "maxDehumSp",
+        "config.minDehumSp": "minDehumSp",
+        "config.scheduleId": "scheduleId",
+        "config.scheduleHold": "scheduleHold",
+        "status.temperature": "temperature",
+        "status.temperatureC": "temperatureC",
+        "status.temperatureStatus": "temperatureStatus",
+        "status.humidity": "humidity",
+        "status.humidityStatus": "humidityStatus",
+        "status.tempOperation": "tempOperation",
+        "status.humOperation": "humOperation",
+        "status.allergenDefender": "allergenDefender",
+        "status.damper": "damper",
+        "status.fan": "fan",
+        "status.demand": "demand",
+        "status.ventilation": "ventilation",
+        "status.heatCoast": "heatCoast",
+        "status.defrost": "defrost",
+        "status.balancePoint": "balancePoint",
+        "status.aux": "aux",
+        "status.coolCoast": "coolCoast",
+        "status.ssr": "ssr",
+        "status.period": _ZONE_PERIOD_MAP,
+    }
+)
+
+
+class lennox_zone(SubscriberBase):
     """Represents a lennox zone"""
 
+    __slots__ = (
+        "temperature",
+        "temperatureC",
+        "temperatureStatus",
+        "humidity",
+        "humidityStatus",
+        "systemMode",
+        "tempOperation",
+        "fanMode",
+        "fan",
+        "heatCoast",
+        "defrost",
+        "balancePoint",
+        "aux",
+        "coolCoast",
+        "ssr",
+        "allergenDefender",
+        "humidityMode",
+        "humOperation",
+        "csp",
+        "hsp",
+        "damper",
+        "demand",
+        "ventilation",
+        "heatingOption",
+        "coolingOption",
+        "humidificationOption",
+        "emergencyHeatingOption",
+        "dehumidificationOption",
+        "maxCsp",
+        "maxCspC",
+        "minCsp",
+        "minCspC",
+        "maxHsp",
+        "maxHspC",
+        "minHsp",
+        "minHspC",
+        "maxHumSp",
+        "minHumSp",
+        "maxDehumSp",
+        "minDehumSp",
+        "scheduleId",
+        "scheduleHold",
+        "cspC",
+        "hspC",
+        "desp",
+        "sp",
+        "spC",
+        "husp",
+        "startTime",
+        "overrideActive",
+        "id",
+        "name",
+        "system",
+    )
+
     def __init__(self, system, zone_id):
-        self._callbacks = []
+        SubscriberBase.__init__(self)
 
         self.temperature = None
         self.temperatureC = None
@@ -2297,8 +2750,6 @@ class lennox_zone(object):
         self.id: int = zone_id
         self.name: str = None
         self.system: lennox_system = system
-        self._dirty = False
-        self._dirtyList = []
 
         _LOGGER.info(f"Creating lennox_zone id [{self.id}]")
 
@@ -2306,42 +2757,14 @@ class lennox_zone(object):
     def unique_id(self) -> str:
         return (self.system.unique_id + "_" + str(self.id)).replace("-", "") + "_T"
 
-    def registerOnUpdateCallback(self, callbackfunc, match=None):
-        self._callbacks.append({"func": callbackfunc, "match": match})
-
-    def executeOnUpdateCallbacks(self):
-        if self._dirty is True:
-            for callback in self._callbacks:
-                callbackfunc = callback["func"]
-                match = callback["match"]
-                matches = False
-                if match is None:
-                    matches = True
-                else:
-                    for m in match:
-                        if m in self._dirtyList:
-                            matches = True
-                            break
-                try:
-                    if matches is True:
-                        callbackfunc()
-                except Exception:
-                    # Log and eat this exception so we can process other callbacks
-                    _LOGGER.exception("executeOnUpdateCallback - failed")
-        self._dirty = False
-        self._dirtyList = []
-
-    def attr_updater(self, input_set, attr: str) -> bool:
-        if attr in input_set:
-            attr_val = input_set[attr]
-            if getattr(self, attr) != attr_val:
-                setattr(self, attr, attr_val)
-                self._dirty = True
-                if attr not in self._dirtyList:
-                    self._dirtyList.append(attr)
-                _LOGGER.debug(f"update_attr: zone Id [{self.id}] attr [{attr}] value [{attr_val}]")
-                return True
-        return False
+    def debug_string(self) -> str:
+        return f"zone [{self.id}]"
+
+    def _get_coalescer(self) -> CallbackCoalescer:
+        return self.system._get_coalescer()
+
+    def _get_runner(self) -> AsyncCallbackRunner:
+        return self.system._get_runner()
 
     @property
     def is_zone_disabled(self):
@@ -2351,29 +2774,10 @@ class lennox_zone(object):
         return True
 
     def processMessage(self, zoneMessage):
-        _LOGGER.debug(f"processMessage lennox_zone id [{self.id}]")
+        _LOGGER.debug("processMessage lennox_zone id [%s]", self.id)
+        _ZONE_MESSAGE_MAP.update(self, zoneMessage)
         if "config" in zoneMessage:
             config = zoneMessage["config"]
-            self.attr_updater(config, "name")
-            self.attr_updater(config, "heatingOption")
-            self.attr_updater(config, "maxHsp")
-            self.attr_updater(config, "maxHspC")
-            self.attr_updater(config, "minHsp")
-            self.attr_updater(config, "minHspC")
-            self.attr_updater(config, "coolingOption")
-            self.attr_updater(config, "maxCsp")
-            self.attr_updater(config, "maxCspC")
-            self.attr_updater(config, "minCsp")
-            self.attr_updater(config, "minCspC")
-            self.attr_updater(config, "humidificationOption")
-            self.attr_updater(config, "emergencyHeatingOption")
-            self.attr_updater(config, "dehumidificationOption")
-            self.attr_updater(config, "maxHumSp")
-            self.attr_updater(config, "minHumSp")
-            self.attr_updater(config, "maxDehumSp")
-            self.attr_updater(config, "minDehumSp")
-            self.attr_updater(config, "scheduleId")
-            self.attr_updater(config, "scheduleHold")
             if "scheduleHold" in config:
                 scheduleHold = config["scheduleHold"]
                 found = False
@@ -2384,49 +2788,12 @@ class lennox_zone(object):
                             found = True
                 if found is False:
                     self.overrideActive = False
-                self._dirty = True
-                self._dirtyList.append("scheduleHold")
-
-        if "status" in zoneMessage:
-            status = zoneMessage["status"]
-            self.attr_updater(status, "temperature")
-            self.attr_updater(status, "temperatureC")
-            self.attr_updater(status, "temperatureStatus")
-            self.attr_updater(status, "humidity")
-            self.attr_updater(status, "humidityStatus")
-            self.attr_updater(status, "tempOperation")
-            self.attr_updater(status, "humOperation")
-            self.attr_updater(status, "allergenDefender")
-            self.attr_updater(status, "damper")
-            self.attr_updater(status, "fan")
-            self.attr_updater(status, "demand")
-            self.attr_updater(status, "ventilation")
-            self.attr_updater(status, "heatCoast")
-            self.attr_updater(status, "defrost")
-            self.attr_updater(status, "balancePoint")
-            self.attr_updater(status, "aux")
-            self.attr_updater(status, "coolCoast")
-            self.attr_updater(status, "ssr")
-
-            if "period" in status:
-                period = status["period"]
-                self._processPeriodMessage(period)
-        _LOGGER.debug(f"processMessage complete lennox_zone id [{self.id}] dirty [{self._dirty}] dirtyList [{self._dirtyList}]")
+                self.mark_dirty("scheduleHold")
+        _LOGGER.debug("processMessage complete lennox_zone id [%s] dirty [%s] dirty_set [%s]", self.id, self._dirty, self._dirty_set)
         self.executeOnUpdateCallbacks()
 
     def _processPeriodMessage(self, period):
-        self.attr_updater(period, "systemMode")
-        self.attr_updater(period, "fanMode")
-        self.attr_updater(period, "humidityMode")
-        self.attr_updater(period, "csp")
-        self.attr_updater(period, "cspC")
-        self.attr_updater(period, "hsp")
-        self.attr_updater(period, "hspC")
-        self.attr_updater(period, "desp")
-        self.attr_updater(period, "sp")
-        self.attr_updater(period, "spC")
-        self.attr_updater(period, "husp")
-        self.attr_updater(period, "startTime")
+        _ZONE_PERIOD_MAP.update(self, period)
 
     def getTemperature(self):
         return self.temperature
@@ -2493,7 +2860,7 @@ class lennox_zone(object):
         return self.husp
 
     def getManualModeScheduleId(self) -> int:
-        return 16 + self.id
+        return LENNOX_MANUAL_MODE_SCHEDULE_START_INDEX + self.id
 
     def getAwayModeScheduleId(self) -> int:
         return 24 + self.id
@@ -4,59 +4,87 @@
 from abc import ABC, abstractmethod
 import logging
 
+from .callback_coalescer import CallbackCoalescer
+from .callback_registry import CallbackRegistry
+from .callback_runner import AsyncCallbackRunner
+
 _LOGGER = logging.getLogger(__name__)
 
 
 class SubscriberBase(ABC):
-    """Base class for subscribable objects"""
+    """Base class for subscribable objects.
+
+    Subclasses declare their properties in __slots__ so each object stores them in a fixed layout rather than a per object
+    dict.  __dict__ is kept in the base slots so attributes that are not declared, and unittest.mock.patch.object, still work;
+    the dict is only allocated when first used.  The callback registry is only allocated when a callback is registered and
+    the set of dirty properties when a property changes.
+    """
+
+    __slots__ = ("_dirty", "_dirty_set", "_callbacks", "_coalescer", "_runner", "__dict__", "__weakref__")
 
-    def __init__(self):
-        self._dirty_list: list[str] = []
-        self._callbacks = []
+    def __init__(self, coalescer: CallbackCoalescer = None, runner: AsyncCallbackRunner = None):
+        self._dirty_set: set[str] = None
+        self._callbacks: CallbackRegistry = None
         self._dirty = False
+        self._coalescer = coalescer
+        self._runner = runner
 
     @abstractmethod
     def debug_string(self) -> str:
         """Returns string to be logged in messages"""
 
+    def _get_coalescer(self) -> CallbackCoalescer:
+        """Returns the coalescer to defer callbacks to, overridden by objects that get it from their owner"""
+        return self._coalescer
+
+    def _get_runner(self) -> AsyncCallbackRunner:
+        """Returns the runner for coroutine callbacks, overridden by objects that get it from their owner"""
+        return self._runner
+
     def attr_updater(self, data_set, attr: str, property_name: str = None) -> bool:
         """Updates an attribue"""
         if attr in data_set:
-            attr_val = data_set[attr]
-            if property_name is None:
-                property_name = attr
-            if getattr(self, property_name) != attr_val:
-                setattr(self, property_name, attr_val)
-                self._dirty = True
-                if property_name not in self._dirty_list:
-                    self._dirty_list.append(property_name)
-                    _LOGGER.debug("update_attr: [%s] attr [%s] value [%s]", self.debug_string(), property_name, attr_val)
-                return True
+            return self.update_attr(attr if property_name is None else property_name, data_set[attr])
         return False
 
+    def update_attr(self, property_name: str, attr_val) -> bool:
+        """Sets the property and marks it dirty if the value has changed, returns True if it changed"""
+        if getattr(self, property_name) != attr_val:
+            setattr(self, property_name, attr_val)
+            self.mark_dirty(property_name)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("update_attr: [%s] attr [%s] value [%s]", self.debug_string(), property_name, attr_val)
+            return True
+        return False
+
+    def mark_dirty(self, property_name: str) -> None:
+        """Marks a property as changed so callbacks matching it run on the next execute"""
+        self._dirty = True
+        if self._dirty_set is None:
+            self._dirty_set = {property_name}
+        else:
+            self._dirty_set.add(property_name)
+
     def register_on_update_callback(self, callbackfunc, match=None):
-        """Register a callback for changes"""
-        self._callbacks.append({"func": callbackfunc, "match": match})
+        """Register a callback for changes, callbackfunc may be a coroutine function"""
+        if self._callbacks is None:
+            self._callbacks = CallbackRegistry()
+        self._callbacks.register(callbackfunc, match)
 
     def execute_on_update_callbacks(self):
-        """Execute callbacks"""
+        """Execute callbacks, or defer them when callbacks are being coalesced"""
         if self._dirty:
-            for callback in self._callbacks:
-                callbackfunc = callback["func"]
-                match = callback["match"]
-                matches = False
-                if match is None:
-                    matches = True
-                else:
-                    for match_item in match:
-                        if match_item in self._dirty_list:
-                            matches = True
-                            break
-                try:
-                    if matches:
-                        callbackfunc()
-                except Exception:  # pylint: disable=broad-exception-caught
-                    # Log and eat this exception so we can process other callbacks
-                    _LOGGER.exception("executeOnUpdateCallback - [%s] - failed", self.debug_string())
+            coalescer = self._get_coalescer()
+            if coalescer is not None and coalescer.defer(self._execute_on_update_callbacks):
+                return
+        self._execute_on_update_callbacks()
+
+    def _execute_on_update_callbacks(self):
+        if self._dirty and self._callbacks is not None:
+            self._callbacks.execute(self._dirty_set, self.debug_string(), runner=self._get_runner())
         self._dirty = False
-        self._dirty_list = []
+        self._dirty_set = None
+
+    # Names used by lennox_system and lennox_zone
+    registerOnUpdateCallback = register_on_update_callback
+    executeOnUpdateCallbacks = execute_on_update_callbacks
@@ -45,7 +45,7 @@ async def cloud_message_pump_task(s30api: s30api_async) -> None:
         try:
             print("Message Pump Awake")
             await s30api.messagePump()
-            await asyncio.sleep(15)
+            await s30api.wait_for_next_poll()
         # Intermittent errors due to Lennox servers, etc, may occur, log and keep pumping.
         except S30Exception as e:
             print("Message pump error " + str(e))
@@ -3,11 +3,27 @@
 import json
 import os
 import asyncio
+import timeit
+from typing import Callable
 import pytest
 
 from lennoxs30api.metrics import Metrics
 from lennoxs30api.s30api_async import s30api_async
 
+# Benchmarks print timings and only run when LENNOX_BENCHMARK is set, for example LENNOX_BENCHMARK=1 pytest -s
+benchmark = pytest.mark.skipif(os.environ.get("LENNOX_BENCHMARK") is None, reason="set LENNOX_BENCHMARK to run benchmarks")
+
+
+def run_benchmark(label: str, func: Callable[[], None], count: int, total_bytes: int = None, number: int = 20) -> float:
+    """Times number calls of func, which processes count items, prints the rate and returns the seconds per item"""
+    t = timeit.timeit(func, number=number)
+    per_item = t / (number * count)
+    line = f"{label:16} {1 / per_item:10.0f} items/s {per_item * 1e6:8.2f} us/item"
+    if total_bytes is not None:
+        line += f" {number * total_bytes / t / 1e6:8.1f} MB/s"
+    print(line)
+    return per_item
+
 
 def loadfile(name, sys_id=None) -> json:
     """Loads a JSON file from the messages directory"""
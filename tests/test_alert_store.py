@@ -0,0 +1,129 @@
+"""Tests the active alert store and alert events"""
+
+import os
+
+from lennoxs30api.alert_store import ALERT_ADDED, ALERT_CLEARED, ActiveAlertStore, AlertCodeStats, AlertEvent, AlertHistory
+from lennoxs30api.lennox_errors import LENNOX_UNKNOWN_ALERT_MESSAGE, LennoxErrorCodes, lennox_error_get_message_from_code
+from lennoxs30api.log_parser import parse_log
+from lennoxs30api.s30api_async import lennox_system, s30api_async
+
+LOG_DIR = os.path.dirname(__file__) + "/messages/logs/"
+
+
+def active_entry(alert_id: int, code: int, first: str = "100", count: int = 1, active: bool = True) -> dict:
+    """Builds an entry of the active alert array"""
+    return {"id": alert_id, "alert": {"code": code, "timestampFirst": first, "count": count, "isStillActive": active}}
+
+
+def test_message_from_code():
+    """Known codes return their message, unknown codes the unknown message"""
+    assert lennox_error_get_message_from_code(LennoxErrorCodes.lx_alarm_id_Firmware_Updated.value) == "Firmware Updated"
+    assert lennox_error_get_message_from_code(998) == LENNOX_UNKNOWN_ALERT_MESSAGE
+    assert lennox_error_get_message_from_code(None) == LENNOX_UNKNOWN_ALERT_MESSAGE
+
+
+def test_transitions():
+    """Only real transitions are reported"""
+    store = ActiveAlertStore()
+    changed, events = store.update([active_entry(0, 19), active_entry(1, 0), active_entry(2, 18, active=False)])
+    assert changed is True
+    assert [(e.event, e.alert["code"]) for e in events] == [(ALERT_ADDED, 19)]
+    assert store.alerts[0]["message"] == "High Ambient Auxiliary Heat Lockout"
+    assert len(store) == 1
+
+    assert store.update([active_entry(0, 19)]) == (False, [])
+
+    # Same alert with an updated count is a change but not a transition
+    changed, events = store.update([active_entry(0, 19, count=2)])
+    assert changed is True
+    assert events == []
+    assert store.alerts[0]["count"] == 2
+
+    # A different alert in the same slot
+    changed, events = store.update([active_entry(0, 434, first="200"), active_entry(3, 18)])
+    assert [(e.event, e.alert["code"]) for e in events] == [(ALERT_CLEARED, 19), (ALERT_ADDED, 434), (ALERT_ADDED, 18)]
+    assert [alert["code"] for alert in store.alerts] == [434, 18]
+
+    # Moving to another slot is not a transition
+    changed, events = store.update([active_entry(3, 18), active_entry(5, 434, first="200")])
+    assert changed is True
+    assert events == []
+    assert [alert["code"] for alert in store.alerts] == [18, 434]
+
+    changed, events = store.clear()
+    assert changed is True
+    assert sorted((e.event, e.alert["code"]) for e in events) == [(ALERT_CLEARED, 18), (ALERT_CLEARED, 434)]
+    assert store.alerts == []
+
+
+def test_alert_callbacks_from_log(api_system_04_furn_ac_zoning: s30api_async):
+    """Replaying the compressor power disconnect log reports the alert that cleared and not the one that moved slot"""
+    api = api_system_04_furn_ac_zoning
+    system: lennox_system = api.system_list[0]
+    events = []
+    system.registerOnUpdateCallbackAlerts(lambda event, alert: events.append((event, alert["code"])))
+    dirty = []
+    system.registerOnUpdateCallback(lambda: dirty.append(1), ["active_alerts"])
+    for entry in parse_log(LOG_DIR + "alerts_due_to_compressor_power_disconnect.txt"):
+        for message in entry.envelope["messages"]:
+            # The sender is redacted in the log
+            message["SenderID"] = system.sysId
+            api.processMessage(message)
+    # Alert 434 moves from slot 2 to slot 0 replacing alert 19
+    assert events == [(ALERT_CLEARED, 19)]
+    assert [alert["code"] for alert in system.active_alerts] == [434]
+    assert dirty == [1]
+
+
+def test_alert_history():
+    """Events are kept in a bounded buffer and statistics are kept per code"""
+    now = [1000.0]
+    history = AlertHistory(max_events=3, clock=lambda: now[0])
+    lockout = {"code": 18}
+    history.record([AlertEvent(ALERT_ADDED, lockout), AlertEvent(ALERT_ADDED, {"code": 19})])
+    now[0] = 1060.0
+    history.record([AlertEvent(ALERT_CLEARED, lockout)])
+    now[0] = 1100.0
+    history.record([AlertEvent(ALERT_ADDED, lockout)])
+    history.record([])
+
+    assert len(history) == 3
+    assert history.max_events == 3
+    assert [(entry.event, entry.code) for entry in history.events()] == [(ALERT_ADDED, 19), (ALERT_CLEARED, 18), (ALERT_ADDED, 18)]
+    assert [entry.timestamp for entry in history.events(since=1060.0)] == [1060.0, 1100.0]
+    assert sorted(history.codes()) == [18, 19]
+
+    stats = history.stats(18)
+    assert stats.raised == 2
+    assert stats.cleared == 1
+    assert stats.active == 1
+    assert stats.first_seen == 1000.0
+    assert stats.last_seen == 1100.0
+    assert stats.active_duration(now=1130.0) == 90.0
+    history.record([AlertEvent(ALERT_CLEARED, lockout)], timestamp=1150.0)
+    assert stats.active_duration() == 110.0
+    assert history.stats(434) is None
+
+
+def test_alert_code_stats():
+    """Statistics use the time events are received, a clear without a raise does not go negative"""
+    stats = AlertCodeStats(18)
+    stats.record_event(50.0, ALERT_CLEARED)
+    assert (stats.cleared, stats.active, stats.first_seen, stats.last_seen) == (1, 0, None, 50.0)
+    stats.record_event(100.0, ALERT_ADDED)
+    stats.record_event(110.0, ALERT_ADDED)
+    stats.record_event(130.0, ALERT_CLEARED)
+    assert stats.active == 1
+    assert stats.active_duration(now=150.0) == 50.0
+    stats.record_event(160.0, ALERT_CLEARED)
+    assert stats.active_duration(now=1000.0) == 60.0
+    assert stats.first_seen == 100.0
+
+
+def test_system_alert_history(api_system_04_furn_ac_zoning: s30api_async):
+    """The system records its alert events"""
+    system: lennox_system = api_system_04_furn_ac_zoning.system_list[0]
+    codes = [alert["code"] for alert in system.active_alerts]
+    assert sorted(entry.code for entry in system.alert_history.events()) == sorted(codes)
+    for code in codes:
+        assert system.alert_history.stats(code).active == 1
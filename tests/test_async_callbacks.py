@@ -0,0 +1,124 @@
+"""Tests coroutine update callbacks"""
+# pylint: disable=protected-access
+
+import asyncio
+import pytest
+
+from lennoxs30api.callback_runner import AsyncCallbackRunner
+from lennoxs30api.lennox_ble import LennoxBle
+from lennoxs30api.metrics import Metrics
+from lennoxs30api.s30api_async import lennox_system, lennox_zone, s30api_async
+
+
+def zone_message(sys_id: str, zone_id: int, status: dict) -> dict:
+    """Builds a zone status message"""
+    return {"SenderID": sys_id, "Data": {"zones": [{"id": zone_id, "status": status}]}}
+
+
+@pytest.mark.asyncio
+async def test_async_zone_and_system_callbacks(api: s30api_async):
+    """Coroutine callbacks run as tasks and do not block message processing"""
+    lsystem: lennox_system = api.system_list[0]
+    zone: lennox_zone = lsystem.getZone(0)
+    release = asyncio.Event()
+    calls = []
+
+    async def zone_callback():
+        await release.wait()
+        calls.append(("zone", zone.temperature))
+
+    async def diag_callback(eid_did, value):
+        calls.append((eid_did, value))
+
+    zone.registerOnUpdateCallback(zone_callback, match=["temperature"])
+    zone.registerOnUpdateCallback(lambda: calls.append("sync"))
+    lsystem.registerOnUpdateCallbackDiag(diag_callback)
+    api.processMessage(zone_message(lsystem.sysId, 0, {"temperature": 80}))
+    # The synchronous callback has run, the coroutine is waiting
+    assert calls == ["sync"]
+    assert api.callback_runner.pending == 1
+
+    lsystem.executeOnUpdateCallbacksDiag("1_0", "Yes")
+    release.set()
+    await api.callback_runner.join()
+    assert sorted(calls, key=str) == sorted(["sync", ("zone", 80), ("1_0", "Yes")], key=str)
+    assert api.callback_runner.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    """No more than max_concurrency callbacks run at once"""
+    runner = AsyncCallbackRunner(Metrics(), max_concurrency=2)
+    running = 0
+    max_running = 0
+
+    async def callback():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for _ in range(6):
+        runner.schedule(callback(), "test")
+    await runner.join()
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_failed_and_timeout_metrics():
+    """Slow, failed and timed out callbacks are counted"""
+    metrics = Metrics()
+    runner = AsyncCallbackRunner(metrics, timeout=0.1, slow_threshold=0.02)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+
+    async def fail():
+        raise ValueError("callback failed")
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    runner.schedule(slow(), "slow")
+    runner.schedule(fail(), "fail")
+    runner.schedule(hang(), "hang")
+    await runner.join()
+    assert metrics.callback_slow == 1
+    assert metrics.callback_failed == 1
+    assert metrics.callback_timeout == 1
+    assert metrics.getMetricList()["callback_timeout"] == 1
+
+
+def test_no_event_loop():
+    """Coroutine callbacks fired without a running loop are not run and are counted"""
+    metrics = Metrics()
+    runner = AsyncCallbackRunner(metrics)
+    calls = []
+
+    async def callback():
+        calls.append(1)
+
+    ble = LennoxBle(1, runner=runner)
+    ble.register_on_update_callback(callback)
+    ble.attr_updater({"deviceName": "sensor"}, "deviceName")
+    ble.execute_on_update_callbacks()
+    assert calls == []
+    assert metrics.callback_failed == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels():
+    """Stopping without draining cancels running callbacks"""
+    runner = AsyncCallbackRunner()
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(10)
+
+    task = runner.schedule(hang(), "hang")
+    await started.wait()
+    await runner.stop(drain=False)
+    assert task.cancelled() or task.done()
+    assert runner.pending == 0
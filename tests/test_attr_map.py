@@ -0,0 +1,95 @@
+"""Tests the declarative message to property mapping"""
+# pylint: disable=protected-access
+
+import pytest
+
+from lennoxs30api.attr_map import AttrMap, FeatureMap
+from lennoxs30api.lennox_ble import LennoxBle
+from lennoxs30api.s30api_async import (
+    _IAQ_MAP,
+    _IAQ_SENSOR_MAPS,
+    _SYSTEM_MESSAGE_MAP,
+    _WEATHER_MAP,
+    _WIFI_STATUS_MAP,
+    _ZONE_MESSAGE_MAP,
+    lennox_system,
+    lennox_zone,
+    s30api_async,
+)
+
+
+def test_nested_paths():
+    """Dotted paths and nested maps update the mapped properties, unknown keys are ignored"""
+    attr_map = AttrMap(
+        {
+            "deviceName": "deviceName",
+            "status.comm": "commStatus",
+            "status.control.model": "controlModelNumber",
+            "info": AttrMap({"serial": "controlSerialNumber"}),
+        }
+    )
+    assert sorted(attr_map.properties()) == sorted(["deviceName", "commStatus", "controlModelNumber", "controlSerialNumber"])
+    ble = LennoxBle(1)
+    data = {"deviceName": "s40", "unknown": 1, "status": {"control": {"model": "m1"}, "other": 2}, "info": {"serial": "s1"}}
+    assert attr_map.update(ble, data) is True
+    assert ble.deviceName == "s40"
+    assert ble.controlModelNumber == "m1"
+    assert ble.controlSerialNumber == "s1"
+    assert ble.commStatus is None
+    assert ble._dirty_set == {"deviceName", "controlModelNumber", "controlSerialNumber"}
+    # Nothing changed
+    assert attr_map.update(ble, data) is False
+    # A section that is not a dict is skipped
+    assert attr_map.update(ble, {"status": None}) is False
+
+
+def test_feature_map():
+    """Mapped features copy their first value, others and malformed features are skipped"""
+    feature_map = FeatureMap({3000: "controlModelNumber", 3001: "controlSerialNumber", 3002: "controlHardwareVersion"})
+    ble = LennoxBle(1)
+    features = [
+        {"feature": {"fid": 3000, "values": [{"value": "m1"}, {"value": "ignored"}]}},
+        {"feature": {"fid": 3001, "values": []}},
+        {"feature": {"fid": 3002}},
+        {"feature": {"fid": 42, "values": [{"value": "x"}]}},
+        {"other": {}},
+    ]
+    assert feature_map.update(ble, features) is True
+    assert ble.controlModelNumber == "m1"
+    assert ble.controlSerialNumber is None
+    assert ble.controlHardwareVersion is None
+    assert ble._dirty_set == {"controlModelNumber"}
+    assert feature_map.update(ble, features) is False
+
+
+def test_duplicate_mapping():
+    """A key mapped to both a property and a section is rejected"""
+    with pytest.raises(ValueError):
+        AttrMap({"status": "commStatus", "status.comm": "commStatus"})
+
+
+def test_tables_match_properties():
+    """Every property in the message tables exists on the object it updates"""
+    lsystem = lennox_system("sys")
+    zone = lennox_zone(lsystem, 0)
+    system_maps = [_SYSTEM_MESSAGE_MAP, _IAQ_MAP, _WEATHER_MAP, _WIFI_STATUS_MAP]
+    system_maps.extend(_IAQ_SENSOR_MAPS.values())
+    for attr_map in system_maps:
+        for name in attr_map.properties():
+            assert name in lennox_system.__slots__
+            assert hasattr(lsystem, name)
+    for name in _ZONE_MESSAGE_MAP.properties():
+        assert name in lennox_zone.__slots__
+        assert hasattr(zone, name)
+
+
+def test_sparse_zone_update(api: s30api_async):
+    """A message with a single field only dirties that property"""
+    lsystem: lennox_system = api.system_list[0]
+    zone: lennox_zone = lsystem.getZone(0)
+    calls = []
+    zone.registerOnUpdateCallback(lambda: calls.append(set(zone._dirty_set)))
+    zone.processMessage({"status": {"temperature": 91, "period": {"csp": 61}}})
+    assert calls == [{"temperature", "csp"}]
+    assert zone.temperature == 91
+    assert zone.csp == 61
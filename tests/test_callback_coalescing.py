@@ -0,0 +1,131 @@
+"""Tests coalesced delivery of update callbacks"""
+# pylint: disable=protected-access
+
+import asyncio
+import json
+from unittest.mock import patch
+import pytest
+
+from lennoxs30api.s30api_async import lennox_system, lennox_zone, s30api_async
+from tests.conftest import loadfile
+
+
+class DirtyCallback(object):
+    """Records the dirty properties at each call"""
+
+    def __init__(self, zone: lennox_zone):
+        self.zone = zone
+        self.calls: list[set[str]] = []
+
+    def update_callback(self):
+        """Callback update"""
+        self.calls.append(set(self.zone._dirty_set))
+
+
+def zone_message(sys_id: str, zone_id: int, status: dict) -> dict:
+    """Builds a zone status message"""
+    return {"SenderID": sys_id, "Data": {"zones": [{"id": zone_id, "status": status}]}}
+
+
+def test_coalesce_zone_updates(api: s30api_async):
+    """Each subscriber fires once with the union of the changed properties"""
+    lsystem: lennox_system = api.system_list[0]
+    zone: lennox_zone = lsystem.getZone(0)
+    callback = DirtyCallback(zone)
+    zone.registerOnUpdateCallback(callback.update_callback)
+    humidity_calls = []
+    zone.registerOnUpdateCallback(lambda: humidity_calls.append(1), match=["humidity"])
+
+    api.start_callback_coalescing()
+    api.processMessage(zone_message(lsystem.sysId, 0, {"temperature": 80}))
+    api.processMessage(zone_message(lsystem.sysId, 0, {"humidity": 44}))
+    api.processMessage(zone_message(lsystem.sysId, 0, {"temperature": 81}))
+    assert callback.calls == []
+    assert api.callback_coalescer.pending == 1
+
+    assert api.flush_callbacks() == 1
+    assert callback.calls == [{"temperature", "humidity"}]
+    assert humidity_calls == [1]
+    assert zone.temperature == 81
+    assert api.flush_callbacks() == 0
+
+    api.stop_callback_coalescing()
+    api.processMessage(zone_message(lsystem.sysId, 0, {"temperature": 82}))
+    assert callback.calls == [{"temperature", "humidity"}, {"temperature"}]
+
+
+def test_coalesce_diagnostics(api_device_lcc: s30api_async):
+    """Diagnostic subscribers receive the latest value once per flush"""
+    api = api_device_lcc
+    lsystem: lennox_system = api.system_list[0]
+    api.processMessage(loadfile("equipments_response_energy.json"))
+    calls = []
+    lsystem.registerOnUpdateCallbackDiag(lambda eid_did, value: calls.append((eid_did, value)), ["1_0"])
+
+    api.start_callback_coalescing()
+    message = loadfile("equipments_diag_update.json")
+    api.processMessage(message)
+    message["Data"]["equipments"][0]["equipment"]["diagnostics"][0]["diagnostic"]["value"] = "No"
+    api.processMessage(message)
+    assert calls == []
+    api.flush_callbacks()
+    assert calls == [("1_0", "No")]
+
+
+class HttpResp:
+    """Mock an http response"""
+
+    def __init__(self, status, text: str | None = None):
+        self.status = status
+        self.content_length = 100
+        self._text = text
+
+    async def text(self) -> str:
+        return self._text
+
+
+@pytest.mark.asyncio
+async def test_coalesce_per_retrieve(api: s30api_async):
+    """Callbacks are delivered once at the end of each retrieve"""
+    lsystem: lennox_system = api.system_list[0]
+    zone: lennox_zone = lsystem.getZone(0)
+    callback = DirtyCallback(zone)
+    zone.registerOnUpdateCallback(callback.update_callback)
+    messages = [zone_message(lsystem.sysId, 0, {"temperature": 70 + i}) for i in range(10)]
+
+    api.start_callback_coalescing()
+    with patch.object(api, "get") as mock_get:
+        mock_get.return_value = HttpResp(200, json.dumps({"messages": messages}))
+        assert await api.messagePump() is True
+    assert callback.calls == [{"temperature"}]
+    assert zone.temperature == 79
+
+    # With the dispatcher the flush happens once the queues are drained
+    api.start_message_dispatcher()
+    with patch.object(api, "get") as mock_get:
+        messages = [zone_message(lsystem.sysId, 0, {"temperature": 60 + i}) for i in range(10)]
+        mock_get.return_value = HttpResp(200, json.dumps({"messages": messages}))
+        assert await api.messagePump() is True
+        assert len(callback.calls) == 1
+        await api.join_message_dispatcher()
+    assert callback.calls == [{"temperature"}, {"temperature"}]
+    assert zone.temperature == 69
+    await api.stop_message_dispatcher()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_time_window(api: s30api_async):
+    """With a window, callbacks are delivered when the window expires"""
+    lsystem: lennox_system = api.system_list[0]
+    zone: lennox_zone = lsystem.getZone(0)
+    callback = DirtyCallback(zone)
+    zone.registerOnUpdateCallback(callback.update_callback)
+
+    api.start_callback_coalescing(window=0.05)
+    api.processMessage(zone_message(lsystem.sysId, 0, {"temperature": 80}))
+    api.processMessage(zone_message(lsystem.sysId, 0, {"humidity": 44}))
+    # The end of a batch does not flush when using a window
+    api._flushBatchCallbacks()
+    assert callback.calls == []
+    await asyncio.sleep(0.1)
+    assert callback.calls == [{"temperature", "humidity"}]
@@ -0,0 +1,65 @@
+"""Tests the callback registry"""
+
+import logging
+
+from lennoxs30api.callback_registry import CallbackRegistry
+
+
+def test_matching_order_and_dedup():
+    """Callbacks fire once each, in registration order, only when a matched property changes"""
+    calls = []
+    registry = CallbackRegistry()
+    registry.register(lambda: calls.append("csp_hsp"), match=["csp", "hsp"])
+    registry.register(lambda: calls.append("all"))
+    registry.register(lambda: calls.append("fan"), match=["fanMode"])
+    registry.register(lambda: calls.append("hsp"), match=["hsp", "hsp"])
+    assert len(registry) == 4
+
+    registry.execute({"hsp", "csp", "humidity"}, "test")
+    assert calls == ["csp_hsp", "all", "hsp"]
+    calls.clear()
+    registry.execute({"fanMode"}, "test")
+    assert calls == ["all", "fan"]
+    calls.clear()
+    registry.execute(set(), "test")
+    assert calls == ["all"]
+
+
+def test_exception_does_not_stop_dispatch(caplog):
+    """A failing callback is logged and the remaining callbacks are called"""
+    calls = []
+
+    def fail(value):
+        raise ValueError("callback failed")
+
+    registry = CallbackRegistry()
+    registry.register(fail, match=["csp"])
+    registry.register(lambda value: calls.append(value), match=["csp"])
+    registry.register(lambda value: calls.append("never"), match=["hsp"])
+    with caplog.at_level(logging.ERROR):
+        registry.execute(["csp"], "zone [0]", 1)
+        assert calls == [1]
+        assert len(caplog.records) == 1
+        assert "zone [0]" in caplog.messages[0]
+
+
+def test_execute_one():
+    """Single key dispatch merges keyed and wildcard callbacks in registration order"""
+    calls = []
+    registry = CallbackRegistry()
+    registry.register(lambda diag_id, value: calls.append(("all", diag_id)))
+    registry.register(lambda diag_id, value: calls.append(("1_2", value)), match=["1_2", "1_3"])
+    registry.register(lambda diag_id, value: calls.append(("all2", diag_id)))
+
+    registry.execute_one("1_2", "test", "1_2", 5)
+    assert calls == [("all", "1_2"), ("1_2", 5), ("all2", "1_2")]
+    calls.clear()
+    registry.execute_one("2_1", "test", "2_1", 6)
+    assert calls == [("all", "2_1"), ("all2", "2_1")]
+
+    keyed = CallbackRegistry()
+    keyed.register(lambda diag_id, value: calls.append(("keyed", value)), match=["1_2"])
+    calls.clear()
+    keyed.execute_one("1_2", "test", "1_2", 7)
+    keyed.execute_one("1_3", "test", "1_3", 8)
+    assert calls == [("keyed", 7)]
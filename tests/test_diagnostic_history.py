@@ -0,0 +1,125 @@
+"""Tests the diagnostic history ring buffers"""
+
+import pytest
+
+from lennoxs30api.diagnostic_history import DiagnosticSeries
+from lennoxs30api.s30api_async import lennox_system, s30api_async
+from tests.conftest import loadfile
+
+
+def test_series_wraps():
+    """The series keeps the newest capacity values and skips values that are not numeric"""
+    series = DiagnosticSeries(capacity=3)
+    assert series.latest() is None
+    assert series.samples() == []
+    for i, value in enumerate(["1", "2.5", "waiting...", None, "3", "4"]):
+        series.append(value, timestamp=100.0 + i)
+    assert len(series) == 3
+    assert series.invalid == 2
+    assert series.samples() == [(101.0, 2.5), (104.0, 3.0), (105.0, 4.0)]
+    assert series.latest() == 4.0
+    with pytest.raises(ValueError):
+        DiagnosticSeries(capacity=0)
+
+
+def test_downsample():
+    """Values are aggregated per interval"""
+    series = DiagnosticSeries(capacity=10)
+    for timestamp, value in [(0, 1), (30, 3), (59, 2), (60, 10), (3600, 5), (3661, 7)]:
+        series.append(value, timestamp=timestamp)
+    minutes = series.per_minute()
+    assert [(s.start, s.min, s.max, s.mean, s.count) for s in minutes] == [
+        (0, 1, 3, 2, 3),
+        (60, 10, 10, 10, 1),
+        (3600, 5, 5, 5, 1),
+        (3660, 7, 7, 7, 1),
+    ]
+    hours = series.per_hour()
+    assert [(s.start, s.min, s.max, s.count) for s in hours] == [(0, 1, 10, 4), (3600, 5, 7, 2)]
+    assert hours[0].mean == 4.0
+    assert series.downsample(60) == minutes
+    assert series.downsample(3600) == hours
+
+
+def test_aggregates_outlive_raw_values():
+    """The minute and hour aggregates are kept after the raw values are overwritten"""
+    series = DiagnosticSeries(capacity=10, minutes=3, hours=2)
+    # A value every 5 seconds for 3 hours
+    for i in range(3 * 720):
+        series.append(float(i % 12), timestamp=i * 5.0)
+    assert len(series) == 10
+    assert [s.start for s in series.per_minute()] == [10620, 10680, 10740]
+    assert all((s.min, s.max, s.mean, s.count) == (0, 11, 5.5, 12) for s in series.per_minute())
+    hours = series.per_hour()
+    assert [(s.start, s.min, s.max, s.count) for s in hours] == [(3600, 0, 11, 720), (7200, 0, 11, 720)]
+    # The raw values only cover the last 50 seconds
+    assert [s.count for s in series.downsample(3600)] == [10]
+
+    # A value from before the newest interval is added to it
+    series.append(100, timestamp=0)
+    assert series.per_minute()[-1].max == 100
+    with pytest.raises(ValueError):
+        DiagnosticSeries(minutes=0)
+
+
+def test_system_history(api_device_lcc: s30api_async):
+    """History is only kept for the selected diagnostics once enabled"""
+    api = api_device_lcc
+    lsystem: lennox_system = api.system_list[0]
+    api.processMessage(loadfile("equipments_response_energy.json"))
+    diagnostic = lsystem.equipment[1].diagnostics[1]
+    assert diagnostic.history is None
+
+    lsystem.enable_diagnostic_history(["1_1"], capacity=5)
+    message = loadfile("equipments_diag_update.json")
+    api.processMessage(message)
+    api.processMessage(message)
+    assert len(diagnostic.history) == 2
+    assert diagnostic.history.latest() == 10.0
+    for did, other in lsystem.equipment[1].diagnostics.items():
+        if did != 1:
+            assert other.history is None
+
+    # Values of an invalid diagnostic are not recorded
+    message["Data"]["equipments"][0]["equipment"]["diagnostics"][1]["diagnostic"].update({"value": "99.0", "valid": False})
+    api.processMessage(message)
+    assert len(diagnostic.history) == 2
+    assert diagnostic.history.invalid == 1
+    assert diagnostic.history.latest() == 10.0
+
+    lsystem.disable_diagnostic_history()
+    assert diagnostic.history is None
+    api.processMessage(message)
+    assert diagnostic.history is None
+
+
+def test_system_history_reenable(api_device_lcc: s30api_async):
+    """Enabling again applies the new match and capacity to the diagnostics already recorded"""
+    api = api_device_lcc
+    lsystem: lennox_system = api.system_list[0]
+    api.processMessage(loadfile("equipments_response_energy.json"))
+    diagnostic_0 = lsystem.equipment[1].diagnostics[0]
+    diagnostic_1 = lsystem.equipment[1].diagnostics[1]
+    message = loadfile("equipments_diag_update.json")
+
+    lsystem.enable_diagnostic_history(["1_1"], capacity=5)
+    api.processMessage(message)
+    assert len(diagnostic_1.history) == 1
+
+    lsystem.enable_diagnostic_history(["1_0"], capacity=5)
+    assert diagnostic_1.history is None
+    api.processMessage(message)
+    assert diagnostic_1.history is None
+    assert diagnostic_0.history.invalid == 1
+
+    # The same match and capacity keep the history
+    history = diagnostic_0.history
+    lsystem.enable_diagnostic_history(["1_0"], capacity=5)
+    assert diagnostic_0.history is history
+
+    lsystem.enable_diagnostic_history(capacity=10)
+    assert diagnostic_0.history is None
+    api.processMessage(message)
+    assert diagnostic_0.history.capacity == 10
+    assert diagnostic_1.history.capacity == 10
+    assert diagnostic_1.history.latest() == 10.0
@@ -135,11 +135,13 @@ def test_process_diagnostics(api_device_lcc: s30api_async):
     assert eq_did.name == "Comp. Short Cycle Delay Active"
     assert eq_did.unit == ""
     assert eq_did.value == "No"
+    assert eq_did.numeric_value is None
 
     eq_did: lennox_equipment_diagnostic = eq1.diagnostics[1]
     assert eq_did.name == "Cooling Rate"
     assert eq_did.unit == "%"
     assert eq_did.value == "0.0"
+    assert eq_did.numeric_value == 0.0
 
     eq_did: lennox_equipment_diagnostic = eq1.diagnostics[2]
     assert eq_did.name == "Heating Rate"
@@ -160,6 +162,7 @@ def test_process_diagnostics(api_device_lcc: s30api_async):
     assert eq_did.name == "Liquid Line Temp"
     assert eq_did.unit == "F"
     assert eq_did.value == "64.3"
+    assert eq_did.numeric_value == 64.3
 
     eq_did: lennox_equipment_diagnostic = eq1.diagnostics[22]
     assert eq_did.name == "Compressor Current"
@@ -1,5 +1,6 @@
 """Test the equipment parameters"""
 
+import copy
 import json
 from unittest.mock import patch
 
@@ -288,6 +289,29 @@ def test_process_equipment_parameters_subscription(api: s30api_async):
     assert par.value == "15"
 
 
+def test_unchanged_parameters_skipped(api: s30api_async):
+    """Repeated equipment refreshes only notify subscribers of parameters that changed"""
+    system: lennox_system = api.system_list[0]
+    calls = []
+    system.registerOnUpdateCallbackEqParameters(calls.append)
+    callbacks = []
+    system.registerOnUpdateCallback(lambda: callbacks.append(1), ["single_setpoint_mode"])
+    message = loadfile("equipments_lcc_splitsetpoint.json", system.sysId)
+    system.processMessage(message)
+    calls.clear()
+    callbacks.clear()
+
+    system.processMessage(message)
+    assert calls == []
+    assert callbacks == []
+
+    parameter = message["Data"]["equipments"][0]["equipment"]["parameters"][0]["parameter"]
+    parameter["value"] = "changed"
+    system.processMessage(message)
+    assert calls == [f"0_{parameter['pid']}"]
+    assert system.equipment[0].parameters[parameter["pid"]].value == "changed"
+
+
 def test_equipment_parameters_validate_and_translate_radio(api: s30api_async):
     """Verify translation of parameter radio buttons"""
     system: lennox_system = api.system_list[0]
@@ -493,3 +517,76 @@ async def test_set_parameter_value(api):
         assert par_update["et"] == 19
         assert par_update["pid"] == 44
         assert par_update["value"] == "325"
+
+
+def test_equipment_parameters_parsed_once(api: s30api_async):
+    """Limits are parsed once and parsed again when the properties they come from change"""
+    # pylint: disable=protected-access
+    system: lennox_system = api.system_list[0]
+    equipment = system.equipment[0]
+    parameter = equipment.parameters[114]
+    assert parameter.validate_and_translate("2.0") == "2.0"
+    limits = parameter._limits
+    assert limits == (1.5, 10.0, 0.5)
+    assert parameter.numeric_value == 1.5
+
+    # Repeating the same parameter keeps the parsed limits
+    system.processMessage(loadfile("equipments_lcc_splitsetpoint.json", system.sysId))
+    assert parameter._limits is limits
+
+    parameter.range_min = "5"
+    with pytest.raises(S30Exception) as ex:
+        parameter.validate_and_translate("2.0")
+    assert "between [5] and [10]" in ex.value.message
+    parameter.value = "6"
+    assert parameter.numeric_value == 6.0
+
+    parameter = equipment.parameters[107]
+    assert parameter._radio_ids == {"display only": 0, "basic": 1, "precision": 2}
+    parameter.radio = {0: "Off", 1: "On"}
+    assert parameter.validate_and_translate("On") == 1
+
+    par = lennox_equipment_parameter(10, 11)
+    par.fromJson({"descriptor": "range", "range": {"min": "", "max": "5", "inc": "1"}, "value": "x"})
+    assert par.numeric_value is None
+    with pytest.raises(S30Exception) as ex:
+        par.validate_and_translate("1")
+    assert "could not convert" in ex.value.message
+
+    par.fromJson({"range": {"min": "0"}, "value": "3"})
+    assert par.numeric_value == 3.0
+    assert par.validate_and_translate("3") == "3"
+    assert par._limits == (0.0, 5.0, 1.0)
+
+
+def test_equipment_parameters_radio_index():
+    """The radio choices are replaced by each new list and looked up ignoring case"""
+    par = lennox_equipment_parameter(10, 11)
+    js = {"descriptor": "radio", "radio": {"texts": [{"id": 0, "text": "Off"}, {"id": 1, "text": "On"}, {"id": 2, "text": "Auto"}]}}
+    assert par.fromJson(js) is True
+    assert par.validate_and_translate("Auto") == 2
+    assert par.validate_and_translate("auto") == 2
+    assert par.validate_and_translate("ON") == 1
+    assert par.radio_id("oFF") == 0
+    assert par.radio_id("Missing") is None
+    assert par.radio_id(None) is None
+
+    js = {"descriptor": "radio", "radio": {"texts": [{"id": 0, "text": "Off"}, {"id": 1, "text": "On"}]}}
+    assert par.fromJson(js) is True
+    assert par.radio == {0: "Off", 1: "On"}
+    assert par.radio_id("Auto") is None
+    with pytest.raises(S30Exception) as ex:
+        par.validate_and_translate("Auto")
+    assert ex.value.error_code == EC_BAD_PARAMETERS
+
+    # The same list again is not a change
+    assert par.fromJson(js) is False
+    js = copy.deepcopy(js)
+    js["radio"]["texts"].reverse()
+    assert par.fromJson(js) is False
+    assert par.radio == {0: "Off", 1: "On"}
+
+    # A value change with the same list is a change
+    js["value"] = "0"
+    assert par.fromJson(js) is True
+    assert par.radio == {0: "Off", 1: "On"}
@@ -0,0 +1,75 @@
+"""Tests the JSON codec and compares the decode throughput of the installed backends"""
+# pylint: disable=protected-access
+
+import glob
+import json
+import os
+import pytest
+
+from lennoxs30api import json_codec
+from tests.conftest import benchmark, run_benchmark
+
+
+def load_fixtures() -> list[str]:
+    """Returns the text of each recorded message in tests/messages that is valid JSON"""
+    script_dir = os.path.dirname(__file__) + "/messages/"
+    texts = []
+    for file_path in sorted(glob.glob(os.path.join(script_dir, "*.json"))):
+        with open(file_path, encoding="utf-8") as f:
+            text = f.read()
+        try:
+            json.loads(text)
+        except json.JSONDecodeError:
+            continue
+        texts.append(text)
+    return texts
+
+
+@pytest.fixture
+def restore_backend():
+    """Restores the default backend after the test"""
+    yield
+    json_codec.set_backend()
+
+
+def test_default_backend():
+    """The fastest installed backend is selected and json is always available"""
+    backends = json_codec.available_backends()
+    assert json_codec.BACKEND_JSON in backends
+    assert json_codec.backend == backends[0]
+
+
+@pytest.mark.parametrize("backend", json_codec.available_backends())
+def test_round_trip(backend, restore_backend):  # pylint: disable=unused-argument,redefined-outer-name
+    """Every backend decodes the fixtures the same as the standard library"""
+    assert json_codec.set_backend(backend) == backend
+    for text in load_fixtures():
+        expected = json.loads(text)
+        assert json_codec.loads(text) == expected
+        assert json_codec.loads(text.encode("utf-8")) == expected
+        assert json_codec.loads(json_codec.dumps(expected)) == expected
+        assert json_codec.dumps(expected, indent=4) == json.dumps(expected, indent=4)
+
+    with pytest.raises(json.JSONDecodeError):
+        json_codec.loads("Invalid json {}''")
+
+
+def test_unknown_backend(restore_backend):  # pylint: disable=unused-argument,redefined-outer-name
+    """Unknown and uninstalled backends are rejected"""
+    with pytest.raises(ValueError):
+        json_codec.set_backend("simplejson")
+    for backend in (json_codec.BACKEND_ORJSON, json_codec.BACKEND_MSGSPEC):
+        if backend not in json_codec.available_backends():
+            with pytest.raises(ImportError):
+                json_codec.set_backend(backend)
+    assert json_codec.backend in json_codec.available_backends()
+
+
+@benchmark
+def test_decode_benchmark(restore_backend):  # pylint: disable=unused-argument,redefined-outer-name
+    """Compares the decode throughput of each installed backend on the recorded messages"""
+    texts = [text.encode("utf-8") for text in load_fixtures()]
+    total_bytes = sum(len(text) for text in texts)
+    for backend in json_codec.available_backends():
+        json_codec.set_backend(backend)
+        run_benchmark(backend, lambda: [json_codec.loads(text) for text in texts], len(texts), total_bytes)
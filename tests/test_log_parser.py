@@ -0,0 +1,102 @@
+"""Tests extracting message envelopes from debug logs"""
+
+import io
+import os
+from datetime import datetime
+
+from lennoxs30api.log_parser import DebugLogParser, main, parse_log, process_log
+from lennoxs30api.message_capture import MessageCaptureReader
+from lennoxs30api.s30api_async import s30api_async
+
+LOG_DIR = os.path.dirname(__file__) + "/messages/logs/"
+
+
+def test_parse_log_file():
+    """Envelopes are extracted with their timestamps, truncated JSON is skipped"""
+    with open(LOG_DIR + "cfm.txt", encoding="utf-8") as f:
+        parser = DebugLogParser(f)
+        entries = list(parser)
+    assert parser.envelope_count == 6
+    assert len(entries) == 6
+    # The envelope after "AC Low normal cooling airflow" has lost its log line and is not found
+    assert parser.error_count == 0
+    assert entries[0].timestamp == datetime(2022, 6, 27, 14, 17, 33, 595000).timestamp()
+    message = entries[0].envelope["messages"][0]
+    assert message["Data"]["equipments"][0]["equipment"]["parameters"][0]["parameter"]["pid"] == 44
+
+
+def test_parse_log_formats():
+    """Both log formats are parsed, single messages are wrapped and incomplete records are counted"""
+    log = io.StringIO(
+        """Free text before the messages { not json
+2021-11-09 11:45:49 DEBUG (MainThread) [lennoxs30api.s30api_async] {
+    "SenderID": "LCC",
+    "Data": {"system": {"config": {"name": "a {brace} in a string"}}}
+}
+2021-11-09 11:45:50 DEBUG (MainThread) [lennoxs30api.s30api_async] messagePump
+2022-06-22 09:05:23,228 [MainThread  ] [DEBUG]  {
+    "messages": [
+2022-06-22 09:05:24,001 [MainThread  ] [DEBUG]  {"messages": []}
+2022-06-22 09:05:25,500 [MainThread  ] [DEBUG]  {
+    "messages": [
+"""
+    )
+    parser = DebugLogParser(log)
+    entries = list(parser)
+    assert len(entries) == 2
+    assert entries[0].envelope == {"messages": [{"SenderID": "LCC", "Data": {"system": {"config": {"name": "a {brace} in a string"}}}}]}
+    assert entries[0].timestamp == datetime(2021, 11, 9, 11, 45, 49).timestamp()
+    assert entries[1].envelope == {"messages": []}
+    assert entries[1].timestamp == datetime(2022, 6, 22, 9, 5, 24, 1000).timestamp()
+    assert parser.error_count == 2
+
+
+def test_process_log(api_system_04_furn_ac_zoning: s30api_async):
+    """The messages in a log are processed by the api"""
+    api = api_system_04_furn_ac_zoning
+    api.metrics.reset()
+    assert process_log(api, LOG_DIR + "cfm.txt") == 6
+    assert api.metrics.message_count == 6
+    equipment = api.system_list[0].equipment[1]
+    assert equipment.parameters[44].value == "1255"
+
+
+def test_main_capture(tmp_path, capsys):
+    """The command line converts logs to a capture"""
+    path = str(tmp_path / "logs.s30")
+    assert main([LOG_DIR + "cfm.txt", LOG_DIR + "alerts.txt", "--capture", path, "--compression", "zlib"]) == 0
+    assert "cfm.txt: 6 messages" in capsys.readouterr().out
+    reader = MessageCaptureReader(path)
+    assert len(reader) == 8
+    # The log entries are not in time order
+    assert reader.ordered is False
+    first = datetime(2022, 6, 27, 14, 15, 0).timestamp()
+    assert len(list(reader.read(start=first, end=first + 60))) == 1
+    assert [c.message for c in reader] == [m for e in parse_log(LOG_DIR + "cfm.txt") for m in e.envelope["messages"]] + [
+        m for e in parse_log(LOG_DIR + "alerts.txt") for m in e.envelope["messages"]
+    ]
+
+
+def test_parse_log_skips_sent_messages(api: s30api_async, tmp_path):
+    """Commands and data requests logged when they are sent are not replayed"""
+    lsystem = api.system_list[0]
+    path = str(tmp_path / "debug.log")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            f"""2022-06-22 09:05:23,228 [MainThread  ] [DEBUG]  {{"MessageType":"Command","SenderID":"mapp079372367644467046827001_myemail@email.com","MessageID":"1","TargetID":"{lsystem.sysId}","Data":{{"system":{{"config":{{"temperatureUnit":"C"}}}}}}}}
+2022-06-22 09:05:23,300 [MainThread  ] [DEBUG]  {{"MessageType":"RequestData","SenderID":"mapp079372367644467046827001_myemail@email.com","MessageID":"2","TargetID":"{lsystem.sysId}","AdditionalParameters":{{"JSONPath":"/systemControl"}},"Data":{{}}}}
+2022-06-22 09:05:24,001 [MainThread  ] [DEBUG]  {{"messages": [{{"MessageType":"PropertyChange","SenderID":"{lsystem.sysId}","Data":{{"system":{{"config":{{"name":"replayed"}}}}}}}}]}}
+"""
+        )
+    with open(path, encoding="utf-8") as f:
+        parser = DebugLogParser(f)
+        entries = list(parser)
+    assert len(entries) == 1
+    assert parser.sent_count == 2
+    assert parser.error_count == 0
+
+    unit = lsystem.temperatureUnit
+    assert unit != "C"
+    assert process_log(api, path) == 1
+    assert lsystem.temperatureUnit == unit
+    assert lsystem.name == "replayed"
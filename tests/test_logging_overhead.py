@@ -0,0 +1,77 @@
+"""Tests that message processing does not format debug messages when debug logging is off"""
+# pylint: disable=protected-access
+
+import io
+import logging
+
+from lennoxs30api.s30api_async import lennox_system, lennox_zone, s30api_async
+from tests.conftest import benchmark, run_benchmark
+
+
+class FormatCounter(object):
+    """Counts how often it is converted to a string"""
+
+    def __init__(self, value):
+        self.value = value
+        self.count = 0
+
+    def __eq__(self, other) -> bool:
+        return self.value == other
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __str__(self) -> str:
+        self.count += 1
+        return str(self.value)
+
+    def __format__(self, format_spec) -> str:
+        self.count += 1
+        return format(self.value, format_spec)
+
+
+def zone_message(sys_id: str, temperature: int) -> dict:
+    """Builds a zone status message"""
+    return {"SenderID": sys_id, "Data": {"zones": [{"id": 0, "status": {"temperature": temperature}}]}}
+
+
+def test_no_formatting_at_info(api: s30api_async):
+    """Debug messages on the processing path are only formatted when debug is enabled"""
+    lsystem: lennox_system = api.system_list[0]
+    zone: lennox_zone = lsystem.getZone(0)
+    zone_id = zone.id
+    counter = FormatCounter(zone_id)
+    zone.id = counter
+    logger = logging.getLogger("lennoxs30api.s30api_async")
+    level = logger.level
+    try:
+        logger.setLevel(logging.INFO)
+        api.processMessage(zone_message(lsystem.sysId, 81))
+        assert zone.temperature == 81
+        assert counter.count == 0
+
+        logger.setLevel(logging.DEBUG)
+        handler = logging.StreamHandler(io.StringIO())
+        logger.addHandler(handler)
+        try:
+            api.processMessage(zone_message(lsystem.sysId, 82))
+        finally:
+            logger.removeHandler(handler)
+        assert counter.count > 0
+    finally:
+        logger.setLevel(level)
+        zone.id = zone_id
+
+
+@benchmark
+def test_process_message_benchmark(api: s30api_async):
+    """Reports the per message cost of processing a zone update with INFO logging"""
+    lsystem: lennox_system = api.system_list[0]
+    messages = [zone_message(lsystem.sysId, 60 + i % 20) for i in range(100)]
+    logger = logging.getLogger("lennoxs30api")
+    level = logger.level
+    try:
+        logger.setLevel(logging.INFO)
+        run_benchmark("processMessage", lambda: [api.processMessage(message) for message in messages], len(messages))
+    finally:
+        logger.setLevel(level)
@@ -0,0 +1,201 @@
+"""Tests capturing messages and replaying them"""
+# pylint: disable=protected-access
+
+import json
+import threading
+import time
+from unittest.mock import patch
+import pytest
+
+from lennoxs30api.message_capture import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    COMPRESSION_ZSTD,
+    MAGIC,
+    MessageCaptureReader,
+    MessageCaptureWriter,
+    QueuedMessageCaptureWriter,
+)
+from lennoxs30api.message_logger import REDACTED
+from lennoxs30api.metrics import Metrics
+from lennoxs30api.s30api_async import s30api_async
+from tests.conftest import loadfile
+
+
+@pytest.mark.parametrize("compression", [COMPRESSION_NONE, COMPRESSION_ZLIB])
+def test_capture_round_trip(tmp_path, compression):
+    """Messages read back the same as they were written"""
+    path = str(tmp_path / "capture.s30")
+    messages = [
+        loadfile("system_uptime.json", "sys_1"),
+        loadfile("config_response_system_01.json", "sys_2"),
+        loadfile("system_uptime.json", "sys_1"),
+    ]
+    writer = MessageCaptureWriter(path, compression)
+    for i, message in enumerate(messages):
+        writer.write(message, timestamp=1000.0 + i)
+    writer.close()
+
+    reader = MessageCaptureReader(path)
+    assert len(reader) == 3
+    captured = list(reader)
+    assert [c.message for c in captured] == messages
+    assert [c.sys_id for c in captured] == ["sys_1", "sys_2", "sys_1"]
+    assert [c.timestamp for c in captured] == [1000.0, 1001.0, 1002.0]
+
+    assert [c.timestamp for c in reader.read(sys_id="sys_1")] == [1000.0, 1002.0]
+    assert [c.timestamp for c in reader.read(start=1001.0)] == [1001.0, 1002.0]
+    assert [c.timestamp for c in reader.read(start=1000.5, end=1002.0)] == [1001.0]
+
+    # Appending to an existing capture does not write another header
+    writer = MessageCaptureWriter(path, compression)
+    writer.write(messages[0], timestamp=1003.0)
+    writer.close()
+    assert len(MessageCaptureReader(path)) == 4
+
+
+def test_capture_truncated(tmp_path):
+    """A partially written record at the end of the capture is ignored"""
+    path = str(tmp_path / "capture.s30")
+    writer = MessageCaptureWriter(path)
+    writer.write({"SenderID": "sys_1", "Data": {}})
+    writer.write({"SenderID": "sys_1", "Data": {"system": {}}})
+    writer.close()
+    with open(path, "rb+") as f:
+        f.truncate(f.seek(0, 2) - 5)
+    reader = MessageCaptureReader(path)
+    assert len(reader) == 1
+    assert next(iter(reader)).message == {"SenderID": "sys_1", "Data": {}}
+
+    # Appending removes the partial record rather than writing after it
+    writer = MessageCaptureWriter(path)
+    writer.write({"SenderID": "sys_2", "Data": {"zones": []}})
+    writer.close()
+    reader = MessageCaptureReader(path)
+    assert [c.message for c in reader] == [{"SenderID": "sys_1", "Data": {}}, {"SenderID": "sys_2", "Data": {"zones": []}}]
+
+    # A crash while writing the header
+    with open(path, "wb") as f:
+        f.write(MAGIC[:3])
+    writer = MessageCaptureWriter(path)
+    writer.write({"SenderID": "sys_1", "Data": {}})
+    writer.close()
+    assert len(MessageCaptureReader(path)) == 1
+
+    with open(path, "wb") as f:
+        f.write(b"not a capture")
+    with pytest.raises(ValueError):
+        MessageCaptureReader(path)
+    with pytest.raises(ValueError):
+        MessageCaptureWriter(path)
+    with open(path, "rb") as f:
+        assert f.read() == b"not a capture"
+
+
+def test_queued_capture(tmp_path):
+    """The queued writer redacts and writes on its thread and drops messages when the queue is full"""
+    path = str(tmp_path / "capture.s30")
+    metrics = Metrics()
+    writer = MessageCaptureWriter(path)
+    release = threading.Event()
+    write = writer.write
+
+    def blocked_write(*args):
+        release.wait()
+        write(*args)
+
+    with patch.object(writer, "write", side_effect=blocked_write):
+        queued = QueuedMessageCaptureWriter(writer, queue_size=2, redact=lambda m: {**m, "macAddr": REDACTED}, metrics=metrics)
+        # The first message is taken by the thread, two more fill the queue
+        assert queued.write({"SenderID": "sys_1", "macAddr": "00:11"}, timestamp=1.0) is True
+        for _ in range(100):
+            if queued._queue.empty():
+                break
+            time.sleep(0.01)
+        assert queued.write({"SenderID": "sys_1", "macAddr": "00:11"}, timestamp=2.0) is True
+        assert queued.write({"SenderID": "sys_1", "macAddr": "00:11"}, timestamp=3.0) is True
+        assert queued.write({"SenderID": "sys_1", "macAddr": "00:11"}, timestamp=4.0) is False
+        assert metrics.capture_message_drop == 1
+        release.set()
+        queued.close()
+    assert queued.record_count == 3
+    captured = list(MessageCaptureReader(path))
+    assert [c.timestamp for c in captured] == [1.0, 2.0, 3.0]
+    assert captured[0].message == {"SenderID": "sys_1", "macAddr": REDACTED}
+    assert captured[0].sys_id == "sys_1"
+
+
+def test_capture_zstd(tmp_path):
+    """zstd compression requires the zstandard module"""
+    path = str(tmp_path / "capture.s30")
+    try:
+        writer = MessageCaptureWriter(path, COMPRESSION_ZSTD)
+    except ImportError:
+        pytest.skip("zstandard not installed")
+    message = loadfile("system_uptime.json")
+    writer.write(message)
+    writer.close()
+    assert next(iter(MessageCaptureReader(path))).message == message
+
+
+class HttpResp:
+    """Mock an http response"""
+
+    def __init__(self, status, text: str | None = None):
+        self.status = status
+        self.content_length = 100
+        self._text = text
+
+    async def text(self) -> str:
+        return self._text
+
+
+@pytest.mark.asyncio
+async def test_capture_and_replay(api: s30api_async, tmp_path):
+    """Retrieved messages are captured and replay processes them again"""
+    path = str(tmp_path / "capture.s30")
+    lsystem = api.system_list[0]
+    message = loadfile("system_uptime.json", lsystem.sysId)
+    message["Data"]["system"]["config"] = {"options": {"macAddr": "00:11:22:33:44:55"}}
+    api.start_message_capture(path, COMPRESSION_ZLIB, redact=True)
+    with patch.object(api, "get") as mock_get:
+        mock_get.return_value = HttpResp(200, json.dumps({"messages": [message]}))
+        assert await api.messagePump() is True
+    api.stop_message_capture()
+    assert api._capture is None
+    captured = next(iter(MessageCaptureReader(path))).message
+    assert captured["Data"]["system"]["config"]["options"]["macAddr"] == REDACTED
+    assert message["Data"]["system"]["config"]["options"]["macAddr"] == "00:11:22:33:44:55"
+
+    # Redaction follows pii_message_logs by default, which the api fixture leaves enabled
+    unredacted_path = str(tmp_path / "unredacted.s30")
+    api.start_message_capture(unredacted_path)
+    with patch.object(api, "get") as mock_get:
+        mock_get.return_value = HttpResp(200, json.dumps({"messages": [message]}))
+        assert await api.messagePump() is True
+    api.stop_message_capture()
+    assert next(iter(MessageCaptureReader(unredacted_path))).message == message
+
+    lsystem.sysUpTime = None
+    api.metrics.reset()
+    assert await api.replay(path) == 1
+    assert lsystem.sysUpTime == 5039520
+    assert api.metrics.message_count == 1
+    assert await api.replay(path, sys_id="unknown") == 0
+
+
+@pytest.mark.asyncio
+async def test_replay_realtime(api: s30api_async, tmp_path):
+    """Realtime replay waits between messages using the original spacing"""
+    path = str(tmp_path / "capture.s30")
+    message = loadfile("system_uptime.json", api.system_list[0].sysId)
+    writer = MessageCaptureWriter(path)
+    now = time.time()
+    writer.write(message, timestamp=now)
+    writer.write(message, timestamp=now + 0.5)
+    writer.write(message, timestamp=now + 0.75)
+    writer.close()
+    with patch("asyncio.sleep") as mock_sleep:
+        assert await api.replay(path, realtime=True) == 3
+        delays = [call.args[0] for call in mock_sleep.call_args_list if call.args[0] > 0]
+        assert delays == pytest.approx([0.5, 0.25])
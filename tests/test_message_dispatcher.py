@@ -0,0 +1,90 @@
+"""Tests the per system message dispatcher"""
+# pylint: disable=protected-access
+
+import json
+from unittest.mock import patch
+import pytest
+
+from lennoxs30api.s30api_async import lennox_system, s30api_async
+from tests.conftest import loadfile
+
+
+class HttpResp:
+    """Mock an http response"""
+
+    def __init__(self, status, text: str | None = None):
+        self.status = status
+        self.content_length = 100
+        self._text = text
+
+    async def text(self) -> str:
+        return self._text
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_routes_messages_per_system(api: s30api_async):
+    """Messages for each system are processed by that system's worker"""
+    system_1: lennox_system = api.system_list[0]
+    system_2: lennox_system = api.system_list[1]
+    uptime = loadfile("system_uptime.json", system_1.sysId)
+    zone_status = loadfile("mut_sys1_zone1_status.json")
+    assert zone_status["SenderId"] == system_2.sysId
+    body = json.dumps({"messages": [uptime, zone_status]})
+
+    api.metrics.reset()
+    api.start_message_dispatcher()
+    with patch.object(api, "get") as mock_get:
+        mock_get.return_value = HttpResp(200, body)
+        assert await api.messagePump() is True
+        # Nothing has been processed yet, the messages are waiting on the workers
+        assert api.metrics.message_count == 0
+        assert api.metrics.dispatch_queue_max_depth == 2
+        await api.join_message_dispatcher()
+
+    assert api.metrics.message_count == 2
+    assert api.metrics.dispatch_queue_depth == 0
+    assert api.metrics.dispatch_lag_last is not None
+    assert api.metrics.dispatch_lag_max >= api.metrics.dispatch_lag_last
+    assert system_1.sysUpTime == 5039520
+    assert system_2.getZone(0).temperature == 79
+    assert len(api._dispatcher._workers) == 2
+    await api.stop_message_dispatcher()
+    assert api._dispatcher is None
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_drops_when_queue_full(api: s30api_async):
+    """Messages beyond the queue size are dropped and counted"""
+    system_1: lennox_system = api.system_list[0]
+    uptime = loadfile("system_uptime.json", system_1.sysId)
+    body = json.dumps({"messages": [uptime, uptime, uptime]})
+
+    api.metrics.reset()
+    api.start_message_dispatcher(max_queue_size=2)
+    with patch.object(api, "get") as mock_get:
+        mock_get.return_value = HttpResp(200, body)
+        assert await api.messagePump() is True
+        await api.join_message_dispatcher()
+
+    assert api.metrics.message_count == 2
+    assert api.metrics.dispatch_message_drop == 1
+    assert api.metrics.getMetricList()["dispatch_message_drop"] == 1
+    await api.stop_message_dispatcher()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_unknown_sender_processed_inline(api: s30api_async):
+    """Messages from unknown senders are not queued"""
+    message = loadfile("system_uptime.json", "bad_sender")
+    body = json.dumps({"messages": [message]})
+
+    api.metrics.reset()
+    api.start_message_dispatcher()
+    with patch.object(api, "get") as mock_get:
+        mock_get.return_value = HttpResp(200, body)
+        assert await api.messagePump() is True
+
+    assert api.metrics.sender_message_drop == 1
+    assert api.metrics.dispatch_queue_max_depth == 0
+    await api.stop_message_dispatcher()
+    assert api._dispatcher is None
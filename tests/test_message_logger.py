@@ -1,11 +1,17 @@
 """Tests the message logger"""
 
-# pylint: disable=line-too-long
+# pylint: disable=line-too-long,protected-access
+import gzip
+import io
 import logging
 import json
+import os
+import time
 import timeit
+from unittest.mock import patch
 
-from lennoxs30api.message_logger import REDACTED, MessageLogger
+from lennoxs30api.message_logger import REDACTED, MessageLogFileHandler, MessageLogger, _writers
+from lennoxs30api.metrics import Metrics
 from tests.conftest import loadfile
 
 
@@ -25,7 +31,7 @@ def test_logging_enable_disable(caplog):
         mlog.log_message(pii_in_messages=True, msg=msg)
         assert len(caplog.records) == 1
         log_msg = caplog.messages[0]
-        assert log_msg == json.dumps(msg, indent=4)
+        assert log_msg == json.dumps(msg, separators=(",", ":"))
 
 
 def test_logging_remove_email(caplog):
@@ -39,14 +45,14 @@ def test_logging_remove_email(caplog):
         mlog.log_message(pii_in_messages=True, msg=msg)
         assert len(caplog.records) == 1
         log_msg = caplog.messages[0]
-        assert log_msg == json.dumps(msg, indent=4)
+        assert log_msg == json.dumps(msg, separators=(",", ":"))
     logger.setLevel(logging.DEBUG)
     with caplog.at_level(logging.DEBUG):
         caplog.clear()
         mlog.log_message(pii_in_messages=False, msg=msg)
         assert len(caplog.records) == 1
         log_msg = caplog.messages[0]
-        assert log_msg != json.dumps(msg, indent=4)
+        assert log_msg != json.dumps(msg, separators=(",", ":"))
         msg_cleaned = json.loads(log_msg)
         assert msg_cleaned["TargetID"] == REDACTED
 
@@ -62,7 +68,7 @@ def test_logging_remove_redacted(caplog):
         mlog.log_message(pii_in_messages=False, msg=msg)
         assert len(caplog.records) == 1
         log_msg = caplog.messages[0]
-        assert log_msg != json.dumps(msg, indent=4)
+        assert log_msg != json.dumps(msg, separators=(",", ":"))
         msg_cleaned = json.loads(log_msg)
         home_addr = msg_cleaned["readyHomes"]["homes"][0]["address"]
         assert home_addr["streetAddress1"] == REDACTED
@@ -93,6 +99,52 @@ def test_logging_remove_redacted(caplog):
         assert user_token["refreshToken"] != REDACTED
 
 
+def test_redact_copy_on_write():
+    """Redaction only copies the containers on the path to a redacted field"""
+    mlog = MessageLogger()
+    msg = {
+        "TargetID": "mapp079372367644467046827001_myemail@email.com",
+        "Data": {"system": {"config": {"temperatureUnit": "F"}}, "homes": [{"address": {"city": "Town", "state": "NY"}}]},
+    }
+    redacted = mlog.redact(msg)
+    assert redacted is not msg
+    assert redacted["Data"]["system"] is msg["Data"]["system"]
+    assert redacted["Data"]["homes"][0]["address"]["city"] == REDACTED
+    assert redacted["Data"]["homes"][0]["address"]["state"] == "NY"
+    assert msg["Data"]["homes"][0]["address"]["city"] == "Town"
+
+    unchanged = {"Data": {"system": {"config": {"temperatureUnit": "F"}}}}
+    assert mlog.redact(unchanged) is unchanged
+
+    msg_cleaned = json.loads(mlog.format_message(msg))
+    assert msg_cleaned["TargetID"] == REDACTED
+    assert msg["TargetID"] != REDACTED
+
+
+def test_logging_lazy_format():
+    """The message is only formatted when a handler emits the record"""
+    logger = logging.getLogger(__name__ + ".lazy")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    mlog = MessageLogger(logger)
+    msg = {"test": "a"}
+    try:
+        with patch.object(mlog, "format_message", wraps=mlog.format_message) as format_message:
+            mlog.log_message(pii_in_messages=False, msg=msg)
+            assert format_message.call_count == 0
+            assert stream.getvalue() == ""
+            handler.setLevel(logging.DEBUG)
+            mlog.log_message(pii_in_messages=False, msg=msg)
+            assert format_message.call_count == 1
+            assert stream.getvalue() == json.dumps(msg, separators=(",", ":")) + "\n"
+    finally:
+        logger.removeHandler(handler)
+
+
 def test_logging_redacted_performance(caplog):
     """Tests performance of redacting"""
     logger = logging.getLogger(__name__)
@@ -120,3 +172,82 @@ def test_logger_instances_separate():
     assert mlog1.logger == mlog2.logger
     # There should only be one handler for the loggers.
     assert len(mlog1.logger.handlers) == 1
+
+
+def test_message_log_file_rotation(tmp_path):
+    """The message log file rotates on size and rotated files are compressed"""
+    log_file = str(tmp_path / "messages.log")
+    metrics = Metrics()
+    mlog = MessageLogger(enabled=True, message_logging_file=log_file, metrics=metrics, max_bytes=2000, backup_count=2, compress=True)
+    msg = loadfile("system_uptime.json")
+    for _ in range(20):
+        mlog.log_message(pii_in_messages=True, msg=msg)
+    mlog.close()
+    assert len(mlog.logger.handlers) == 0
+    assert os.path.exists(log_file)
+    for i in (1, 2):
+        with gzip.open(f"{log_file}.{i}.gz", "rt", encoding="utf-8") as f:
+            assert json.dumps(msg, separators=(",", ":")) in f.read()
+    assert os.path.exists(f"{log_file}.3.gz") is False
+    assert metrics.message_log_drop == 0
+
+
+def test_message_log_file_time_rotation(tmp_path):
+    """The message log file rotates once the interval elapses"""
+    log_file = str(tmp_path / "messages.log")
+    handler = MessageLogFileHandler(log_file, rotate_interval=60)
+    record = logging.LogRecord("test", logging.DEBUG, __file__, 0, "message", None, None)
+    assert handler.shouldRollover(record) is False
+    handler.rollover_at = time.time() - 1
+    assert handler.shouldRollover(record) is True
+    handler.emit(record)
+    assert handler.rollover_at > time.time()
+    handler.close()
+    assert os.path.exists(f"{log_file}.1")
+
+
+def test_message_log_queue_full(tmp_path):
+    """Messages are dropped and counted when the writer can not keep up"""
+    log_file = str(tmp_path / "messages.log")
+    metrics = Metrics()
+    metrics2 = Metrics()
+    mlog1 = MessageLogger(enabled=True, message_logging_file=log_file, metrics=metrics, queue_size=2)
+    mlog2 = MessageLogger(enabled=True, message_logging_file=log_file, metrics=metrics2)
+    # Stop the background thread so the queue fills up
+    writer = _writers[mlog1.logger_name]
+    writer.listener.stop()
+    with patch.object(mlog1, "format_message", wraps=mlog1.format_message) as mock_format:
+        for _ in range(5):
+            mlog1.log_message(pii_in_messages=True, msg={"test": "a"})
+        # Queued messages are encoded when they are logged, so only text is queued, dropped messages are not encoded
+        assert mock_format.call_count == 2
+        assert [record.args for record in list(writer.queue_handler.queue.queue)] == [None, None]
+        assert metrics.message_log_drop == 3
+        assert metrics.getMetricList()["message_log_drop"] == 3
+        # The drop is counted against the logger that logged the message
+        mlog2.log_message(pii_in_messages=True, msg={"test": "b"})
+        assert metrics.message_log_drop == 3
+        assert metrics2.message_log_drop == 1
+        writer.listener.start()
+        mlog1.close()
+        mlog2.close()
+        assert mock_format.call_count == 2
+    assert mlog1.logger_name not in _writers
+    with open(log_file, encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+
+
+def test_message_log_shared_close(tmp_path):
+    """The writer is stopped when the last logger using the file is closed"""
+    log_file = str(tmp_path / "messages.log")
+    mlog1 = MessageLogger(enabled=True, message_logging_file=log_file)
+    mlog2 = MessageLogger(enabled=True, message_logging_file=log_file)
+    mlog1.log_message(pii_in_messages=True, msg={"test": "a"})
+    mlog2.log_message(pii_in_messages=True, msg={"test": "b"})
+    mlog1.close()
+    # The file is still in use by the second logger
+    assert mlog1.logger_name in _writers
+    mlog2.close()
+    assert mlog1.logger_name not in _writers
+    with open(log_file, encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
@@ -0,0 +1,125 @@
+"""Tests the streaming decode of retrieve responses"""
+# pylint: disable=protected-access
+
+import json
+import logging
+from unittest.mock import patch
+import pytest
+
+from lennoxs30api.message_stream import MessageStreamDecoder
+from lennoxs30api.s30api_async import s30api_async
+from lennoxs30api.s30exception import EC_COMMS_ERROR, S30Exception
+from tests.conftest import loadfile
+
+
+def decode_in_chunks(body: bytes, chunk_size: int) -> list[dict]:
+    """Feed the body to a decoder in fixed size chunks"""
+    decoder = MessageStreamDecoder()
+    messages = []
+    for i in range(0, len(body), chunk_size):
+        messages.extend(decoder.feed(body[i : i + chunk_size]))
+    decoder.close()
+    return messages
+
+
+def test_decode_chunk_sizes():
+    """The decoded messages are the same regardless of how the body is split"""
+    expected = [
+        loadfile("system_04_furn_ac_zoning_equipment.json"),
+        loadfile("system_uptime.json"),
+        loadfile("login_response.json"),
+    ]
+    body = json.dumps({"messages": expected}, indent=4).encode("utf-8")
+    for chunk_size in (1, 7, 4096, len(body)):
+        assert decode_in_chunks(body, chunk_size) == expected
+
+
+def test_decode_strings_with_structure():
+    """Braces, brackets, quotes and escapes inside strings do not confuse the decoder"""
+    expected = [
+        {"text": 'a "quoted" {brace} [bracket] \\ back', "unicode": "temp °F ☃"},
+        {"messages": [1, 2, {"x": "}"}]},
+    ]
+    body = json.dumps({"other": "messages", "list": [{"a": "["}], "messages": expected}, ensure_ascii=False).encode("utf-8")
+    for chunk_size in (1, 2, 3, 5):
+        assert decode_in_chunks(body, chunk_size) == expected
+
+
+def test_decode_incremental():
+    """Messages are returned as soon as they are complete"""
+    decoder = MessageStreamDecoder()
+    assert decoder.feed('{"messages": [{"a": 1}, {"b"') == [{"a": 1}]
+    assert decoder.feed(": 2}") == [{"b": 2}]
+    assert decoder.done is False
+    assert decoder.feed("]}") == []
+    assert decoder.done is True
+    assert decoder.message_count == 2
+    decoder.close()
+
+
+def test_decode_empty_and_truncated():
+    """An empty array completes and a truncated body raises a decode error"""
+    decoder = MessageStreamDecoder()
+    assert decoder.feed('{"messages": []}') == []
+    decoder.close()
+
+    decoder = MessageStreamDecoder()
+    assert decoder.feed('{"messages": [{"a": 1}, {"b": ') == [{"a": 1}]
+    with pytest.raises(json.JSONDecodeError):
+        decoder.close()
+
+    decoder = MessageStreamDecoder()
+    with pytest.raises(json.JSONDecodeError):
+        decoder.feed('{"messages": [{"a": 1,}]}')
+
+
+class StreamContent:
+    """Mock aiohttp stream reader"""
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self._body = body
+        self._chunk_size = chunk_size
+
+    async def iter_any(self):
+        for i in range(0, len(self._body), self._chunk_size):
+            yield self._body[i : i + self._chunk_size]
+
+
+class HttpStreamResp:
+    """Mock a streaming http response"""
+
+    def __init__(self, status, body: bytes, chunk_size: int = 64):
+        self.status = status
+        self.content_length = len(body)
+        self.content = StreamContent(body, chunk_size)
+
+
+@pytest.mark.asyncio
+async def test_message_pump_streaming(api: s30api_async):
+    """The message pump processes streamed messages"""
+    api.stream_messages = True
+    lsystem = api.system_list[0]
+    message = loadfile("system_uptime.json", lsystem.sysId)
+    body = json.dumps({"messages": [message]}).encode("utf-8")
+    api.metrics.reset()
+    with patch.object(api, "get") as mock_get:
+        mock_get.return_value = HttpStreamResp(200, body)
+        assert await api.messagePump() is True
+        assert api.metrics.message_count == 1
+        assert lsystem.sysUpTime == 5039520
+
+        mock_get.return_value = HttpStreamResp(200, b'{"messages":[]}')
+        assert await api.messagePump() is False
+
+
+@pytest.mark.asyncio
+async def test_message_pump_streaming_decode_error(api: s30api_async, caplog):
+    """Decode errors while streaming raise S30Exception"""
+    api.stream_messages = True
+    with patch.object(api, "get") as mock_get:
+        mock_get.return_value = HttpStreamResp(200, b"Invalid json {}''")
+        with caplog.at_level(logging.ERROR):
+            with pytest.raises(S30Exception) as exc:
+                await api.messagePump()
+            assert exc.value.error_code == EC_COMMS_ERROR
+            assert "JSON decode error" in exc.value.message
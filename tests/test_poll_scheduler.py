@@ -0,0 +1,127 @@
+"""Tests the adaptive poll scheduler"""
+# pylint: disable=protected-access
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+import pytest
+
+from lennoxs30api.poll_scheduler import PollScheduler
+from lennoxs30api.s30api_async import s30api_async
+from tests.conftest import loadfile
+
+
+def test_batch_size_grows_when_full():
+    """Full batches double the batch size up to the maximum and poll immediately"""
+    scheduler = PollScheduler(min_batch_size=10, max_batch_size=40)
+    assert scheduler.batch_size == 10
+    scheduler.record_messages(10)
+    assert scheduler.batch_size == 20
+    assert scheduler.next_delay() == 0.0
+    scheduler.record_messages(20)
+    assert scheduler.batch_size == 40
+    scheduler.record_messages(40)
+    assert scheduler.batch_size == 40
+    # A partial batch shrinks the batch size
+    scheduler.record_messages(5)
+    assert scheduler.batch_size == 20
+    assert scheduler.next_delay() == scheduler.poll_interval
+    scheduler.record_messages(15)
+    assert scheduler.batch_size == 20
+
+
+def test_idle_backoff():
+    """Empty retrieves back off exponentially"""
+    scheduler = PollScheduler(poll_interval=1.0, max_poll_interval=5.0)
+    scheduler.record_messages(0)
+    assert scheduler.next_delay() == 2.0
+    scheduler.record_messages(0)
+    assert scheduler.next_delay() == 4.0
+    scheduler.record_messages(0)
+    assert scheduler.next_delay() == 5.0
+    scheduler.record_messages(1)
+    assert scheduler.next_delay() == 1.0
+    scheduler.record_messages(10)
+    assert scheduler.next_delay() == 0.0
+    scheduler.record_messages(0)
+    assert scheduler.next_delay() == 1.0
+    assert scheduler.batch_size == scheduler.min_batch_size
+
+
+def test_long_polling_does_not_back_off():
+    """Long polling connections wait on the server"""
+    scheduler = PollScheduler(long_polling=True)
+    scheduler.record_messages(0)
+    assert scheduler.next_delay() == 0.0
+    scheduler.record_messages(3)
+    assert scheduler.next_delay() == 0.0
+
+
+def test_fast_poll_after_publish():
+    """Publishing switches to the fast poll interval for a while"""
+    scheduler = PollScheduler(poll_interval=1.0, max_poll_interval=8.0, fast_poll_interval=0.25, fast_poll_duration=10.0)
+    scheduler.record_messages(0)
+    scheduler.record_messages(0)
+    assert scheduler.next_delay() == 4.0
+    scheduler.notify_publish()
+    assert scheduler.fast_polling is True
+    assert scheduler.next_delay() == 0.25
+    scheduler._fast_poll_until = time.monotonic() - 1
+    assert scheduler.fast_polling is False
+    assert scheduler.next_delay() == 4.0
+
+
+@pytest.mark.asyncio
+async def test_wait_wakes_on_publish():
+    """A pending wait returns as soon as a command is published"""
+    scheduler = PollScheduler(poll_interval=30.0)
+    waiter = asyncio.create_task(scheduler.wait())
+    await asyncio.sleep(0)
+    assert waiter.done() is False
+    scheduler.notify_publish()
+    await asyncio.wait_for(waiter, 1.0)
+
+
+class HttpResp:
+    """Mock an http response"""
+
+    def __init__(self, status, text: str | None = None):
+        self.status = status
+        self.content_length = 100
+        self._text = text
+
+    async def text(self) -> str:
+        return self._text
+
+
+@pytest.mark.asyncio
+async def test_message_pump_uses_scheduler(api: s30api_async):
+    """The message pump requests the scheduler's batch size and reports results"""
+    message = loadfile("system_uptime.json")
+    full_batch = json.dumps({"messages": [message] * 10})
+    with patch.object(api, "get") as mock_get:
+        mock_get.return_value = HttpResp(200, full_batch)
+        assert await api.messagePump() is True
+        assert mock_get.call_args.kwargs["params"]["MessageCount"] == "10"
+        assert mock_get.call_args.kwargs["params"]["LongPollingTimeout"] == "0"
+        assert await api.messagePump() is True
+        assert mock_get.call_args.kwargs["params"]["MessageCount"] == "20"
+        # Only half a batch came back
+        assert api.poll_scheduler.batch_size == 10
+        assert api.poll_scheduler.next_delay() == api.poll_scheduler.poll_interval
+
+        mock_get.return_value = HttpResp(204)
+        assert await api.messagePump() is False
+        assert api.poll_scheduler.batch_size == api.poll_scheduler.min_batch_size
+        assert api.poll_scheduler.next_delay() == api.poll_scheduler.poll_interval * 2
+
+
+@pytest.mark.asyncio
+async def test_publish_triggers_fast_poll(api: s30api_async):
+    """A successful publish switches the scheduler into fast polling"""
+    with patch.object(api, "post") as mock_post:
+        mock_post.return_value = HttpResp(200, '{"code": 1}')
+        assert api.poll_scheduler.fast_polling is False
+        await api.publishMessageHelper(api.system_list[0].sysId, '"Data":{"system":{"config":{"allergenDefender":true}}}')
+        assert api.poll_scheduler.fast_polling is True
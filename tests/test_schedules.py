@@ -0,0 +1,87 @@
+"""Tests schedule and period storage"""
+
+from lennoxs30api.lennox_schedule import lennox_schedule
+from lennoxs30api.s30api_async import lennox_system, s30api_async
+
+
+def test_schedule_lookup(api: s30api_async):
+    """Schedules are found by id and listed in the order they were received"""
+    lsystem: lennox_system = api.system_list[0]
+    schedules = lsystem.getSchedules()
+    assert len(schedules) > 0
+    for schedule in schedules:
+        assert lsystem.getSchedule(schedule.id) is schedule
+        assert lsystem.getOrCreateSchedule(schedule.id) is schedule
+    assert lsystem.getSchedule(1000) is None
+    assert [schedule.id for schedule in schedules] == sorted(schedule.id for schedule in schedules)
+
+
+def test_period_update():
+    """Periods are created on first reference and updated from the keys present"""
+    schedule = lennox_schedule(16)
+    schedule.update(
+        {
+            "id": 16,
+            "schedule": {
+                "name": "Manual",
+                "periodCount": 2,
+                "periods": [
+                    {"id": 1, "enabled": True, "period": {"hsp": 60, "csp": 80, "unknown": 1}},
+                    {"id": 0, "period": {"systemMode": "cool"}},
+                ],
+            },
+        }
+    )
+    assert schedule.name == "Manual"
+    assert schedule.periodCount == 2
+    assert [period.id for period in schedule.getPeriods()] == [1, 0]
+    period = schedule.getPeriod(1)
+    assert period.enabled is True
+    assert period.hsp == 60
+    assert period.csp == 80
+    assert period.systemMode is None
+    assert schedule.getPeriod(0).systemMode == "cool"
+    assert schedule.getPeriod(2) is None
+
+    schedule.update({"id": 16, "schedule": {"periods": [{"id": 1, "period": {"hsp": 62}}]}})
+    assert schedule.getOrCreatePeriod(1) is period
+    assert period.hsp == 62
+    assert period.csp == 80
+
+
+def schedule_message(sys_id: str, schedule_id: int, period: dict) -> dict:
+    """Builds a single period schedule update"""
+    return {"SenderID": sys_id, "Data": {"schedules": [{"id": schedule_id, "schedule": {"periods": [{"id": 0, "period": period}]}}]}}
+
+
+def test_zone_index(api: s30api_async):
+    """Zones are found by id and by their manual, away and override schedule ids"""
+    lsystem: lennox_system = api.system_list[0]
+    for zone in lsystem.zone_list:
+        assert lsystem.getZone(zone.id) is zone
+        assert lsystem.getOrCreateZone(zone.id) is zone
+        for schedule_id in (zone.getManualModeScheduleId(), zone.getAwayModeScheduleId(), zone.getOverrideScheduleId()):
+            assert lsystem.getZonesForSchedule(schedule_id) == [zone]
+    assert lsystem.getZone(99) is None
+    assert lsystem.getZonesForSchedule(1) == []
+
+
+def test_schedule_routed_to_zone(api: s30api_async):
+    """Updates to the manual or override schedule a zone is running are applied to the zone"""
+    lsystem: lennox_system = api.system_list[0]
+    zone = lsystem.getZone(1)
+    calls = []
+    zone.registerOnUpdateCallback(lambda: calls.append(1))
+
+    zone.scheduleId = zone.getOverrideScheduleId()
+    api.processMessage(schedule_message(lsystem.sysId, zone.getOverrideScheduleId(), {"hsp": 55}))
+    assert zone.hsp == 55
+    assert len(calls) == 1
+    # The zone is not running its manual schedule
+    api.processMessage(schedule_message(lsystem.sysId, zone.getManualModeScheduleId(), {"hsp": 56}))
+    assert zone.hsp == 55
+
+    zone.scheduleId = zone.getManualModeScheduleId()
+    api.processMessage(schedule_message(lsystem.sysId, zone.getManualModeScheduleId(), {"hsp": 57}))
+    assert zone.hsp == 57
+    assert len(calls) == 2
@@ -108,3 +108,39 @@ def test_process_message_from_sibling(api: s30api_async, caplog):
         assert caplog.records[1].levelname == "WARNING"
         assert "KL21J00002" in caplog.messages[0]
         assert "currentTime" in caplog.messages[1]
+
+
+def test_sibling_index(api: s30api_async):
+    """Test the sibling index tracks the siblings reported by the system"""
+    lsystem: lennox_system = api.system_list[1]
+    assert api.getSystemSibling("KL21J00002") is None
+
+    api.processMessage(loadfile("sibling_multiple.json"))
+    assert api.getSystemSibling("KL21J00002") is lsystem
+    assert api.getSystemSibling("KL21J00004") is lsystem
+    assert api.getSystemSibling(lsystem.sysId) is None
+
+    api.processMessage(loadfile("sibling_zero.json"))
+    assert api.getSystemSibling("KL21J00002") is None
+    assert api.getSystemSibling("KL21J00004") is None
+
+
+def test_all_systems_initialized(api: s30api_async):
+    """Test the count of initialized systems follows systemMessageProcessed"""
+    assert api.allSystemsInitialized is True
+    lsystem: lennox_system = api.system_list[1]
+    lsystem.systemMessageProcessed = False
+    assert api.allSystemsInitialized is False
+    lsystem.systemMessageProcessed = False
+    api.system_list[0].systemMessageProcessed = False
+    assert api.allSystemsInitialized is False
+    lsystem.systemMessageProcessed = True
+    assert api.allSystemsInitialized is False
+    api.system_list[0].systemMessageProcessed = True
+    assert api.allSystemsInitialized is True
+
+    new_system = api.getOrCreateSystem("0000000-0000-0000-0000-000000000009")
+    assert api.getSystem("0000000-0000-0000-0000-000000000009") is new_system
+    assert api.allSystemsInitialized is False
+    api.processMessage(loadfile("system_uptime.json", new_system.sysId))
+    assert api.allSystemsInitialized is True
@@ -0,0 +1,39 @@
+"""Tests the slots based subscriber objects"""
+# pylint: disable=protected-access
+
+from unittest.mock import patch
+
+from lennoxs30api.s30api_async import lennox_system, lennox_zone, s30api_async
+
+
+def test_no_instance_dict(api: s30api_async):
+    """Every property is declared in __slots__, so processing messages does not populate a per object dict"""
+    for lsystem in api.system_list:
+        assert lsystem.__dict__ == {}
+        for zone in lsystem.zone_list:
+            assert zone.__dict__ == {}
+        for equipment in lsystem.equipment.values():
+            assert equipment.__dict__ == {}
+        for schedule in lsystem.getSchedules():
+            for period in schedule.getPeriods():
+                # Periods are not subscribable and have no dict at all
+                assert hasattr(period, "__dict__") is False
+                assert hasattr(period, "_callbacks") is False
+
+
+def test_callbacks_and_patching(api: s30api_async):
+    """Callbacks receive the dirty set and instances can still be patched"""
+    lsystem: lennox_system = api.system_list[0]
+    zone: lennox_zone = lsystem.getZone(0)
+    calls = []
+    zone.registerOnUpdateCallback(lambda: calls.append(set(zone._dirty_set)))
+    zone.attr_updater({"temperature": 99, "humidity": 12}, "temperature")
+    zone.attr_updater({"temperature": 99, "humidity": 12}, "humidity")
+    zone.executeOnUpdateCallbacks()
+    assert calls == [{"temperature", "humidity"}]
+    assert zone._dirty_set is None
+
+    with patch.object(lsystem, "config_complete", return_value=False):
+        assert lsystem.config_complete() is False
+    assert "config_complete" not in lsystem.__dict__
+    assert lsystem.config_complete() is True